@@ -0,0 +1,411 @@
+"""
+Auth-Flow Engine: request OTP -> verify OTP -> reset password
+One implementation of the password-reset flow that every django_*_fix.py view wraps.
+
+The flow is plain Python over three pluggable pieces, so each step can be profiled and
+benchmarked per backend (see benchmark_auth_flow.py) without Django:
+
+    users   get(email) -> user or None; password_hash(user) -> str; set_password(user, raw)
+    otps    issue(email, otp, ttl); verify(email, otp, max_attempts) -> (status, remaining)
+    tokens  issue(email, bind) -> token; claim(email, token, bind) -> bool; release(email, token);
+            consume(email, token)
+
+A reset claims its token atomically (only one request can win it) before the password is
+set, releases it if setting the password failed, and consumes the user's other tokens after.
+
+Every step returns a FlowResult(status, body, headers) that the views turn into a Response.
+Steps log through structured_log under their own endpoint name, so each can be sampled.
+
+AsyncAuthFlow runs the same steps for ASGI views. It awaits a backend's a<method>()
+(aget, aissue, averify, ...) when the backend has one and otherwise calls the sync method
+inline, so backends without async methods must never block (memory, mmap, HMAC).
+
+OTP backends:   StoreOtpBackend (otp_store: memory / sqlite / manager), SharedTableOtpBackend
+                (shared_otp_table), ModelOtpBackend in django_auth_flow.py (otp_verifications)
+Token backends: StoredTokenBackend (reset_tokens), SignedTokenBackend (signed_tokens)
+"""
+
+import hmac
+import random
+import string
+from collections import namedtuple
+
+from password_hashing import PASSWORD_POOL_RETRY_AFTER, HashingPoolBusy
+from reset_tokens import ResetTokenStore
+from shared_otp_table import MISSING, TOO_MANY_ATTEMPTS, VERIFIED
+from structured_log import get_logger
+
+OTP_TTL_SECONDS = 5 * 60
+MAX_OTP_ATTEMPTS = 3
+MIN_PASSWORD_LENGTH = 8
+
+request_otp_log = get_logger('request_otp')
+verify_otp_log = get_logger('verify_otp')
+reset_password_log = get_logger('reset_password')
+
+
+class FlowResult(namedtuple('FlowResult', 'status body headers')):
+    """HTTP status code, JSON body and extra headers for one flow step"""
+
+    def __new__(cls, status, body, headers=None):
+        return super().__new__(cls, status, body, headers or {})
+
+
+def generate_otp():
+    """Generate a 6-digit OTP"""
+    return ''.join(random.choices(string.digits, k=6))
+
+# ============================================================================
+# OTP BACKENDS
+# ============================================================================
+
+class StoreOtpBackend:
+    """OTPs in an otp_store.ExpiringStore as {'otp', 'attempts'}"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def issue(self, email, otp, ttl):
+        self.store.set(email, {'otp': otp, 'attempts': 0}, ttl=ttl)
+
+    def verify(self, email, otp, max_attempts):
+        # One atomic check-and-increment-or-delete: concurrent guesses cannot exceed max_attempts
+        return self.store.verify_otp(email, otp, max_attempts)
+
+    async def aissue(self, email, otp, ttl):
+        await self.store.aset(email, {'otp': otp, 'attempts': 0}, ttl=ttl)
+
+    async def averify(self, email, otp, max_attempts):
+        return await self.store.averify_otp(email, otp, max_attempts)
+
+
+class SharedTableOtpBackend:
+    """OTPs in the host-wide mmap table (shared_otp_table.SharedOtpTable); never blocks"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def issue(self, email, otp, ttl):
+        self.table.put(email, otp, ttl)
+
+    def verify(self, email, otp, max_attempts):
+        return self.table.verify(email, otp, max_attempts=max_attempts)
+
+# ============================================================================
+# TOKEN BACKENDS
+# ============================================================================
+
+class StoredTokenBackend:
+    """Random tokens stored by SHA-256 digest (reset_tokens.ResetTokenStore)"""
+
+    needs_bind = False
+
+    def __init__(self, token_store=None):
+        self.token_store = token_store if token_store is not None else ResetTokenStore()
+
+    def issue(self, email, bind=''):
+        return self.token_store.issue(email)
+
+    def claim(self, email, token, bind=''):
+        """Pop the token (one atomic store call); True if it was live and issued for email"""
+        token_email = self.token_store.consume(token)
+        if token_email is None:
+            return False
+        if not hmac.compare_digest(token_email.encode(), (email or '').encode()):
+            # Not this email's token: put it back for its owner
+            self.token_store.store(token_email, token)
+            return False
+        return True
+
+    def release(self, email, token):
+        """Put a claimed token back; the password was not changed"""
+        self.token_store.store(email, token)
+
+    def consume(self, email, token):
+        """Revoke every other outstanding token for email (this one was popped by claim)"""
+        self.token_store.revoke_all(email)
+
+    async def aissue(self, email, bind=''):
+        return await self.token_store.aissue(email)
+
+    async def aclaim(self, email, token, bind=''):
+        token_email = await self.token_store.aconsume(token)
+        if token_email is None:
+            return False
+        if not hmac.compare_digest(token_email.encode(), (email or '').encode()):
+            await self.token_store.astore(token_email, token)
+            return False
+        return True
+
+    async def arelease(self, email, token):
+        await self.token_store.astore(email, token)
+
+    async def aconsume(self, email, token):
+        await self.token_store.arevoke_all(email)
+
+
+class SignedTokenBackend:
+    """Stateless HMAC tokens bound to the password hash (signed_tokens.SignedTokenSigner); never blocks"""
+
+    needs_bind = True
+
+    def __init__(self, signer):
+        self.signer = signer
+
+    def issue(self, email, bind=''):
+        return self.signer.sign(email, bind=bind)
+
+    def claim(self, email, token, bind=''):
+        # mark_used is a test-and-set under the filter's lock: one concurrent request wins
+        return self.signer.verify(token, email, bind=bind) is not None and self.signer.mark_used(token)
+
+    def release(self, email, token):
+        # A used-token filter cannot forget one token: the client verifies an OTP again
+        pass
+
+    def consume(self, email, token):
+        # The new password hash already invalidates every other signed token
+        pass
+
+# ============================================================================
+# USER DIRECTORY (in memory, for tests and benchmarks)
+# ============================================================================
+
+class MemoryUser:
+    def __init__(self, email, password):
+        self.email = email
+        self.password = password
+
+
+class MemoryUserDirectory:
+    """users backend over a dict; hash_password defaults to storing a marker, not a real hash"""
+
+    def __init__(self, hash_password=lambda raw: f'plain${raw}'):
+        self.users = {}
+        self.hash_password = hash_password
+
+    def add(self, email, password):
+        self.users[email] = MemoryUser(email, self.hash_password(password))
+
+    def get(self, email):
+        return self.users.get(email)
+
+    def password_hash(self, user):
+        return user.password
+
+    def set_password(self, user, password):
+        user.password = self.hash_password(password)
+
+# ============================================================================
+# FLOW
+# ============================================================================
+
+class AuthFlow:
+    """request_otp / verify_otp / reset_password over pluggable backends"""
+
+    def __init__(self, users, otps, tokens, send_otp=None, otp_ttl=OTP_TTL_SECONDS,
+                 max_attempts=MAX_OTP_ATTEMPTS, expose_otp=False):
+        self.users = users
+        self.otps = otps
+        self.tokens = tokens
+        self.send_otp = send_otp
+        self.otp_ttl = otp_ttl
+        self.max_attempts = max_attempts
+        # Development only: return the OTP in the request_otp response
+        self.expose_otp = expose_otp
+
+    def _bind(self, email, user=None):
+        """Password hash the token is bound to (signed tokens only)"""
+        if not self.tokens.needs_bind:
+            return ''
+        user = user if user is not None else self.users.get(email)
+        return self.users.password_hash(user) if user else ''
+
+    def request_otp(self, email):
+        if not email:
+            return FlowResult(400, {'error': 'Email is required'})
+
+        user = self.users.get(email)
+        if user is None:
+            return self._user_not_found(email, request_otp_log)
+
+        # Store OTP (expires after otp_ttl; replaces any earlier unused OTP)
+        otp = generate_otp()
+        self.otps.issue(email, otp, self.otp_ttl)
+
+        # Queue the email; delivery happens off the request path
+        if self.send_otp is not None and not self.send_otp(email, otp, self.otp_ttl // 60):
+            request_otp_log.warning('otp_email_not_queued', email=email)
+        return self._otp_sent(otp)
+
+    def _otp_sent(self, otp):
+        body = {'message': 'OTP sent successfully'}
+        if self.expose_otp:
+            body['otp'] = otp
+        return FlowResult(200, body)
+
+    def verify_otp(self, email, otp):
+        if not email or not otp:
+            return FlowResult(400, {'error': 'Email and OTP are required'})
+
+        result, remaining_attempts = self.otps.verify(email, str(otp).strip(), self.max_attempts)
+        error = self._otp_error(email, result, remaining_attempts)
+        if error:
+            return error
+
+        # Generate the token reset_password expects in the Authorization header
+        return self._verified(email, self.tokens.issue(email, bind=self._bind(email)))
+
+    def _otp_error(self, email, result, remaining_attempts):
+        if result == MISSING:
+            return FlowResult(400, {'error': 'No OTP found for this email. Please request a new OTP.'})
+
+        if result == TOO_MANY_ATTEMPTS:
+            return FlowResult(400, {'error': 'Too many verification attempts. Please request a new OTP.'})
+
+        if result != VERIFIED:
+            verify_otp_log.info('otp_invalid', email=email, remaining_attempts=remaining_attempts)
+            return FlowResult(400, {'error': f'Invalid OTP. {remaining_attempts} attempts remaining.'})
+
+        return None
+
+    def _verified(self, email, token):
+        verify_otp_log.info('otp_verified', email=email)
+        return FlowResult(200, {
+            'message': 'OTP verified successfully',
+            'token': token,
+            'success': True
+        })
+
+    def reset_password(self, email, token, password, confirm_password):
+        """token is None when the Authorization header is missing or not a Bearer token"""
+        error = self._reset_input_error(email, token, password, confirm_password)
+        if error:
+            return error
+
+        user = self.users.get(email)
+
+        # Claim the token (signed tokens only verify against the current password hash);
+        # claiming is atomic, so two requests with one token cannot both reset
+        if not self.tokens.claim(email, token, bind=self._bind(email, user)):
+            return self._invalid_token()
+
+        if user is None:
+            return self._user_not_found(email, reset_password_log)
+
+        try:
+            self.users.set_password(user, password)
+        except HashingPoolBusy:
+            # The password is unchanged: the token stays usable so the client can retry
+            self.tokens.release(email, token)
+            return self._busy()
+
+        self.tokens.consume(email, token)
+        return self._reset_done(email)
+
+    def _reset_input_error(self, email, token, password, confirm_password):
+        if token is None:
+            return FlowResult(401, {'error': 'Missing or invalid Authorization header. Token required.'})
+        if not token:
+            return FlowResult(401, {'error': 'Authentication token is required'})
+
+        if not email:
+            return FlowResult(400, {'error': 'Email is required'})
+        if not password:
+            return FlowResult(400, {'error': 'Password is required'})
+        if not confirm_password:
+            return FlowResult(400, {'error': 'Confirm password is required'})
+        if password != confirm_password:
+            return FlowResult(400, {'error': 'Passwords do not match'})
+        if len(password) < MIN_PASSWORD_LENGTH:
+            return FlowResult(400, {'error': f'Password must be at least {MIN_PASSWORD_LENGTH} characters'})
+        return None
+
+    def _invalid_token(self):
+        return FlowResult(401, {'error': 'Invalid or expired authentication token. Please verify OTP again.'})
+
+    def _user_not_found(self, email, log):
+        log.info('user_not_found', email=email)
+        return FlowResult(404, {'error': 'User with this email does not exist'})
+
+    def _busy(self):
+        return FlowResult(503, {'error': 'Server busy. Please try again.'},
+                          {'Retry-After': str(PASSWORD_POOL_RETRY_AFTER)})
+
+    def _reset_done(self, email):
+        reset_password_log.info('password_reset', email=email)
+        return FlowResult(200, {
+            'message': 'Password reset successful',
+            'success': True
+        })
+
+# ============================================================================
+# ASYNC FLOW (ASGI views)
+# ============================================================================
+
+async def _acall(backend, name, *args, **kwargs):
+    """await backend.a<name>(...) if the backend has it, else call the (non-blocking) sync method"""
+    method = getattr(backend, 'a' + name, None)
+    if method is not None:
+        return await method(*args, **kwargs)
+    return getattr(backend, name)(*args, **kwargs)
+
+
+class AsyncAuthFlow(AuthFlow):
+    """AuthFlow whose steps are coroutines; send_otp must be an async function"""
+
+    async def _abind(self, email, user=None):
+        if not self.tokens.needs_bind:
+            return ''
+        user = user if user is not None else await _acall(self.users, 'get', email)
+        # Cached Django users carry no hash; apassword_hash() reads it without a lazy load
+        return await _acall(self.users, 'password_hash', user) if user else ''
+
+    async def request_otp(self, email):
+        if not email:
+            return FlowResult(400, {'error': 'Email is required'})
+
+        user = await _acall(self.users, 'get', email)
+        if user is None:
+            return self._user_not_found(email, request_otp_log)
+
+        otp = generate_otp()
+        await _acall(self.otps, 'issue', email, otp, self.otp_ttl)
+
+        if self.send_otp is not None and not await self.send_otp(email, otp, self.otp_ttl // 60):
+            request_otp_log.warning('otp_email_not_queued', email=email)
+        return self._otp_sent(otp)
+
+    async def verify_otp(self, email, otp):
+        if not email or not otp:
+            return FlowResult(400, {'error': 'Email and OTP are required'})
+
+        result, remaining_attempts = await _acall(self.otps, 'verify', email, str(otp).strip(), self.max_attempts)
+        error = self._otp_error(email, result, remaining_attempts)
+        if error:
+            return error
+
+        token = await _acall(self.tokens, 'issue', email, bind=await self._abind(email))
+        return self._verified(email, token)
+
+    async def reset_password(self, email, token, password, confirm_password):
+        error = self._reset_input_error(email, token, password, confirm_password)
+        if error:
+            return error
+
+        user = await _acall(self.users, 'get', email)
+
+        if not await _acall(self.tokens, 'claim', email, token, bind=await self._abind(email, user)):
+            return self._invalid_token()
+
+        if user is None:
+            return self._user_not_found(email, reset_password_log)
+
+        try:
+            await _acall(self.users, 'set_password', user, password)
+        except HashingPoolBusy:
+            await _acall(self.tokens, 'release', email, token)
+            return self._busy()
+
+        await _acall(self.tokens, 'consume', email, token)
+        return self._reset_done(email)
@@ -0,0 +1,51 @@
+"""
+Small timing helpers shared by the benchmark_*.py scripts
+"""
+
+import time
+
+
+def ops_per_second(fn, iterations):
+    """Call fn(i) for i in range(iterations) and return throughput in ops/sec"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed > 0 else float('inf')
+
+
+def latencies(fn, iterations):
+    """Call fn(i) for i in range(iterations) and return each call's latency in seconds"""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile (0-100) of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def format_rate(rate):
+    """Human-readable ops/sec"""
+    if rate >= 1_000_000:
+        return f"{rate / 1_000_000:.2f}M ops/s"
+    if rate >= 1_000:
+        return f"{rate / 1_000:.1f}k ops/s"
+    return f"{rate:.0f} ops/s"
+
+
+def format_latency(seconds):
+    """Human-readable latency"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Load test: sync workers vs one async (ASGI-style) worker on request_otp + verify_otp
+Run: python benchmark_async_auth.py [clients] [backend latency ms] [uplink delay ms] [sync workers]
+
+Each virtual client calls /api/request-otp/ and then /api/verify-otp/ with the returned OTP,
+all clients at once. Every user lookup and OTP store call waits `backend latency` (a database
+round trip), and every client waits `uplink delay` between its headers and its body (a slow
+mobile upload).
+
+  sync  - N threads accepting on one socket, one request at a time each
+          (gunicorn sync workers: a worker is held for every wait inside the request)
+  async - one event loop; a waiting request is a suspended coroutine (AsyncAuthFlow)
+
+Both servers run the same auth-flow engine, so the difference is only how waits are held.
+Django's ASGI handler is not part of this measurement, and the waits are modelled as truly
+asynchronous I/O.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import auth_flow
+import structured_log
+from bench_utils import format_latency, format_rate, percentile
+from otp_store import LocalMemoryStore
+from reset_tokens import ResetTokenStore
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+BACKEND_LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 5.0) / 1000.0
+UPLINK_DELAY = (float(sys.argv[3]) if len(sys.argv) > 3 else 50.0) / 1000.0
+SYNC_WORKERS = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+CLIENT_TIMEOUT = 60.0  # RetrofitClient read timeout
+
+
+class SlowUsers:
+    """users backend whose lookups take one database round trip"""
+
+    needs_bind = False
+
+    def __init__(self, users):
+        self.users = users
+
+    def get(self, email):
+        time.sleep(BACKEND_LATENCY)
+        return self.users.get(email)
+
+    async def aget(self, email):
+        await asyncio.sleep(BACKEND_LATENCY)
+        return self.users.get(email)
+
+
+class SlowOtps:
+    """OTP backend whose calls take one database round trip"""
+
+    def __init__(self, otps):
+        self.otps = otps
+
+    def issue(self, email, otp, ttl):
+        time.sleep(BACKEND_LATENCY)
+        self.otps.issue(email, otp, ttl)
+
+    def verify(self, email, otp, max_attempts):
+        time.sleep(BACKEND_LATENCY)
+        return self.otps.verify(email, otp, max_attempts)
+
+    async def aissue(self, email, otp, ttl):
+        await asyncio.sleep(BACKEND_LATENCY)
+        self.otps.issue(email, otp, ttl)
+
+    async def averify(self, email, otp, max_attempts):
+        await asyncio.sleep(BACKEND_LATENCY)
+        return self.otps.verify(email, otp, max_attempts)
+
+
+def make_flow(flow_class):
+    users = auth_flow.MemoryUserDirectory()
+    for i in range(CLIENTS):
+        users.add(f"user{i}@example.com", 'old-password')
+    return flow_class(
+        users=SlowUsers(users),
+        otps=SlowOtps(auth_flow.StoreOtpBackend(LocalMemoryStore())),
+        tokens=auth_flow.StoredTokenBackend(ResetTokenStore(shards=[LocalMemoryStore()])),
+        expose_otp=True
+    )
+
+
+def http_response(result):
+    body = json.dumps(result.body).encode()
+    return (f"HTTP/1.1 {result.status} OK\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body
+
+
+def parse_head(head):
+    """(path, content length) from the raw request head"""
+    lines = head.decode('latin-1').split('\r\n')
+    path = lines[0].split(' ')[1]
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return path, length
+
+# ============================================================================
+# SERVERS
+# ============================================================================
+
+class SyncWorkerServer:
+    """Worker threads blocking in accept(), like gunicorn sync workers sharing a socket"""
+
+    def __init__(self, workers):
+        self.flow = make_flow(auth_flow.AuthFlow)
+        self.sock = socket.create_server(('127.0.0.1', 0), backlog=4096)
+        self.port = self.sock.getsockname()[1]
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                self._handle(conn)
+
+    def _handle(self, conn):
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+        head, _, body = data.partition(b'\r\n\r\n')
+        path, length = parse_head(head)
+        while len(body) < length:
+            body += conn.recv(4096)
+        data = json.loads(body)
+        if path == '/api/request-otp/':
+            result = self.flow.request_otp(data.get('email'))
+        else:
+            result = self.flow.verify_otp(data.get('email'), data.get('otp'))
+        conn.sendall(http_response(result))
+
+    def close(self):
+        self.sock.close()
+
+
+class AsyncServer:
+    """One event loop serving every connection"""
+
+    def __init__(self):
+        self.flow = make_flow(auth_flow.AsyncAuthFlow)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        head = await reader.readuntil(b'\r\n\r\n')
+        path, length = parse_head(head[:-4])
+        data = json.loads(await reader.readexactly(length))
+        if path == '/api/request-otp/':
+            result = await self.flow.request_otp(data.get('email'))
+        else:
+            result = await self.flow.verify_otp(data.get('email'), data.get('otp'))
+        writer.write(http_response(result))
+        await writer.drain()
+        writer.close()
+
+    def close(self):
+        self.server.close()
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+async def call(port, path, payload):
+    """One slow-uplink POST; returns (status, body, latency)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode()
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode())
+    await writer.drain()
+    await asyncio.sleep(UPLINK_DELAY)
+    writer.write(body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, raw = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ')[1]), json.loads(raw), time.perf_counter() - start
+
+
+async def client(port, i, samples):
+    email = f"user{i}@example.com"
+    status, body, latency = await call(port, '/api/request-otp/', {'email': email})
+    samples.append(latency)
+    assert status == 200, body
+    status, body, latency = await call(port, '/api/verify-otp/', {'email': email, 'otp': body['otp']})
+    samples.append(latency)
+    assert status == 200, body
+
+
+async def load(port):
+    samples = []
+    start = time.perf_counter()
+    await asyncio.wait_for(asyncio.gather(*(client(port, i, samples) for i in range(CLIENTS))),
+                           timeout=CLIENT_TIMEOUT * 2)
+    return samples, time.perf_counter() - start
+
+
+def report(name, samples, elapsed):
+    print(f"{name:<22} {format_rate(len(samples) / elapsed):>12}  "
+          f"p50 {format_latency(percentile(samples, 50)):>9}  p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+async def run_async_server():
+    server = AsyncServer()
+    await server.start()
+    try:
+        return await load(server.port)
+    finally:
+        server.close()
+
+
+def main():
+    print(f"🧪 Auth Load Test ({CLIENTS} clients x 2 requests, {BACKEND_LATENCY * 1000:.0f}ms per backend call, "
+          f"{UPLINK_DELAY * 1000:.0f}ms uplink delay)")
+    print("=" * 70)
+
+    # Keep the flow's log records out of the report
+    structured_log.configure(stream=open(os.devnull, 'w'))
+
+    server = SyncWorkerServer(SYNC_WORKERS)
+    samples, elapsed = asyncio.run(load(server.port))
+    server.close()
+    report(f"sync ({SYNC_WORKERS} workers)", samples, elapsed)
+    sync_rate = len(samples) / elapsed
+
+    samples, elapsed = asyncio.run(run_async_server())
+    report("async (1 event loop)", samples, elapsed)
+    print(f"\nThroughput gain: {len(samples) / elapsed / sync_rate:.1f}x")
+    print("\n✅ Load test complete")
+
+
+if __name__ == "__main__":
+    main()
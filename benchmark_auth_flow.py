@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Per-step latency and allocations of the auth-flow engine for each storage backend
+Run: python benchmark_auth_flow.py [users]
+
+Steps: request_otp, verify_otp, reset_password (password hashing stubbed out so only
+the flow and its storage are measured). Allocations are the peak bytes allocated during
+one call (tracemalloc), averaged over a sample of calls.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import auth_flow
+import structured_log
+from bench_utils import format_latency, latencies, percentile
+from otp_store import LocalMemoryStore, SQLiteStore
+from reset_tokens import ResetTokenStore
+from shared_otp_table import TABLE_CAPACITY, SharedOtpTable
+from signed_tokens import SignedTokenSigner, UsedTokenFilter
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+ALLOCATION_SAMPLES = 200
+
+
+def backends(tmpdir):
+    """(name, otp backend, token backend) for each configuration"""
+    yield ('memory store', auth_flow.StoreOtpBackend(LocalMemoryStore()),
+           auth_flow.StoredTokenBackend(ResetTokenStore(shards=[LocalMemoryStore()])))
+    yield ('sqlite store', auth_flow.StoreOtpBackend(SQLiteStore('otp', path=os.path.join(tmpdir, 'otp.db'))),
+           auth_flow.StoredTokenBackend(ResetTokenStore(shards=[SQLiteStore('tok', path=os.path.join(tmpdir, 't.db'))])))
+    # Sized like production so full buckets don't evict OTPs mid-run
+    capacity = max(TABLE_CAPACITY, (USERS + ALLOCATION_SAMPLES) * 8)
+    yield ('shared table + signed',
+           auth_flow.SharedTableOtpBackend(SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=capacity)),
+           auth_flow.SignedTokenBackend(SignedTokenSigner('bench-secret', used_filter=UsedTokenFilter())))
+
+
+def allocation_per_call(fn, offset):
+    """Mean peak bytes allocated inside fn(i) for ALLOCATION_SAMPLES calls"""
+    tracemalloc.start()
+    total = 0
+    for i in range(offset, offset + ALLOCATION_SAMPLES):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(i)
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - before
+    tracemalloc.stop()
+    return total / ALLOCATION_SAMPLES
+
+
+def report(step, samples, allocated):
+    print(f"  {step:<15} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}  alloc {allocated / 1024:6.1f} KB/call")
+
+
+def main():
+    print(f"🧪 Auth-Flow Step Latency ({USERS} users per step)")
+    print("=" * 60)
+    emails = [f"user{i}@example.com" for i in range(USERS + ALLOCATION_SAMPLES)]
+    # Keep the flow's log records out of the report
+    structured_log.configure(stream=open(os.devnull, 'w'))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, otps, tokens in backends(tmpdir):
+            sent, issued = {}, {}
+            users = auth_flow.MemoryUserDirectory()
+            for email in emails:
+                users.add(email, 'old-password')
+            flow = auth_flow.AuthFlow(users, otps, tokens,
+                                      send_otp=lambda email, otp, minutes: sent.__setitem__(email, otp) or True)
+
+            def request(i):
+                flow.request_otp(emails[i])
+
+            def verify(i):
+                issued[i] = flow.verify_otp(emails[i], sent[emails[i]]).body['token']
+
+            def reset(i):
+                flow.reset_password(emails[i], issued[i], 'new-password', 'new-password')
+
+            print(f"\n{name}")
+            for step, fn in (('request_otp', request), ('verify_otp', verify), ('reset_password', reset)):
+                samples = latencies(fn, USERS)
+                report(step, samples, allocation_per_call(fn, USERS))
+
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
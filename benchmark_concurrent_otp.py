@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Concurrent verify_otp: attempt-limit races and throughput by thread count
+Run: python benchmark_concurrent_otp.py [verifications per thread]
+
+race        - 16 threads guess wrong OTPs for one email; how many guesses were checked
+              against the OTP (should be MAX_OTP_ATTEMPTS). "get/replace" is the old
+              read-check-write sequence, "verify_otp" the store's atomic operation.
+throughput  - threads verifying OTPs for different emails on LocalMemoryStore with one lock
+              (stripes=1) vs lock stripes, plus SQLiteStore for reference.
+CPython's GIL runs one thread's bytecode at a time, so striping removes lock waits and
+convoys rather than adding parallel speedup; on a free-threaded build the stripes are what
+lets threads run side by side.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import otp_store
+from auth_flow import MAX_OTP_ATTEMPTS
+from shared_otp_table import INVALID, MISSING, TOO_MANY_ATTEMPTS, VERIFIED
+
+VERIFICATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+RACE_THREADS = 16
+RACE_ROUNDS = 200
+
+
+def racy_verify(store, email, otp, max_attempts):
+    """The pre-atomic StoreOtpBackend.verify(): separate get, check and replace"""
+    stored_data = store.get(email)
+    if stored_data is None:
+        return MISSING, 0
+    if stored_data['attempts'] >= max_attempts:
+        store.delete(email)
+        return TOO_MANY_ATTEMPTS, 0
+    stored_data = dict(stored_data, attempts=stored_data['attempts'] + 1)
+    time.sleep(0)  # a thread switch between check and write, as under load
+    if stored_data['otp'] == otp:
+        store.delete(email)
+        return VERIFIED, max_attempts - stored_data['attempts']
+    if not store.replace(email, stored_data):
+        return MISSING, 0
+    return INVALID, max_attempts - stored_data['attempts']
+
+
+def checked_guesses(verify):
+    """Worst round: wrong guesses checked against one OTP by RACE_THREADS threads"""
+    worst = 0
+    for _ in range(RACE_ROUNDS):
+        store = otp_store.LocalMemoryStore()
+        store.set('victim@example.com', {'otp': '123456', 'attempts': 0}, ttl=60)
+        checked = []
+        start = threading.Barrier(RACE_THREADS)
+
+        def guess(i):
+            start.wait()
+            for j in range(3):
+                status, _ = verify(store, 'victim@example.com', f'{i:03d}{j:03d}', MAX_OTP_ATTEMPTS)
+                if status == INVALID:
+                    checked.append(1)
+
+        threads = [threading.Thread(target=guess, args=(i,)) for i in range(RACE_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        worst = max(worst, len(checked))
+    return worst
+
+
+def throughput(store, threads):
+    """Verifications per second with each thread working on its own emails"""
+    per_thread = VERIFICATIONS // threads
+    for t in range(threads):
+        for i in range(per_thread):
+            store.set(f'user{t}-{i}@example.com', {'otp': '123456', 'attempts': 0}, ttl=600)
+    start = threading.Barrier(threads + 1)
+
+    def verify(t):
+        start.wait()
+        for i in range(per_thread):
+            store.verify_otp(f'user{t}-{i}@example.com', '000000' if i % 4 else '123456', MAX_OTP_ATTEMPTS)
+
+    workers = [threading.Thread(target=verify, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    began = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - began)
+
+
+def main():
+    print(f"🧪 Concurrent OTP Verification ({os.cpu_count()} CPU, {VERIFICATIONS} verifications per run)")
+    print("=" * 60)
+    print(f"\nrace: {RACE_THREADS} threads x 3 wrong guesses, worst of {RACE_ROUNDS} rounds "
+          f"(limit {MAX_OTP_ATTEMPTS})")
+    print(f"  get/replace   {checked_guesses(racy_verify):>3} guesses checked")
+    print(f"  verify_otp    {checked_guesses(lambda store, *args: store.verify_otp(*args)):>3} guesses checked")
+
+    print("\nthroughput (verifications/s)")
+    print(f"  {'threads':<22}" + ''.join(f"{count:>10}" for count in THREAD_COUNTS))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configs = [
+            ('memory, 1 lock', lambda: otp_store.LocalMemoryStore(stripes=1)),
+            ('memory, 16 stripes', lambda: otp_store.LocalMemoryStore(stripes=16)),
+            ('sqlite', lambda: otp_store.SQLiteStore('otp', path=os.path.join(tmpdir, 'store.sqlite3'))),
+        ]
+        for name, make_store in configs:
+            row = []
+            for count in THREAD_COUNTS:
+                store = make_store()
+                store.clear()
+                row.append(throughput(store, count))
+            print(f"  {name:<22}" + ''.join(f"{rate:>10,.0f}" for rate in row))
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: full-scan cleanup_expired_tokens() vs timing-wheel expiry
+Run: python benchmark_expiry_wheel.py [sizes...]   (default 10000 100000 1000000)
+
+For each number of live tokens it reports:
+  - scan:     cost of one full dict scan (what verify_otp paid on every success)
+  - schedule: O(1) insert cost into the wheel
+  - tick:     cost of one reaper tick when 1/600 of the tokens expire (10 min TTL, 1s tick)
+"""
+
+import random
+import sys
+import time
+
+from bench_utils import format_latency, format_rate
+from expiry_wheel import TimingWheel
+
+SIZES = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+TOKEN_TTL_SECONDS = 600
+
+
+def full_scan(token_storage, current_time):
+    """The original cleanup_expired_tokens() loop (nothing expired: pure scan cost)"""
+    expired_emails = []
+    for email, data in token_storage.items():
+        if current_time > data['expires_at']:
+            expired_emails.append(email)
+    for email in expired_emails:
+        del token_storage[email]
+
+
+def benchmark_size(size):
+    rng = random.Random(size)
+    start_time = 1_000_000.0
+    deadlines = [start_time + rng.uniform(1, TOKEN_TTL_SECONDS) for _ in range(size)]
+    keys = [f"user{i}@example.com" for i in range(size)]
+
+    token_storage = {key: {'token': 'x', 'expires_at': deadline} for key, deadline in zip(keys, deadlines)}
+    start = time.perf_counter()
+    full_scan(token_storage, start_time)
+    scan_cost = time.perf_counter() - start
+
+    wheel = TimingWheel(tick=1.0, start=start_time)
+    start = time.perf_counter()
+    for key, deadline in zip(keys, deadlines):
+        wheel.schedule(key, deadline)
+    schedule_rate = size / (time.perf_counter() - start)
+
+    tick_costs = []
+    expired_total = 0
+    for t in range(1, TOKEN_TTL_SECONDS + 1):
+        start = time.perf_counter()
+        expired_total += len(wheel.advance(start_time + t))
+        tick_costs.append(time.perf_counter() - start)
+    assert expired_total == size
+
+    mean_tick = sum(tick_costs) / len(tick_costs)
+    print(f"{size:>9,} live  scan {format_latency(scan_cost):>10}  "
+          f"schedule {format_rate(schedule_rate):>14}  "
+          f"tick mean {format_latency(mean_tick):>10}  max {format_latency(max(tick_costs)):>10}  "
+          f"per expired key {format_latency(sum(tick_costs) / size):>8}")
+
+
+def main():
+    print("🧪 Expiry Engine Benchmark")
+    print("=" * 50)
+    print("scan = cost added to every successful verify_otp before; the wheel runs off the request path\n")
+    for size in SIZES:
+        benchmark_size(size)
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
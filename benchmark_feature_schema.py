@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Feature decoding cost per row: hand normalization vs the compiled FEATURE_SCHEMA
+Run: python benchmark_feature_schema.py [rows]
+
+munged  - what a view has to do without the schema: rebuild every row as a Kotlin-spelled
+          dict (rename keys, "Yes"/"No" -> 1/0), then read it field by field into a list
+          matrix converted once
+schema  - risk_scoring.encode_rows: one pass over each row's items into a preallocated buffer
+Rows in both spellings: Kotlin SymptomFeatures (Tobacco_Use: 1) and form labels ("Tobacco Use": "Yes").
+"""
+
+import sys
+import time
+
+from risk_scoring import FEATURE_COLUMNS, FLAG_COLUMNS, GENDER_CODES, encode_rows, np
+from test_risk_scoring import LABEL_SPELLINGS, label_row, random_rows
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+KOTLIN_NAMES = {label: name for name, label in LABEL_SPELLINGS.items()}
+YES_NO = {'Yes': 1, 'No': 0}
+
+
+def munged_encode_rows(rows):
+    matrix = []
+    for features in rows:
+        normalized = {KOTLIN_NAMES.get(key, key): YES_NO.get(value, value) for key, value in features.items()}
+        row = [0] * len(FEATURE_COLUMNS)
+        row[0] = int(normalized['Age'])
+        row[1] = GENDER_CODES.get(normalized.get('Gender'), 0)
+        for column, name in enumerate(FLAG_COLUMNS, 2):
+            row[column] = 1 if int(normalized.get(name) or 0) else 0
+        matrix.append(row)
+    return np.array(matrix, dtype=np.int32) if np is not None else matrix
+
+
+def per_row_us(fn, rows, repeat=5):
+    """Best-of-repeat time of fn() divided by rows, in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def main():
+    kotlin = random_rows(ROWS)
+    labels = [label_row(row) for row in kotlin]
+    print(f"🧪 Feature Decoding Cost per Row ({'numpy' if np is not None else 'python'}, {ROWS} rows)")
+    print("=" * 60)
+    print(f"  {'':<22}{'one row':>12}{'batch':>12}")
+    for spelling, rows in (('Kotlin', kotlin), ('form labels', labels)):
+        for name, encode in (('munged', munged_encode_rows), ('schema', encode_rows)):
+            one = per_row_us(lambda: [encode([row]) for row in rows], ROWS)
+            batch = per_row_us(lambda: encode(rows), ROWS)
+            print(f"  {spelling + ' / ' + name:<22}{one:>10.2f}µs{batch:>10.2f}µs")
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
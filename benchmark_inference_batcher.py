@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+/api/predict/ model calls: one call per request vs micro-batched, at 1, 16 and 128 clients
+Run: python benchmark_inference_batcher.py [seconds per run]
+
+Each client is a thread (like gunicorn --threads) sending requests back to back for the
+run; a request encodes nothing, it only calls the model for its row.
+  unbatched      - model.predict() on a 1-row matrix per request
+  batched 0ms    - MicroBatcher(window=0): rows that queue up during a call share the next one
+  batched 2ms    - MicroBatcher(window=2ms): also waits up to 2 ms for more rows
+Models:
+  rules          - RiskModel (a few µs per call; little fixed cost to amortise)
+  native 0.5ms   - RiskModel plus 0.5 ms fixed cost (+1 µs per row) per call on one device
+                   with the GIL released: the shape of a compiled inference runtime
+                   (onnxruntime, torch) that runs one call at a time on this worker's core
+"""
+
+import sys
+import threading
+import time
+
+from bench_utils import format_latency, percentile
+from inference_batcher import MicroBatcher
+from risk_scoring import RiskModel, encode_rows, np
+from test_risk_scoring import random_rows
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+CLIENT_COUNTS = (1, 16, 128)
+
+
+class NativeModel:
+    """RiskModel behind a fixed per-call cost on a single device, without holding the GIL"""
+
+    def __init__(self, overhead=0.0005, per_row=0.000001):
+        self.model = RiskModel()
+        self.overhead = overhead
+        self.per_row = per_row
+        self._device = threading.Lock()
+
+    def predict(self, matrix):
+        with self._device:
+            time.sleep(self.overhead + self.per_row * len(matrix))
+        return self.model.predict(matrix)
+
+
+def run(call, rows, clients):
+    """Requests per second and per-request latencies with `clients` threads for SECONDS"""
+    latencies = [[] for _ in range(clients)]
+    start = threading.Barrier(clients + 1)
+    stop = threading.Event()
+
+    def client(c):
+        samples = latencies[c]
+        row = rows[c % len(rows)]
+        start.wait()
+        while not stop.is_set():
+            began = time.perf_counter()
+            call(row)
+            samples.append(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    time.sleep(SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    samples = [sample for client_samples in latencies for sample in client_samples]
+    return len(samples) / SECONDS, samples
+
+
+def main():
+    rows = [list(map(int, row)) for row in encode_rows(random_rows(256))]
+    print(f"🧪 Micro-Batched vs Unbatched Predict ({SECONDS:.0f}s per run, {'numpy' if np is not None else 'python'})")
+    print("=" * 72)
+    for model_name, model in (('rules', RiskModel()), ('native 0.5ms', NativeModel())):
+        print(f"\n{model_name}")
+        print(f"  {'':<14}" + ''.join(f"{f'{count} client(s)':>28}" for count in CLIENT_COUNTS))
+        if np is not None:
+            def unbatched(row):
+                return model.predict(np.array([row], dtype=np.int32))
+        else:
+            def unbatched(row):
+                return model.predict([row])
+        for mode_name, window in (('unbatched', None), ('batched 0ms', 0.0), ('batched 2ms', 0.002)):
+            cells, batch_sizes = [], []
+            for clients in CLIENT_COUNTS:
+                if window is None:
+                    rate, samples = run(unbatched, rows, clients)
+                else:
+                    batcher = MicroBatcher(model.predict, window=window, max_batch=128)
+                    rate, samples = run(batcher.submit, rows, clients)
+                    batch_sizes.append(f"{batcher.stats()['mean_batch_size']:.0f}")
+                    batcher.close()
+                cells.append(f"{rate:>9,.0f}/s p99 {format_latency(percentile(samples, 99)):>8}")
+            line = f"  {mode_name:<14}" + ''.join(f"{cell:>28}" for cell in cells)
+            if batch_sizes:
+                line += f"   (mean batch {'/'.join(batch_sizes)})"
+            print(line)
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+JSON parse/render cost per request: what the views did vs fast_json
+Run: python benchmark_json.py [image_megabytes]
+
+before  - json.loads(request.body) in the rate-limit decorator and again in the view (login,
+          request-otp), once elsewhere; responses rendered by DRF's stdlib encoder
+after   - one parse per request through request_json (fast_json: orjson, or the stdlib fallback)
+Payloads: login request/response, and an /api/oral-cancer-detect/ body carrying a base64 image.
+"""
+
+import base64
+import json
+import os
+import sys
+
+import fast_json
+from bench_utils import format_latency, latencies, percentile
+from test_fast_json import stdlib_backend
+
+IMAGE_MB = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+
+LOGIN_BODY = json.dumps({'email': 'user@example.com', 'password': 'password123'}).encode()
+LOGIN_RESPONSE = {
+    'message': 'Login successful',
+    'token': 'x' * 43,
+    'user': {'id': 42, 'email': 'user@example.com', 'username': 'user'},
+}
+DETECT_RESPONSE = {'prediction': 'Benign', 'confidence': 0.93, 'risk_level': 'Low Risk',
+                   'probabilities': {'Benign': 0.93, 'Malignant': 0.07}}
+
+
+def drf_render(data):
+    # rest_framework.renderers.JSONRenderer defaults: compact, UTF-8
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def report(name, samples):
+    print(f"  {name:<28} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+def compare(title, body, response, parses_before, n):
+    print(f"\n{title} ({len(body) / 1024:,.1f} KB body)")
+
+    def before(i):
+        for _ in range(parses_before):
+            json.loads(body)
+        drf_render(response)
+
+    report(f"before (json.loads x{parses_before})", latencies(before, n))
+    for backend in BACKENDS:
+        report(f"after ({backend.BACKEND})", latencies(lambda i: (backend.loads(body), backend.dumps(response)), n))
+
+
+def main():
+    global BACKENDS
+    fallback = stdlib_backend()
+    BACKENDS = [fast_json, fallback] if fast_json.BACKEND == 'orjson' else [fallback]
+    print(f"🧪 JSON Parse + Render per Request (fast_json backend: {fast_json.BACKEND})")
+    print("=" * 60)
+    image = base64.b64encode(os.urandom(int(IMAGE_MB * 1024 * 1024 * 3 / 4))).decode()
+    detect_body = json.dumps({'image': f'data:image/jpeg;base64,{image}', 'format': 'jpeg'}).encode()
+
+    compare("login", LOGIN_BODY, LOGIN_RESPONSE, parses_before=2, n=50000)
+    compare("oral-cancer-detect", detect_body, DETECT_RESPONSE, parses_before=1, n=50)
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Lookup table vs live model for /api/predict/
+Run: python benchmark_lookup_table.py [rows]
+
+single row  - what one /api/predict/ request costs after encoding: the live model on a
+              1-row matrix vs LookupTableModel.predict_row (one index, one array read)
+batch       - predict() over `rows` rows (per row)
+Also reported: table build and verification time (paid once at model load) and memory.
+"""
+
+import sys
+import time
+
+from bench_utils import format_latency, latencies, percentile
+from lookup_table import CHECK_AGES, LookupTableModel
+from risk_scoring import RiskModel, encode_rows, np
+from test_risk_scoring import random_rows
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(name, samples):
+    print(f"  {name:<22} p50 {format_latency(percentile(samples, 50)):>9}  p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+def main():
+    print(f"🧪 Lookup Table vs Live Model ({'numpy' if np is not None else 'python'}, {ROWS} rows)")
+    print("=" * 60)
+    model = RiskModel()
+    table, build_seconds = timed(lambda: LookupTableModel.build(model))
+    mismatches, verify_seconds = timed(lambda: table.verify(model))
+    print(f"\ntable: {len(table)} entries, {table.nbytes / 1024:.1f} KB, bands {table.age_bands}")
+    print(f"  build {build_seconds * 1000:.1f} ms; verify {verify_seconds * 1000:.1f} ms over "
+          f"{len(CHECK_AGES)} ages x {len(table) // len(table.age_bands)} combinations: {mismatches} mismatches")
+
+    matrix = encode_rows(random_rows(ROWS))
+    rows = [list(map(int, row)) for row in matrix]
+    one_row = [matrix[i:i + 1] for i in range(len(rows))]
+
+    print("\nsingle row")
+    report("live model", latencies(lambda i: model.predict(one_row[i]), ROWS))
+    report("table predict_row", latencies(lambda i: table.predict_row(rows[i]), ROWS))
+
+    print("\nbatch (per row)")
+    for name, predictor in (("live model", model), ("table", table)):
+        _, seconds = timed(lambda: predictor.predict(matrix))
+        print(f"  {name:<22} {seconds / ROWS * 1e9:>7.1f}ns")
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
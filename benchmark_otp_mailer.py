@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+request_otp latency with synchronous email vs the mail queue
+Run: python benchmark_otp_mailer.py [requests] [smtp latency ms]
+
+Both variants store the OTP in a LocalMemoryStore, then:
+  sync   - open an SMTP connection, send, quit (what send_mail() does per call)
+  queued - enqueue the message; pooled workers deliver it in the background
+The SMTP stand-in adds a fixed delay per message to mimic a real relay.
+"""
+
+import random
+import smtplib
+import string
+import sys
+import time
+
+from bench_utils import format_latency, latencies, percentile
+from otp_mailer import MailQueue, build_otp_message, smtp_connector
+from otp_store import LocalMemoryStore
+from smtp_standin import SMTPStandIn
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+SMTP_LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000.0
+
+
+def report(name, samples):
+    print(f"{name:<7} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+def main():
+    print(f"🧪 request_otp Latency ({REQUESTS} requests, SMTP {SMTP_LATENCY * 1000:.0f}ms/message)")
+    print("=" * 50)
+    server = SMTPStandIn(latency=SMTP_LATENCY).start()
+    otp_storage = LocalMemoryStore()
+
+    def request_otp(i, send):
+        email = f"user{i}@example.com"
+        otp = ''.join(random.choices(string.digits, k=6))
+        otp_storage.set(email, {'otp': otp, 'attempts': 0}, ttl=300)
+        send(build_otp_message(email, otp))
+
+    def send_sync(message):
+        with smtplib.SMTP('127.0.0.1', server.port, timeout=10) as connection:
+            connection.send_message(message)
+
+    report('sync', latencies(lambda i: request_otp(i, send_sync), REQUESTS))
+
+    mailer = MailQueue(smtp_connector('127.0.0.1', server.port), workers=2)
+    delivered_before = len(server.messages)
+    report('queued', latencies(lambda i: request_otp(i, mailer.enqueue), REQUESTS))
+
+    start = time.perf_counter()
+    while len(server.messages) - delivered_before < REQUESTS:
+        time.sleep(0.01)
+    print(f"\n📬 Queue drained {REQUESTS} emails {time.perf_counter() - start:.2f}s after the last request; "
+          f"stats {mailer.stats()}")
+    mailer.close()
+    server.stop()
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
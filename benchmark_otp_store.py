@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark get/set/expire throughput for every otp_store backend
+Run: python benchmark_otp_store.py [iterations]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import otp_store
+from bench_utils import ops_per_second, format_rate
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+MANAGER_ADDRESS = '127.0.0.1:50555'
+
+
+def build_stores(tmpdir):
+    """Create one store per backend"""
+    manager = multiprocessing.Process(
+        target=otp_store.serve_store, args=(MANAGER_ADDRESS,), daemon=True
+    )
+    manager.start()
+    time.sleep(0.5)
+
+    stores = {
+        'memory': otp_store.LocalMemoryStore(),
+        'manager': otp_store.ManagerStore('bench', address=MANAGER_ADDRESS),
+        'sqlite': otp_store.SQLiteStore('bench', path=os.path.join(tmpdir, 'bench.sqlite3')),
+    }
+    return stores, manager
+
+
+def benchmark_store(name, store):
+    """Measure set, get (hit), get (miss) and expire for one store"""
+    value = {'otp': '123456', 'timestamp': time.time(), 'attempts': 0}
+    keys = [f"user{i}@example.com" for i in range(ITERATIONS)]
+
+    set_rate = ops_per_second(lambda i: store.set(keys[i], value, ttl=300), ITERATIONS)
+    get_rate = ops_per_second(lambda i: store.get(keys[i]), ITERATIONS)
+    miss_rate = ops_per_second(lambda i: store.get(f"missing{i}"), ITERATIONS)
+
+    # Re-insert everything with a TTL that is already over, then purge
+    for key in keys:
+        store.set(key, value, ttl=-1)
+    start = time.perf_counter()
+    removed = store.expire()
+    expire_rate = removed / (time.perf_counter() - start) if removed else 0.0
+
+    print(f"{name:<8} set {format_rate(set_rate):>14}  get {format_rate(get_rate):>14}  "
+          f"miss {format_rate(miss_rate):>14}  expire {format_rate(expire_rate):>14}")
+    store.clear()
+
+
+def main():
+    print("🧪 OTP Store Benchmark")
+    print("=" * 50)
+    print(f"Iterations per operation: {ITERATIONS}\n")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stores, manager = build_stores(tmpdir)
+        try:
+            for name, store in stores.items():
+                benchmark_store(name, store)
+        finally:
+            manager.terminate()
+
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Cost of request metrics: recording one request, and rendering /metrics
+Run: python benchmark_request_metrics.py [requests] [workers]
+
+record  - what RequestMetricsMiddleware adds to every request (histogram, status, DB and byte
+          counters into this worker's mmap file)
+scrape  - aggregate() over `workers` worker files plus render_prometheus(), i.e. one /metrics call
+
+Worker files are named after live stand-in processes so aggregate() reads them as running
+workers instead of folding them into the retired file.
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from bench_utils import format_latency, latencies, percentile
+from request_metrics import WorkerMetrics, aggregate, render_prometheus
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+ROUTES = ['api/login/', 'api/logout/', 'api/request-otp/', 'api/verify-otp/', 'api/reset-password/',
+          'api/profile/', 'api/predict/', 'api/oral-cancer-detect/', 'api/oral-cancer-chat/']
+STATUSES = [200] * 8 + [400, 401, 404, 429, 500]
+
+
+def report(name, samples):
+    print(f"{name:<8} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+def main():
+    print(f"🧪 Request Metrics Overhead ({REQUESTS} requests, {WORKERS} worker files, {len(ROUTES)} routes)")
+    print("=" * 60)
+    standins = [subprocess.Popen(['sleep', '600']) for _ in range(WORKERS)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workers = [WorkerMetrics(os.path.join(tmpdir, f'metrics-{p.pid}.bin')) for p in standins]
+        requests = [(random.choice(ROUTES), random.choice(STATUSES), int(random.lognormvariate(16, 1)))
+                    for _ in range(REQUESTS)]
+        metrics = workers[0]
+
+        def record(i):
+            route, status, latency_ns = requests[i]
+            metrics.record(route, status, latency_ns, db_queries=2, db_time_ns=latency_ns // 4,
+                           request_bytes=80, response_bytes=300)
+
+        report("record", latencies(record, REQUESTS))
+        for worker in workers[1:]:
+            for route, status, latency_ns in requests[:1000]:
+                worker.record(route, status, latency_ns)
+
+        samples = latencies(lambda i: render_prometheus(aggregate(tmpdir)), 50)
+        report("scrape", samples)
+        text = render_prometheus(aggregate(tmpdir))
+        print(f"\n/metrics: {len(text.splitlines())} lines, {len(text) / 1024:.1f} KB; "
+              f"{os.path.getsize(metrics.path) / 1024:.0f} KB file per worker (sparse)")
+        for worker in workers:
+            worker.close()
+    for standin in standins:
+        standin.kill()
+        standin.wait()
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
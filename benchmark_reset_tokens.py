@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Latency comparison of reset-token validation paths
+Run: python benchmark_reset_tokens.py [iterations]
+
+  dict      - original token_storage[email] dict compare (single worker only)
+  memory    - digest-indexed ResetTokenStore on LocalMemoryStore
+  sqlite    - digest-indexed ResetTokenStore on the shared SQLite store
+  signed    - stateless HMAC token + used-token filter (no storage round-trip)
+"""
+
+import os
+import secrets
+import sys
+import tempfile
+
+import otp_store
+from bench_utils import format_latency, latencies, percentile
+from reset_tokens import ResetTokenStore
+from signed_tokens import SignedTokenSigner, UsedTokenFilter
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def report(name, samples):
+    print(f"{name:<8} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}")
+
+
+def main():
+    print("🧪 Reset Token Validation Latency")
+    print("=" * 50)
+    emails = [f"user{i}@example.com" for i in range(ITERATIONS)]
+
+    token_storage = {}
+    for email in emails:
+        token_storage[email] = {'token': secrets.token_urlsafe(32)}
+    dict_tokens = [token_storage[email]['token'] for email in emails]
+    report('dict', latencies(lambda i: token_storage[emails[i]]['token'] == dict_tokens[i], ITERATIONS))
+
+    memory_store = ResetTokenStore(shards=[otp_store.LocalMemoryStore()])
+    memory_tokens = [memory_store.issue(email) for email in emails]
+    report('memory', latencies(lambda i: memory_store.resolve(memory_tokens[i]) == emails[i], ITERATIONS))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sqlite_store = ResetTokenStore(shards=[otp_store.SQLiteStore('bench', path=os.path.join(tmpdir, 's.db'))])
+        sqlite_tokens = [sqlite_store.issue(email) for email in emails]
+        report('sqlite', latencies(lambda i: sqlite_store.resolve(sqlite_tokens[i]) == emails[i], ITERATIONS))
+
+        signer = SignedTokenSigner('bench-secret', used_filter=UsedTokenFilter(path=os.path.join(tmpdir, 'u.bin')))
+        signed_tokens = [signer.sign(email, bind='pbkdf2_sha256$hash') for email in emails]
+        report('signed', latencies(lambda i: signer.verify(signed_tokens[i], emails[i], bind='pbkdf2_sha256$hash'),
+                                   ITERATIONS))
+
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
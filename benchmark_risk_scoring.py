@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Risk scoring cost per row: one row per call vs whole batches
+Run: python benchmark_risk_scoring.py [rows]
+
+per row      - encode_rows([row]) + predict(), what /api/predict/ does per request
+batch        - encode_rows(rows) + predict() over all rows, what /api/predict/batch/ does
+predict only - predict() on an already-encoded matrix (the vectorized scoring itself)
+Backends: numpy (when installed) and the plain-Python fallback.
+"""
+
+import sys
+import time
+
+import risk_scoring
+from test_risk_scoring import python_backend, random_rows
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+
+def per_row_us(fn, rows, repeat=3):
+    """Best-of-repeat time of fn() divided by rows, in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def main():
+    backends = [risk_scoring, python_backend()] if risk_scoring.np is not None else [python_backend()]
+    rows = random_rows(ROWS)
+    print(f"🧪 Risk Scoring Cost per Row ({ROWS} rows)")
+    print("=" * 60)
+    print(f"  {'':<10}{'per row':>12}{'batch':>12}{'predict only':>14}")
+    for backend in backends:
+        model = backend.RiskModel()
+        matrix = backend.encode_rows(rows)
+        name = 'numpy' if getattr(backend, 'np', None) is not None else 'python'
+
+        def one_at_a_time():
+            for row in rows:
+                model.predict(backend.encode_rows([row]))
+
+        one = per_row_us(one_at_a_time, ROWS)
+        batch = per_row_us(lambda: model.predict(backend.encode_rows(rows)), ROWS)
+        predict = per_row_us(lambda: model.predict(matrix), ROWS)
+        print(f"  {name:<10}{one:>10.2f}µs{batch:>10.2f}µs{predict:>12.3f}µs")
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
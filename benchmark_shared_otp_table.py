@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark the mmap shared OTP table against the old dict-of-dicts otp_storage
+Run: python benchmark_shared_otp_table.py [entries]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from bench_utils import format_rate, ops_per_second
+from shared_otp_table import SLOT, SharedOtpTable
+
+ENTRIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+
+def dict_bytes_per_entry(emails):
+    """Allocated bytes per entry of the original otp_storage layout"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    otp_storage = {}
+    for i, email in enumerate(emails):
+        otp_storage[email] = {
+            'otp': str(100000 + i),
+            'timestamp': datetime.now(),
+            'attempts': 0
+        }
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / len(emails)
+
+
+def main():
+    print("🧪 Shared OTP Table Benchmark")
+    print("=" * 50)
+    emails = [f"user{i}@example.com" for i in range(ENTRIES)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=ENTRIES * 2)
+
+        put_rate = ops_per_second(lambda i: table.put(emails[i], '123456', ttl=300), ENTRIES)
+        get_rate = ops_per_second(lambda i: table.get(emails[i]), ENTRIES)
+        verify_rate = ops_per_second(lambda i: table.verify(emails[i], '123456'), ENTRIES)
+
+        print(f"put    {format_rate(put_rate):>14}")
+        print(f"get    {format_rate(get_rate):>14}")
+        print(f"verify {format_rate(verify_rate):>14}")
+        table.close()
+
+    dict_bytes = dict_bytes_per_entry(emails)
+    print(f"\n💾 dict-of-dicts otp_storage: {dict_bytes:.0f} bytes/entry (per worker)")
+    print(f"💾 shared table slot:         {SLOT.size} bytes/entry (once per host, at 50% load "
+          f"{SLOT.size * 2} bytes/entry)")
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Per-request logging overhead: print() vs the queued structured logger
+Run: python benchmark_structured_log.py [requests]
+
+Output goes to a pipe drained by another thread, like stdout under gunicorn/docker
+with a log collector on the other end.
+  print x8         - the eight console lines login() used to print
+  logger x8        - the same eight records through structured_log
+  logger (login)   - what login() logs now: one INFO record, one DEBUG record (gated off)
+  logger sampled   - the same with the login endpoint sampled at 10%
+"""
+
+import os
+import sys
+import threading
+
+import structured_log
+from bench_utils import format_latency, latencies, percentile
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def drained_pipe():
+    """Line-buffered text stream whose reader discards everything"""
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while os.read(read_fd, 65536):
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    return os.fdopen(write_fd, 'w', buffering=1)
+
+
+def report(name, samples):
+    print(f"{name:<16} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}  mean {format_latency(sum(samples) / len(samples)):>9}")
+
+
+def main():
+    print(f"🧪 Logging Overhead per Login Request ({REQUESTS} requests)")
+    print("=" * 60)
+    console = drained_pipe()
+    structured_log.configure(level='INFO', stream=drained_pipe())
+    log = structured_log.get_logger('login')
+    email, password = "user@example.com", "password123"
+
+    def print_x8(i):
+        print("=== Login Request Started ===", file=console)
+        print(f"📧 Email received: {email}", file=console)
+        print(f"🔐 Password length: {len(password)}", file=console)
+        print(f"✅ User found: user (ID: {i})", file=console)
+        print("📅 User date joined: 2024-01-01 00:00:00+00:00", file=console)
+        print("📅 User last login: 2024-06-01 00:00:00+00:00", file=console)
+        print("✅ User is_active: True", file=console)
+        print(f"✅ Login successful for: {email}", file=console)
+
+    def logger_x8(i):
+        log.info('login_started')
+        log.info('email_received', email=email)
+        log.info('password_received', password=password)
+        log.info('user_found', user_id=i)
+        log.info('date_joined', date_joined='2024-01-01 00:00:00+00:00')
+        log.info('last_login', last_login='2024-06-01 00:00:00+00:00')
+        log.info('user_active', is_active=True)
+        log.info('login_succeeded', email=email, user_id=i)
+
+    def logger_login(i):
+        log.debug('user_found', email=email, user_id=i, last_login=None)
+        log.info('login_succeeded', email=email, user_id=i)
+
+    report("print x8", latencies(print_x8, REQUESTS))
+    report("logger x8", latencies(logger_x8, REQUESTS))
+    structured_log.log_writer.flush()
+    report("logger (login)", latencies(logger_login, REQUESTS))
+    structured_log.configure(sample_rates={'login': 0.1})
+    report("logger sampled", latencies(logger_login, REQUESTS))
+    structured_log.log_writer.flush()
+
+    stats = structured_log.log_stats()
+    print(f"\nwriter: {stats['written']} written, {stats['dropped']} dropped (queue full), "
+          f"{stats['sampled_out']['login']} sampled out")
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Per-request UPDATE vs write-behind batching for last_activity timestamps
+Run: python benchmark_write_behind.py [requests] [distinct sessions]
+
+Simulates authenticated requests against a SQLite user_sessions table:
+  direct        - one UPDATE + commit per request (what touching last_activity inline costs)
+  write-behind  - request queues the timestamp; one executemany per flush
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench_utils import format_latency, latencies, percentile
+from write_behind import WriteBehindBuffer
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+SESSIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+
+def open_db(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE user_sessions (id INTEGER PRIMARY KEY, last_activity REAL)")
+    conn.executemany("INSERT INTO user_sessions VALUES (?, 0)", [(i,) for i in range(SESSIONS)])
+    conn.commit()
+    return conn
+
+
+def report(name, samples, writes):
+    print(f"{name:<13} p50 {format_latency(percentile(samples, 50)):>9}  "
+          f"p99 {format_latency(percentile(samples, 99)):>9}  row writes {writes}")
+
+
+def main():
+    print("🧪 last_activity Write Cost")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = open_db(os.path.join(tmpdir, 'direct.db'))
+
+        def direct(i):
+            conn.execute("UPDATE user_sessions SET last_activity = ? WHERE id = ?", (time.time(), i % SESSIONS))
+            conn.commit()
+
+        report('direct', latencies(direct, REQUESTS), REQUESTS)
+        conn.close()
+
+        conn = open_db(os.path.join(tmpdir, 'buffered.db'))
+
+        def flush(batch):
+            conn.executemany("UPDATE user_sessions SET last_activity = ? WHERE id = ?",
+                             [(value, key) for key, value in batch.items()])
+            conn.commit()
+
+        buffer = WriteBehindBuffer(flush, interval_ms=100, name='bench-writer')
+        samples = latencies(lambda i: buffer.add(i % SESSIONS, time.time()), REQUESTS)
+        buffer.close()
+        report('write-behind', samples, buffer.stats()['rows_written'])
+        conn.close()
+
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -64,7 +64,7 @@ def check_models():
             with connection.cursor() as cursor:
                 cursor.execute("""
                     SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name='your_app_passwordresetotp'
+                    WHERE type='table' AND name='otp_verifications'
                 """)
                 tables = cursor.fetchall()
                 if tables:
@@ -73,10 +73,19 @@ def check_models():
                     print("❌ PasswordResetOTP table missing")
                     
                 # Check table structure
-                cursor.execute("PRAGMA table_info(your_app_passwordresetotp)")
+                cursor.execute("PRAGMA table_info(otp_verifications)")
                 columns = cursor.fetchall()
                 print(f"📋 Table columns: {[col[1] for col in columns]}")
                 
+                # Check indexes used by verify_otp and the purge job
+                cursor.execute("PRAGMA index_list(otp_verifications)")
+                indexes = [row[1] for row in cursor.fetchall()]
+                for index_name in ('idx_otp_email_purpose', 'idx_otp_unused', 'idx_otp_expires_at'):
+                    if index_name in indexes:
+                        print(f"✅ Index {index_name} exists")
+                    else:
+                        print(f"❌ Index {index_name} missing")
+                
         except Exception as e:
             print(f"❌ Table check failed: {e}")
             
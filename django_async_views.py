@@ -0,0 +1,194 @@
+"""
+Django Async (ASGI) Views for Login and Password Reset
+Add this to your views.py (or a separate async_views.py) and serve the project with an
+ASGI server instead of gunicorn's sync workers:
+
+    uvicorn your_project.asgi:application --workers 4          # CHANGE THIS
+    # or: gunicorn your_project.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+Same URLs, request bodies and responses as django_login_fix.py and
+django_complete_token_fix.py, so the Android client needs no change. Requires Django 5.0+
+(async-aware csrf_exempt / require_POST and the async ORM).
+
+Why: RetrofitClient waits up to 60 seconds and retries on connection failure. Under sync
+workers every slow or retried request holds a worker until it finishes. Here a request that
+is waiting (on the client, the database, the password pool) is a suspended coroutine, so
+one worker process holds thousands of connections:
+- database: async ORM (aget / afirst / aupdate / asave)
+- shared store: otp_store a-methods (SQLite/manager calls run in worker threads)
+- password hashing: the hashing process pool, awaited (password_hashing.averify_*)
+- mail: the OTP mail queue (enqueue never waits)
+
+Load test: python benchmark_async_auth.py
+"""
+
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from django_auth_flow import async_auth_flow_engine, bearer_token
+from django_json import json_response, request_json  # or: from .drf_json import ...
+from django_password_hashers import arecord_password_upgrade  # or: from .hashers import ...
+from django_rate_limit import LOGIN_LIMITS, REQUEST_OTP_LIMITS, rate_limit  # or: from .ratelimit import ...
+from django_session_auth import acreate_session, record_login  # or: from .auth import ...
+from django_user_cache import aget_user_by_email, aload_password  # or: from .user_cache import ...
+from password_hashing import PASSWORD_POOL_RETRY_AFTER, HashingPoolBusy, averify_and_upgrade_password
+from structured_log import get_logger
+
+login_log = get_logger('login')
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def flow_response(result):
+    """FlowResult -> JSON HttpResponse"""
+    return json_response(result.body, result.status, result.headers)
+
+
+def invalid_json():
+    return json_response({'error': 'Invalid JSON in request body'}, 400)
+
+
+def server_error(step, e):
+    get_logger(step).exception('unhandled_error', error=str(e))
+    return json_response({'error': f'Internal server error: {str(e)}'}, 500)
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@csrf_exempt
+@require_POST
+@rate_limit(LOGIN_LIMITS)
+async def login(request):
+    """
+    User login endpoint (async version of django_login_fix.login)
+    Returns authentication token on success
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    try:
+        email = (data.get('email') or '').strip().lower()
+        password = data.get('password') or ''
+
+        if not email:
+            return json_response({'error': 'Email is required'}, 400)
+        if not password:
+            return json_response({'error': 'Password is required'}, 400)
+
+        user = await aget_user_by_email(email)
+        if user is None:
+            login_log.info('login_failed', email=email, reason='unknown_email')
+            return json_response({'error': 'Invalid email or password'}, 401)
+
+        if not user.is_active:
+            login_log.info('login_failed', email=email, reason='inactive')
+            return json_response({'error': 'Account is inactive. Please contact support.'}, 403)
+
+        try:
+            password_ok, upgraded_hash = await averify_and_upgrade_password(password, await aload_password(user))
+        except HashingPoolBusy:
+            login_log.warning('hashing_pool_busy', email=email)
+            return json_response(
+                {'error': 'Too many login attempts in progress. Please try again.'}, 503,
+                {'Retry-After': str(PASSWORD_POOL_RETRY_AFTER)}
+            )
+
+        if not password_ok:
+            login_log.info('login_failed', email=email, reason='bad_password')
+            return json_response({'error': 'Invalid email or password'}, 401)
+
+        if upgraded_hash and await arecord_password_upgrade(user, upgraded_hash):
+            login_log.info('password_rehashed', email=email)
+
+        # Only queues the timestamp (write-behind), never waits on the database
+        record_login(user)
+        token = await acreate_session(user, request)
+
+        login_log.info('login_succeeded', email=email, user_id=user.id)
+        return json_response({
+            'message': 'Login successful',
+            'token': token,
+            'user': {
+                'id': user.id,
+                'email': user.email,
+                'username': user.username
+            }
+        }, 200)
+    except Exception as e:
+        return server_error("login", e)
+
+
+@csrf_exempt
+@require_POST
+@rate_limit(REQUEST_OTP_LIMITS)
+async def request_otp(request):
+    """
+    Request OTP endpoint
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    try:
+        return flow_response(await async_auth_flow_engine.request_otp(data.get('email')))
+    except Exception as e:
+        return server_error("request_otp", e)
+
+
+@csrf_exempt
+@require_POST
+async def verify_otp(request):
+    """
+    Verify OTP endpoint - Returns a secure token for password reset
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    try:
+        return flow_response(await async_auth_flow_engine.verify_otp(data.get('email'), data.get('otp')))
+    except Exception as e:
+        return server_error("verify_otp", e)
+
+
+@csrf_exempt
+@require_POST
+async def reset_password(request):
+    """
+    Reset password endpoint WITH token validation
+    Expects Authorization: Bearer <token from verify_otp> and email, password, confirm_password
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    try:
+        return flow_response(await async_auth_flow_engine.reset_password(
+            data.get('email'),
+            bearer_token(request),
+            data.get('password'),
+            data.get('confirm_password')
+        ))
+    except Exception as e:
+        return server_error("reset_password", e)
+
+# ============================================================================
+# URL CONFIGURATION
+# ============================================================================
+
+"""
+Add this to your Django urls.py file (instead of the sync views for these four URLs):
+
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('api/login/', async_views.login, name='login'),
+    path('api/request-otp/', async_views.request_otp, name='request_otp'),
+    path('api/verify-otp/', async_views.verify_otp, name='verify_otp'),
+    path('api/reset-password/', async_views.reset_password, name='reset_password'),
+]
+
+Protected DRF views (/api/predict/, /api/profile/, ...) stay sync; Django runs them in a
+thread under ASGI. Keep CONN_MAX_AGE at 0 or use a pooler: async views do not share the
+per-thread persistent connections sync workers rely on.
+"""
@@ -0,0 +1,146 @@
+"""
+Django Backends and Configuration for the Auth-Flow Engine
+Add this next to your views.py; the views in django_complete_token_fix.py wrap
+auth_flow_engine and the ASGI views in django_async_views.py wrap async_auth_flow_engine.
+
+Backends are picked with env vars:
+    ECHOHEALTH_OTP_BACKEND        model (default, otp_verifications table) | store | table
+    ECHOHEALTH_RESET_TOKEN_MODE   stored (default, digest in the shared store) | signed
+    ECHOHEALTH_EXPOSE_OTP         1 returns the OTP in the request_otp response (development only)
+"""
+
+import os
+
+from django.conf import settings
+from rest_framework.response import Response
+
+import auth_flow
+from django_otp_models import PasswordResetOTP  # or: from .models import PasswordResetOTP
+from django_session_auth import ainvalidate_user_sessions, invalidate_user_sessions  # or: from .auth import ...
+from django_user_cache import (  # or: from .user_cache import ...
+    aget_user_by_email, aload_password, get_user_by_email, load_password
+)
+from otp_mailer import asend_otp_email, send_otp_email
+from otp_store import get_store
+from password_hashing import ahash_password, hash_password
+from reset_tokens import TOKEN_TTL_SECONDS
+from shared_otp_table import SharedOtpTable
+from signed_tokens import FILTER_PATH, SignedTokenSigner, UsedTokenFilter
+from structured_log import get_logger
+
+OTP_BACKEND = os.environ.get('ECHOHEALTH_OTP_BACKEND', 'model')
+RESET_TOKEN_MODE = os.environ.get('ECHOHEALTH_RESET_TOKEN_MODE', 'stored')
+EXPOSE_OTP = os.environ.get('ECHOHEALTH_EXPOSE_OTP', '1') == '1'
+
+log = get_logger('reset_password')
+
+
+class DjangoUserDirectory:
+    """users backend: cached lookups, pooled hashing, sessions ended after a reset"""
+
+    def get(self, email):
+        return get_user_by_email(email)
+
+    def password_hash(self, user):
+        # Cached users never carry the hash: one explicit query by pk
+        return load_password(user)
+
+    def set_password(self, user, password):
+        # Hashed in the password pool, off the request thread (may raise HashingPoolBusy)
+        user.password = hash_password(password)
+        # Only the password: the cached user's other columns may be stale (last_login is
+        # written behind), and a full save would write them back
+        user.save(update_fields=['password'])
+        # Sign out every device that logged in with the old password
+        ended = invalidate_user_sessions(user.id)
+        log.info('sessions_ended', email=user.email, sessions=ended)
+
+    async def aget(self, email):
+        return await aget_user_by_email(email)
+
+    async def apassword_hash(self, user):
+        return await aload_password(user)
+
+    async def aset_password(self, user, password):
+        user.password = await ahash_password(password)
+        await user.asave(update_fields=['password'])
+        ended = await ainvalidate_user_sessions(user.id)
+        log.info('sessions_ended', email=user.email, sessions=ended)
+
+
+class ModelOtpBackend:
+    """OTPs in the otp_verifications table; attempts are counted atomically in SQL"""
+
+    def issue(self, email, otp, ttl):
+        PasswordResetOTP.objects.issue(email, otp, ttl=ttl)
+
+    def verify(self, email, otp, max_attempts):
+        return PasswordResetOTP.objects.verify(email, otp, max_attempts=max_attempts)
+
+    async def aissue(self, email, otp, ttl):
+        await PasswordResetOTP.objects.aissue(email, otp, ttl=ttl)
+
+    async def averify(self, email, otp, max_attempts):
+        return await PasswordResetOTP.objects.averify(email, otp, max_attempts=max_attempts)
+
+
+def build_otp_backend(name=OTP_BACKEND):
+    if name == 'model':
+        return ModelOtpBackend()
+    if name == 'store':
+        return auth_flow.StoreOtpBackend(get_store('otp'))
+    if name == 'table':
+        return auth_flow.SharedTableOtpBackend(SharedOtpTable())
+    raise ValueError(f"Unknown OTP backend: {name}")
+
+
+def build_token_backend(mode=RESET_TOKEN_MODE):
+    if mode == 'signed':
+        # Consumed tokens are shared by all workers on this host
+        signer = SignedTokenSigner(settings.SECRET_KEY, ttl=TOKEN_TTL_SECONDS,
+                                   used_filter=UsedTokenFilter(path=FILTER_PATH))
+        return auth_flow.SignedTokenBackend(signer)
+    if mode == 'stored':
+        return auth_flow.StoredTokenBackend()
+    raise ValueError(f"Unknown reset token mode: {mode}")
+
+
+users_backend = DjangoUserDirectory()
+otp_backend = build_otp_backend()
+token_backend = build_token_backend()
+
+auth_flow_engine = auth_flow.AuthFlow(
+    users=users_backend,
+    otps=otp_backend,
+    tokens=token_backend,
+    send_otp=send_otp_email,
+    expose_otp=EXPOSE_OTP
+)
+
+# Same backends, so WSGI and ASGI workers can serve one deployment side by side
+async_auth_flow_engine = auth_flow.AsyncAuthFlow(
+    users=users_backend,
+    otps=otp_backend,
+    tokens=token_backend,
+    send_otp=asend_otp_email,
+    expose_otp=EXPOSE_OTP
+)
+
+# ============================================================================
+# HTTP HELPERS FOR THE VIEWS
+# ============================================================================
+
+def flow_response(result):
+    """FlowResult -> DRF Response"""
+    response = Response(result.body, status=result.status)
+    for name, value in result.headers.items():
+        response[name] = value
+    return response
+
+
+def bearer_token(request):
+    """Token from 'Authorization: Bearer <token>', or None if the header is missing or malformed"""
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    return auth_header[len('Bearer '):].strip()
@@ -22,3 +22,10 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Common settings for all backends
 DEFAULT_FROM_EMAIL = 'noreply@echohealth.com'
 EMAIL_SUBJECT_PREFIX = '[EchoHealth] '
+EMAIL_TIMEOUT = 10
+
+# OTP emails are sent through the queue in otp_mailer.py, never on the request thread.
+# With the SMTP backend the queue keeps its own pooled connections; tune with env vars:
+#   ECHOHEALTH_MAIL_WORKERS=2        sender threads = persistent SMTP connections per process
+#   ECHOHEALTH_MAIL_BATCH_SIZE=50    emails sent per connection pass
+#   ECHOHEALTH_MAIL_QUEUE_SIZE=10000 queued emails before request_otp starts dropping them
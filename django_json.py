@@ -0,0 +1,97 @@
+"""
+Django REST Framework JSON Parser and Renderer on fast_json (orjson when installed)
+Add this next to your views.py and make them the defaults in settings.py:
+
+    REST_FRAMEWORK = {
+        'DEFAULT_PARSER_CLASSES': ['your_app.drf_json.FastJSONParser'],      # CHANGE THIS
+        'DEFAULT_RENDERER_CLASSES': ['your_app.drf_json.FastJSONRenderer'],  # CHANGE THIS
+    }
+
+Views read the body with request_json(request) (request.data under DRF), which parses it once
+per request: the rate-limit decorator and the view share the result instead of each running
+json.loads(request.body). That matters on /api/oral-cancer-detect/, whose bodies carry
+megabytes of base64.
+
+The plain Django views (django_async_views.py, django_views_fix.py) get the same parse
+through request_json and render with json_response.
+
+Benchmark: python benchmark_json.py
+"""
+
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+
+import fast_json  # or: from . import fast_json
+
+# ============================================================================
+# DRF PARSER / RENDERER
+# ============================================================================
+
+class FastJSONParser(BaseParser):
+    """Parses JSON request bodies with fast_json"""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return fast_json.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class FastJSONRenderer(BaseRenderer):
+    """Renders Response data as compact UTF-8 JSON with fast_json"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None  # JSON is always UTF-8; no charset parameter in Content-Type
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return fast_json.dumps(data)
+
+# ============================================================================
+# HELPERS FOR THE VIEWS
+# ============================================================================
+
+_NOT_PARSED = object()
+
+
+def request_json(request):
+    """Parsed JSON object from the body, or None if it is not one; parsed once per request"""
+    data = getattr(request, '_echohealth_json', _NOT_PARSED)
+    if data is _NOT_PARSED:
+        data = parse_body(request)
+        request._echohealth_json = data
+    return data
+
+
+def parse_body(request):
+    if isinstance(request, Request):
+        try:
+            data = request.data
+        except ParseError:
+            return None
+        except UnsupportedMediaType:
+            # No Content-Type: application/json; the views always accepted JSON regardless
+            data = _loads_or_none(request.body)
+    else:
+        data = _loads_or_none(request.body)
+    return data if isinstance(data, dict) else None
+
+
+def _loads_or_none(body):
+    try:
+        return fast_json.loads(body)
+    except ValueError:
+        return None
+
+
+def json_response(body, status, headers=None):
+    """HttpResponse with a fast_json body (the plain Django counterpart of FastJSONRenderer)"""
+    response = HttpResponse(fast_json.dumps(body), status=status, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
@@ -7,122 +7,103 @@ The issue was likely that:
 3. Error messages were not helpful
 """
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib.auth import authenticate
-from django.contrib.auth.models import User
-from django.utils import timezone
-import json
-import secrets
-import string
 
-# Store tokens temporarily (in production, use a proper Token model)
-token_storage = {}
+from django_json import request_json  # or: from .drf_json import ...
+from django_session_auth import SessionTokenAuthentication, create_session, invalidate_session, record_login
+from django_password_hashers import record_password_upgrade  # or: from .hashers import ...
+from password_hashing import PASSWORD_POOL_RETRY_AFTER, HashingPoolBusy, verify_and_upgrade_password
+from django_rate_limit import LOGIN_LIMITS, rate_limit  # or: from .ratelimit import ...
+from django_user_cache import get_user_by_email, load_password  # or: from .user_cache import ...
+from structured_log import get_logger
 
-def generate_token():
-    """Generate a secure random token"""
-    return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+log = get_logger('login')
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit(LOGIN_LIMITS)
 def login(request):
     """
     User login endpoint that properly authenticates email and password
     Returns authentication token on success
     """
+    data = request_json(request)
+    if data is None:
+        return Response(
+            {'error': 'Invalid JSON in request body'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
     try:
-        print("=== Login Request Started ===")
-        data = json.loads(request.body)
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
         
-        print(f"📧 Email received: {email}")
-        print(f"🔐 Password length: {len(password)}")
-        
         # Validate input
         if not email:
-            print("❌ No email provided")
             return Response(
                 {'error': 'Email is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         if not password:
-            print("❌ No password provided")
             return Response(
                 {'error': 'Password is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if user exists by email
-        try:
-            user = User.objects.get(email=email)
-            print(f"✅ User found: {user.username} (ID: {user.id})")
-            print(f"📅 User date joined: {user.date_joined}")
-            print(f"📅 User last login: {user.last_login}")
-            print(f"✅ User is_active: {user.is_active}")
-        except User.DoesNotExist:
-            print(f"❌ User not found with email: {email}")
+        # Check if user exists by email (cached; an active account wins if several share the email)
+        user = get_user_by_email(email)
+        if user is None:
+            log.info('login_failed', email=email, reason='unknown_email')
             # Don't reveal if email exists or not (security best practice)
             return Response(
                 {'error': 'Invalid email or password'}, 
                 status=status.HTTP_401_UNAUTHORIZED
             )
-        except User.MultipleObjectsReturned:
-            print(f"⚠️ Multiple users found with email: {email}")
-            # Get the first active user
-            user = User.objects.filter(email=email, is_active=True).first()
-            if not user:
-                return Response(
-                    {'error': 'Invalid email or password'}, 
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
+        log.debug('user_found', email=email, user_id=user.id)
         
         # Check if user is active
         if not user.is_active:
-            print(f"❌ User is inactive: {email}")
+            log.info('login_failed', email=email, reason='inactive')
             return Response(
                 {'error': 'Account is inactive. Please contact support.'}, 
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Authenticate user with username and password
-        # Django's authenticate() uses username, not email
-        # So we need to authenticate with the username
-        authenticated_user = authenticate(
-            username=user.username, 
-            password=password
-        )
+        # Verify the password against the user we already loaded: one hash per attempt,
+        # computed in the hashing pool (authenticate() would look the user up and hash again).
+        # The hash is never cached: read it by pk
+        try:
+            password_ok, upgraded_hash = verify_and_upgrade_password(password, load_password(user))
+        except HashingPoolBusy:
+            log.warning('hashing_pool_busy', email=email)
+            response = Response(
+                {'error': 'Too many login attempts in progress. Please try again.'}, 
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+            response['Retry-After'] = str(PASSWORD_POOL_RETRY_AFTER)
+            return response
         
-        if authenticated_user is None:
-            print(f"❌ Password authentication failed for: {email}")
-            # Verify the password manually in case of edge cases
-            if user.check_password(password):
-                print(f"✅ Password check passed manually for: {email}")
-                authenticated_user = user
-            else:
-                print(f"❌ Password check failed for: {email}")
-                return Response(
-                    {'error': 'Invalid email or password'}, 
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
+        if not password_ok:
+            log.info('login_failed', email=email, reason='bad_password')
+            return Response(
+                {'error': 'Invalid email or password'}, 
+                status=status.HTTP_401_UNAUTHORIZED
+            )
         
-        # Update last login timestamp
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
+        # Stored hash was made with old hasher parameters: store the rehash from the pool
+        if upgraded_hash and record_password_upgrade(user, upgraded_hash):
+            log.info('password_rehashed', email=email)
         
-        # Generate authentication token
-        token = generate_token()
-        token_storage[email] = {
-            'token': token,
-            'user_id': user.id,
-            'timestamp': timezone.now()
-        }
+        # Update last login timestamp (written behind, batched with other logins)
+        record_login(user)
+        
+        # Generate authentication token (stored as a user_sessions row)
+        token = create_session(user, request)
         
-        print(f"✅ Login successful for: {email}")
-        print(f"🔑 Generated token: {token}")
+        log.info('login_succeeded', email=email, user_id=user.id)
         
         return Response({
             'message': 'Login successful',
@@ -134,31 +115,36 @@ def login(request):
             }
         }, status=status.HTTP_200_OK)
         
-    except json.JSONDecodeError:
-        print("❌ Invalid JSON in request body")
-        return Response(
-            {'error': 'Invalid JSON in request body'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
     except Exception as e:
-        print(f"❌ Login error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('unhandled_error', error=str(e))
         return Response(
             {'error': f'Internal server error: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
+@api_view(['POST'])
+@authentication_classes([SessionTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    """
+    End the session of the bearer token used for this request
+    """
+    invalidate_session(request.auth)
+    get_logger('logout').info('logout', email=request.user.email)
+    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
+
+
 """
 URL Configuration (add to your urls.py):
 ==========================
 from django.urls import path
-from .views import login  # or wherever you put this function
+from .views import login, logout  # or wherever you put these functions
 
 urlpatterns = [
     # ... other patterns
     path('api/login/', login, name='login'),
+    path('api/logout/', logout, name='logout'),
 ]
 """
 
@@ -168,6 +154,8 @@ Usage in your views.py or a separate auth_views.py:
 1. Import this function or copy the code to your views.py
 2. Make sure User model has email field (Django's default User has it)
 3. Ensure passwords are stored using Django's password hashing
+4. Add UserSession and SessionTokenAuthentication from django_session_auth.py
+   (tokens are looked up by digest in user_sessions, cached in-process)
 
 Testing:
 ==========================
@@ -175,6 +163,9 @@ curl -X POST http://localhost:8000/api/login/ \
   -H "Content-Type: application/json" \
   -d '{"email": "user@example.com", "password": "password123"}'
 
+curl -X POST http://localhost:8000/api/logout/ \
+  -H "Authorization: Bearer abc123..."
+
 Expected Response:
 {
     "message": "Login successful",
@@ -0,0 +1,190 @@
+"""
+Django Request Metrics Middleware and Prometheus /metrics Endpoint
+Add the middleware first in settings.py and the view to urls.py:
+
+    MIDDLEWARE = [
+        'your_app.metrics.RequestMetricsMiddleware',  # CHANGE THIS
+        ...
+    ]
+
+    path('metrics', metrics, name='metrics'),
+
+Serve /metrics on the internal network only (block it at the proxy): it lists every route.
+
+For every request the middleware records, per URL route (api/login/, api/verify-otp/,
+api/predict/, api/oral-cancer-detect/, ...): latency in an HDR-style histogram, the status
+code, database query count and time, and request/response body sizes. Counters live in a
+per-worker mmap file (request_metrics.py); /metrics sums every worker on the host, so it
+does not matter which worker Prometheus reaches.
+
+Files of exited workers are folded into one retired file on the next scrape (see
+request_metrics.py). With several gunicorn workers, clear the files when the master starts:
+
+    # gunicorn.conf.py
+    def on_starting(server):
+        from request_metrics import reset_metrics_dir
+        reset_metrics_dir()
+
+Routes are the URL patterns (resolver_match.route), never raw paths, so ids in URLs do not
+create new series. DB queries are counted by an execute wrapper installed on every database
+connection, which adds to the QueryCounter in the request's context variable. asgiref
+copies the context into the threads it runs sync code on, so the count is right under WSGI
+and ASGI alike: sync views, sync views ASGI runs in its thread-sensitive executor, and the
+async ORM.
+"""
+
+import contextvars
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from request_metrics import aggregate, render_component_stats, render_prometheus, worker_metrics
+
+METRICS_PATH = os.environ.get('ECHOHEALTH_METRICS_PATH', '/metrics')
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class QueryCounter:
+    """connection.execute_wrapper() callback counting queries and their time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.time_ns = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter_ns()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.time_ns += time.perf_counter_ns() - start
+
+
+# QueryCounter of the request being served in this context, None outside requests
+_request_queries = contextvars.ContextVar('echohealth_request_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def _install_query_counter(sender, connection, **kwargs):
+    # Fires again when a connection reconnects: install the wrapper once
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None and match.route else UNMATCHED_ROUTE
+
+
+def request_size(request):
+    # The header, not request.body: uploads (oral-cancer-detect images) are not read here
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+def response_size(response):
+    if getattr(response, 'streaming', False):
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if request.path == METRICS_PATH:
+            return self.get_response(request)
+        start = time.perf_counter_ns()
+        queries = QueryCounter()
+        token = _request_queries.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._record(request, response, time.perf_counter_ns() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        if request.path == METRICS_PATH:
+            return await self.get_response(request)
+        start = time.perf_counter_ns()
+        queries = QueryCounter()
+        token = _request_queries.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._record(request, response, time.perf_counter_ns() - start, queries)
+        return response
+
+    def _record(self, request, response, latency_ns, queries):
+        worker_metrics().record(
+            route_of(request),
+            response.status_code,
+            latency_ns,
+            db_queries=queries.queries,
+            db_time_ns=queries.time_ns,
+            request_bytes=request_size(request),
+            response_bytes=response_size(response)
+        )
+
+# ============================================================================
+# /metrics
+# ============================================================================
+
+def component_stats():
+    """stats() of the in-process components of the worker serving /metrics"""
+    from django_password_hashers import hash_upgrade_stats, outdated_password_hashes
+    from django_predict import predict_batcher
+    from django_session_auth import last_activity_buffer, last_login_buffer, session_cache
+    from django_user_cache import user_cache
+    from model_registry import model_registry
+    from otp_mailer import get_mailer
+    from password_hashing import password_pool
+    from structured_log import log_stats
+
+    log = log_stats()
+    return {
+        'password_pool': password_pool.stats(),
+        'password_upgrades': {
+            'rehashed_on_login': hash_upgrade_stats['rehashed_on_login'],
+            # Recounted at most every OUTDATED_COUNT_MAX_AGE seconds, not on every scrape
+            'outdated_users': outdated_password_hashes(),
+        },
+        'mail_queue': get_mailer().stats(),
+        'model_registry': model_registry.stats(),
+        'predict_batcher': predict_batcher.stats(),
+        'session_cache': session_cache.stats(),
+        'user_cache': user_cache.stats(),
+        'last_login_writer': last_login_buffer.stats(),
+        'last_activity_writer': last_activity_buffer.stats(),
+        'log_writer': {key: value for key, value in log.items() if key != 'sampled_out'},
+    }
+
+
+def metrics(request):
+    """Prometheus text format: routes summed over all workers, components of this worker"""
+    body = render_prometheus(aggregate(), render_component_stats(component_stats()))
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,186 @@
+"""
+Database-Backed PasswordResetOTP Model
+Add this to your app's models.py, then run: python manage.py makemigrations && python manage.py migrate
+
+Implements the otp_verifications table from echo_health_architecture.md:
+- composite index on (email, purpose) for the lookup in verify_otp
+- partial index on unused rows, so lookups skip consumed OTPs
+- attempts are incremented in SQL with F('attempts') + 1 (no read-modify-write race), and
+  the remaining count is read back from the updated row inside the same transaction
+- expired/used rows are deleted in small batches by purge_expired()
+  (see django_purge_expired_otps_command.py)
+- aissue() / averify() are the same statements over the async ORM, for ASGI views
+"""
+
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+OTP_TTL_SECONDS = 5 * 60
+MAX_OTP_ATTEMPTS = 3
+PURGE_BATCH_SIZE = 1000
+
+# verify() results
+VERIFIED = 'verified'
+MISSING = 'missing'
+INVALID = 'invalid'
+TOO_MANY_ATTEMPTS = 'too_many_attempts'
+
+
+def default_expiry():
+    """OTPs expire 5 minutes after creation"""
+    return timezone.now() + timedelta(seconds=OTP_TTL_SECONDS)
+
+
+class PasswordResetOTPManager(models.Manager):
+
+    def _count_attempt(self, pk, max_attempts):
+        """
+        Count one attempt; returns the attempts after this one, or None if the limit was reached
+        The UPDATE holds the row lock until commit, so the read-back sees this request's
+        increment and not a concurrent one
+        """
+        with transaction.atomic():
+            # UPDATE ... SET attempts = attempts + 1 WHERE attempts < max: concurrent guesses
+            # cannot slip past the limit because the check and the increment are one statement
+            counted = self.filter(pk=pk, is_used=False, attempts__lt=max_attempts).update(
+                attempts=F('attempts') + 1
+            )
+            if not counted:
+                return None
+            return self.filter(pk=pk).values_list('attempts', flat=True).get()
+
+    def issue(self, email, otp, purpose='password_reset', ttl=OTP_TTL_SECONDS):
+        """Store a new OTP and retire any earlier unused OTP for the same email/purpose"""
+        self.filter(email=email, purpose=purpose, is_used=False).update(is_used=True)
+        return self.create(
+            email=email,
+            otp=otp,
+            purpose=purpose,
+            expires_at=timezone.now() + timedelta(seconds=ttl)
+        )
+
+    def verify(self, email, otp, purpose='password_reset', max_attempts=MAX_OTP_ATTEMPTS):
+        """
+        Check an OTP, counting the attempt atomically in SQL
+        Returns (status, remaining_attempts); the row is marked used on success or lockout
+        """
+        record = (
+            self.filter(email=email, purpose=purpose, is_used=False, expires_at__gt=timezone.now())
+            .order_by('-created_at')
+            .only('pk', 'otp')
+            .first()
+        )
+        if record is None:
+            return MISSING, 0
+
+        attempts = self._count_attempt(record.pk, max_attempts)
+        if attempts is None:
+            self.filter(pk=record.pk).update(is_used=True)
+            return TOO_MANY_ATTEMPTS, 0
+
+        remaining = max(0, max_attempts - attempts)
+
+        if constant_time_compare(record.otp, str(otp).strip()):
+            # Only one concurrent request can flip is_used, so the OTP is single-use
+            consumed = self.filter(pk=record.pk, is_used=False).update(is_used=True)
+            return (VERIFIED, remaining) if consumed else (MISSING, 0)
+
+        return INVALID, remaining
+
+    async def aissue(self, email, otp, purpose='password_reset', ttl=OTP_TTL_SECONDS):
+        await self.filter(email=email, purpose=purpose, is_used=False).aupdate(is_used=True)
+        return await self.acreate(
+            email=email,
+            otp=otp,
+            purpose=purpose,
+            expires_at=timezone.now() + timedelta(seconds=ttl)
+        )
+
+    async def averify(self, email, otp, purpose='password_reset', max_attempts=MAX_OTP_ATTEMPTS):
+        record = await (
+            self.filter(email=email, purpose=purpose, is_used=False, expires_at__gt=timezone.now())
+            .order_by('-created_at')
+            .only('pk', 'otp')
+            .afirst()
+        )
+        if record is None:
+            return MISSING, 0
+
+        # The async ORM has no transactions: run the counted UPDATE + read-back as one sync block
+        attempts = await sync_to_async(self._count_attempt)(record.pk, max_attempts)
+        if attempts is None:
+            await self.filter(pk=record.pk).aupdate(is_used=True)
+            return TOO_MANY_ATTEMPTS, 0
+
+        remaining = max(0, max_attempts - attempts)
+
+        if constant_time_compare(record.otp, str(otp).strip()):
+            consumed = await self.filter(pk=record.pk, is_used=False).aupdate(is_used=True)
+            return (VERIFIED, remaining) if consumed else (MISSING, 0)
+
+        return INVALID, remaining
+
+    def purge_expired(self, batch_size=PURGE_BATCH_SIZE, pause=0.0):
+        """
+        Delete expired or used rows in batches of batch_size primary keys
+        Each DELETE is its own short statement, so no long table locks are held;
+        pause (seconds) between batches yields to live traffic on big backlogs
+        """
+        total = 0
+        while True:
+            ids = list(
+                self.filter(Q(expires_at__lte=timezone.now()) | Q(is_used=True))
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            deleted, _ = self.filter(pk__in=ids).delete()
+            total += deleted
+            if len(ids) < batch_size:
+                return total
+            if pause:
+                time.sleep(pause)
+
+
+class PasswordResetOTP(models.Model):
+    """One-time password for registration or password reset (table: otp_verifications)"""
+
+    PURPOSE_CHOICES = [
+        ('registration', 'Registration'),
+        ('password_reset', 'Password Reset'),
+    ]
+
+    email = models.EmailField(max_length=255)
+    otp = models.CharField(max_length=6, db_column='otp_code')
+    purpose = models.CharField(max_length=50, choices=PURPOSE_CHOICES, default='password_reset')
+    expires_at = models.DateTimeField(default=default_expiry)
+    is_used = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PasswordResetOTPManager()
+
+    class Meta:
+        db_table = 'otp_verifications'
+        indexes = [
+            models.Index(fields=['email', 'purpose'], name='idx_otp_email_purpose'),
+            models.Index(
+                fields=['email', 'purpose', 'expires_at'],
+                name='idx_otp_unused',
+                condition=Q(is_used=False)
+            ),
+            models.Index(fields=['expires_at'], name='idx_otp_expires_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} ({self.purpose})"
+
+    def is_expired(self):
+        """True once expires_at has passed"""
+        return timezone.now() >= self.expires_at
@@ -0,0 +1,107 @@
+"""
+Django Password Hashers with Host-Tuned Costs
+Save as your_app/hashers.py and list the tuned hasher first in settings.py:
+
+    PASSWORD_HASHERS = [
+        'your_app.hashers.TunedPBKDF2PasswordHasher',  # CHANGE THIS
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ]
+
+Costs come from env vars set from `python manage.py tune_password_hasher`. The tuned
+hashers keep Django's algorithm names, so existing hashes still verify; hashes made with
+other parameters report must_update() and login() rehashes them after a successful check.
+"""
+
+import os
+import time
+
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    get_hasher,
+    identify_hasher,
+)
+from django.contrib.auth.models import User
+
+from django_user_cache import ainvalidate_user, invalidate_user  # or: from .user_cache import ...
+from password_tuning import LINEAR, LOG2
+
+OUTDATED_COUNT_MAX_AGE = 300
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = int(os.environ.get('ECHOHEALTH_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations))
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = int(os.environ.get('ECHOHEALTH_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost))
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    rounds = int(os.environ.get('ECHOHEALTH_BCRYPT_ROUNDS', BCryptSHA256PasswordHasher.rounds))
+
+
+# algorithm -> (cost attribute, how time scales with it, rounding step, env var)
+TUNABLE_HASHERS = {
+    'pbkdf2_sha256': ('iterations', LINEAR, 1000, 'ECHOHEALTH_PBKDF2_ITERATIONS'),
+    'argon2': ('time_cost', LINEAR, 1, 'ECHOHEALTH_ARGON2_TIME_COST'),
+    'bcrypt_sha256': ('rounds', LOG2, 1, 'ECHOHEALTH_BCRYPT_ROUNDS'),
+}
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+hash_upgrade_stats = {
+    'rehashed_on_login': 0,
+    'outdated_users': None,
+    'outdated_checked_at': 0.0,
+}
+
+
+def record_password_upgrade(user, upgraded_hash):
+    """Store a rehashed password unless it changed since it was checked (e.g. a reset)"""
+    updated = User.objects.filter(pk=user.pk, password=user.password).update(password=upgraded_hash)
+    if updated:
+        user.password = upgraded_hash
+        # .update() sends no post_save signal
+        invalidate_user(user.email)
+        hash_upgrade_stats['rehashed_on_login'] += 1
+    return bool(updated)
+
+
+async def arecord_password_upgrade(user, upgraded_hash):
+    updated = await User.objects.filter(pk=user.pk, password=user.password).aupdate(password=upgraded_hash)
+    if updated:
+        user.password = upgraded_hash
+        await ainvalidate_user(user.email)
+        hash_upgrade_stats['rehashed_on_login'] += 1
+    return bool(updated)
+
+
+def count_outdated_password_hashes(chunk_size=2000):
+    """Users whose stored hash is not on the preferred hasher's current parameters"""
+    preferred = get_hasher('default')
+    outdated = 0
+    passwords = User.objects.exclude(password='').values_list('password', flat=True)
+    for encoded in passwords.iterator(chunk_size=chunk_size):
+        if encoded.startswith('!'):
+            continue  # unusable password
+        try:
+            hasher = identify_hasher(encoded)
+        except ValueError:
+            continue
+        if hasher.algorithm != preferred.algorithm or hasher.must_update(encoded):
+            outdated += 1
+    return outdated
+
+
+def outdated_password_hashes(max_age=OUTDATED_COUNT_MAX_AGE):
+    """Cached count_outdated_password_hashes() for metrics endpoints"""
+    if time.time() - hash_upgrade_stats['outdated_checked_at'] > max_age:
+        hash_upgrade_stats['outdated_users'] = count_outdated_password_hashes()
+        hash_upgrade_stats['outdated_checked_at'] = time.time()
+    return hash_upgrade_stats['outdated_users']
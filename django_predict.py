@@ -0,0 +1,176 @@
+"""
+Django Views for /api/predict/ and /api/predict/batch/
+Add this to your views.py; scoring lives in risk_scoring.py (the app's SymptomChecker rules
+as weight vectors), so one request and ten thousand rows go through the same code.
+
+/api/predict/ takes the app's SymptomCheckRequest:
+    {"mode": "symptoms", "features": {"Age": 45, "Gender": "Male", "Tobacco_Use": 1, ...}}
+or the same features with form labels ("Tobacco Use": "Yes", see risk_scoring.FEATURE_SCHEMA;
+unknown or invalid features answer 400 naming the field), and answers with the
+SymptomCheckResponse fields (risk_score, risk_level, recommendations).
+
+/api/predict/batch/ takes a list of SymptomFeatures rows and scores them as one matrix:
+    {"mode": "symptoms", "features": [{"Age": 45, ...}, {"Age": 30, ...}, ...]}
+    -> {"count": 2, "results": [{"risk_score": 215, "risk_level": "High Risk"}, ...],
+        "recommendations": {"High Risk": [...], ...}}     # once per level present
+At most ECHOHEALTH_PREDICT_MAX_ROWS rows (default 10000) per call.
+
+The model comes from model_registry.py, loaded and warmed up at worker boot (see the
+AppConfig snippet there). Until it is ready both views answer 503 with Retry-After, and
+GET /api/ready/ answers 503 {"ready": false, ...}: point the load balancer's readiness
+probe (or Kubernetes readinessProbe) at it so no traffic reaches a cold worker.
+
+With ECHOHEALTH_PREDICT_BATCHING=1, concurrent /api/predict/ requests in one worker share
+model calls through inference_batcher.py. Turn it on for threaded (gunicorn --threads)
+workers serving a model with a per-call cost. It does nothing for sync workers, which serve
+one request at a time, nor under ASGI, where Django runs these sync views one at a time on
+its thread-sensitive executor; the builtin rules model is faster unbatched anyway.
+
+Benchmark: python benchmark_risk_scoring.py
+"""
+
+import os
+
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from django_json import json_response, request_json  # or: from .drf_json import ...
+from inference_batcher import MicroBatcher  # or: from .inference_batcher import ...
+from model_registry import ModelNotReady, model_registry  # or: from .model_registry import ...
+from risk_scoring import (
+    FEATURE_COLUMNS, RECOMMENDATIONS, RISK_LEVELS, FeatureError, encode_row, encode_rows, result_body
+)
+from structured_log import get_logger
+
+MAX_BATCH_ROWS = int(os.environ.get('ECHOHEALTH_PREDICT_MAX_ROWS', '10000'))
+NOT_READY_RETRY_AFTER = 5
+PREDICT_BATCHING = os.environ.get('ECHOHEALTH_PREDICT_BATCHING', '0') == '1'
+
+log = get_logger('predict')
+predict_batcher = MicroBatcher(lambda matrix: model_registry.get('risk').predict(matrix))
+
+
+def encoded_row(features):
+    row = [0] * len(FEATURE_COLUMNS)
+    encode_row(features, [row])
+    return row
+
+
+def predict_one(features):
+    """(score, level) for one SymptomFeatures dict, batched with concurrent requests if enabled"""
+    model = model_registry.get('risk')
+    if hasattr(model, 'predict_row'):
+        # Lookup table (ECHOHEALTH_PREDICT_LOOKUP): one array read, cheaper than any batch
+        return model.predict_row(encoded_row(features))
+    if PREDICT_BATCHING:
+        return predict_batcher.submit(encoded_row(features))
+    scores, levels = model.predict(encode_rows([features]))
+    return scores[0], levels[0]
+
+
+def invalid_json():
+    return Response({'error': 'Invalid JSON in request body'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def bad_request(message):
+    return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def not_ready():
+    response = Response({'error': 'Prediction service is starting. Please try again.'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = str(NOT_READY_RETRY_AFTER)
+    return response
+
+
+def server_error(e):
+    log.exception('unhandled_error', error=str(e))
+    return Response({'error': f'Internal server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def predict(request):
+    """
+    Symptom risk assessment for one SymptomFeatures row
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    features = data.get('features')
+    if not isinstance(features, dict):
+        return bad_request('features must be an object')
+    try:
+        body = result_body(*predict_one(features))
+        log.info('predicted', risk_level=body['risk_level'])
+        return Response(body, status=status.HTTP_200_OK)
+    except FeatureError as e:
+        return bad_request(str(e))
+    except ModelNotReady:
+        return not_ready()
+    except Exception as e:
+        return server_error(e)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def predict_batch(request):
+    """
+    Symptom risk assessment for many SymptomFeatures rows, scored as one matrix
+    """
+    data = request_json(request)
+    if data is None:
+        return invalid_json()
+    rows = data.get('features')
+    if not isinstance(rows, list) or not rows:
+        return bad_request('features must be a non-empty list of objects')
+    if len(rows) > MAX_BATCH_ROWS:
+        return bad_request(f'At most {MAX_BATCH_ROWS} rows per request')
+    try:
+        scores, levels = model_registry.get('risk').predict(encode_rows(rows))
+        scores = scores.tolist() if hasattr(scores, 'tolist') else scores
+        levels = levels.tolist() if hasattr(levels, 'tolist') else levels
+        results = [
+            {'risk_score': score, 'risk_level': RISK_LEVELS[level]} for score, level in zip(scores, levels)
+        ]
+        log.info('predicted_batch', rows=len(results))
+        return Response({
+            'count': len(results),
+            'results': results,
+            'recommendations': {RISK_LEVELS[level]: RECOMMENDATIONS[RISK_LEVELS[level]] for level in set(levels)},
+        }, status=status.HTTP_200_OK)
+    except FeatureError as e:
+        return bad_request(str(e))
+    except ModelNotReady:
+        return not_ready()
+    except Exception as e:
+        return server_error(e)
+
+
+@require_GET
+def readiness(request):
+    """
+    Readiness probe: 200 once every configured model is loaded and warmed up, else 503
+    """
+    body = model_registry.status()
+    return json_response(body, 200 if body['ready'] else 503)
+
+
+"""
+URL Configuration (add to your urls.py):
+==========================
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('api/predict/', views.predict, name='predict'),
+    path('api/predict/batch/', views.predict_batch, name='predict_batch'),
+    path('api/ready/', views.readiness, name='readiness'),
+]
+"""
@@ -0,0 +1,28 @@
+"""
+Django Management Command: purge_expired_otps
+Save as your_app/management/commands/purge_expired_otps.py (CHANGE your_app)
+
+Run it from cron every few minutes:
+    */5 * * * * cd /path/to/project && python manage.py purge_expired_otps
+"""
+
+from django.core.management.base import BaseCommand
+
+from your_app.models import PasswordResetOTP  # CHANGE THIS
+
+
+class Command(BaseCommand):
+    help = "Delete expired and used OTP rows in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows deleted per DELETE statement (default 1000)')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches to yield to live traffic')
+
+    def handle(self, *args, **options):
+        total = PasswordResetOTP.objects.purge_expired(
+            batch_size=options['batch_size'],
+            pause=options['pause']
+        )
+        self.stdout.write(self.style.SUCCESS(f"🧹 Purged {total} expired OTP rows"))
@@ -0,0 +1,107 @@
+"""
+Django Rate Limiting for /api/login/ and /api/request-otp/
+Add this to your views.py (or a separate ratelimit.py) and decorate the views:
+
+    @api_view(['POST'])
+    @permission_classes([AllowAny])
+    @rate_limit(LOGIN_LIMITS)
+    def login(request): ...
+
+Limits are checked against the shared-memory counters in rate_limit.py before the view
+body runs, so a rejected request costs no database query and no password hash.
+Rejected requests get 429 with a Retry-After header.
+The decorator also wraps the async views in django_async_views.py (a plain JSON response there).
+"""
+
+import asyncio
+import functools
+import os
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from django_json import json_response, request_json  # or: from .drf_json import ...
+from rate_limit import RateLimiter
+from structured_log import get_logger
+
+log = get_logger('rate_limit')
+
+# Number of reverse proxies in front of Django that append to X-Forwarded-For
+TRUSTED_PROXY_COUNT = int(os.environ.get('ECHOHEALTH_TRUSTED_PROXY_COUNT', '0'))
+
+
+def client_ip(request):
+    """Client address: REMOTE_ADDR, or the entry our own proxies added to X-Forwarded-For"""
+    if TRUSTED_PROXY_COUNT:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_COUNT:
+            return forwarded[-TRUSTED_PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def by_ip(request, data):
+    return client_ip(request)
+
+
+def by_email(request, data):
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+# ============================================================================
+# LIMITS (limiter, key function)
+# ============================================================================
+
+LOGIN_LIMITS = [
+    (RateLimiter('login_ip', limit=30, window=5 * 60), by_ip),
+    (RateLimiter('login_email', limit=10, window=5 * 60), by_email),
+]
+
+REQUEST_OTP_LIMITS = [
+    (RateLimiter('request_otp_ip', limit=20, window=60 * 60), by_ip),
+    (RateLimiter('request_otp_email', limit=5, window=60 * 60), by_email),
+]
+
+
+def over_limit(request, limits):
+    """Count the request against every limiter; retry_after of the first one exceeded, or None"""
+    # Parsed once: the view gets the same result from request_json (and reports bad JSON itself)
+    data = request_json(request) or {}
+    for limiter, key_of in limits:
+        key = key_of(request, data)
+        if not key:
+            continue
+        allowed, retry_after = limiter.hit(key)
+        if not allowed:
+            log.warning('rate_limited', limiter=limiter.name, key=key, retry_after=retry_after)
+            return retry_after
+    return None
+
+
+def too_many_requests(retry_after):
+    return {'error': 'Too many requests. Please try again later.', 'retry_after': retry_after}
+
+
+def rate_limit(limits):
+    """Reject the request with 429 once any (limiter, key function) pair is over its limit"""
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            # Counters live in shared memory, so checking them never blocks the event loop
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = over_limit(request, limits)
+                if retry_after is None:
+                    return await view(request, *args, **kwargs)
+                return json_response(too_many_requests(retry_after), status.HTTP_429_TOO_MANY_REQUESTS,
+                                     {'Retry-After': str(retry_after)})
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = over_limit(request, limits)
+            if retry_after is None:
+                return view(request, *args, **kwargs)
+            response = Response(too_many_requests(retry_after), status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(retry_after)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,269 @@
+"""
+Django REST Framework Bearer-Token Authentication backed by user_sessions
+Add the model to your models.py and the authentication class to your settings
+
+Login tokens issued by /api/login/ are stored as SHA-256 digests in the user_sessions
+table (see echo_health_architecture.md). SessionTokenAuthentication resolves
+"Authorization: Bearer <token>" to a user with an in-process LRU+TTL cache in front of
+the table, so a cache hit costs a dict lookup instead of a database query. Each request
+gets its own User instance built from the cached columns (never one object shared
+between threads); other columns load on access, like .only().
+
+settings.py:
+    REST_FRAMEWORK = {
+        'DEFAULT_AUTHENTICATION_CLASSES': ['your_app.auth.SessionTokenAuthentication'],  # CHANGE THIS
+    }
+
+Protected views (/api/profile/, /api/predict/, /api/oral-cancer-detect/, /api/oral-cancer-chat/):
+    @api_view(['POST'])
+    @permission_classes([IsAuthenticated])
+    def predict(request): ...
+
+Cached entries live at most SESSION_CACHE_TTL_SECONDS. logout(), password resets and
+deactivating a user (user.is_active = False; user.save()) invalidate the database rows,
+mark the sessions revoked in the shared 'revoked_session' store (otp_store.py) and bump a
+host-wide revocation generation (ttl_cache.SharedGeneration). A cache hit reads only that
+counter; an entry cached before the latest bump checks the store once, so a revoked token
+stops working in every worker at once without a store read on every request.
+Queryset .update(is_active=False) sends no signal; call invalidate_user_sessions() after it.
+
+user.last_login and user_sessions.last_activity are written behind (write_behind.py):
+requests only queue the timestamp, a background thread bulk_updates the rows.
+"""
+
+import hashlib
+import os
+import secrets
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections, models, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from otp_store import get_store
+from ttl_cache import LRUTTLCache, SharedGeneration
+from write_behind import WriteBehindBuffer
+
+SESSION_TTL = timedelta(days=30)
+SESSION_CACHE_TTL_SECONDS = 60
+SESSION_CACHE_SIZE = 50000
+SESSION_REVOCATION_PATH = os.environ.get(
+    'ECHOHEALTH_SESSION_REVOCATION_PATH',
+    os.path.join(tempfile.gettempdir(), 'echohealth_session_revocations.bin')
+)
+# Columns cached per session to build request.user, in User's column order (from_db needs
+# it); password and last_login load from the database on access, so a save() of
+# request.user never writes them back stale
+SESSION_USER_FIELDS = (
+    'id', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff', 'is_active',
+)
+
+
+def session_token_digest(token):
+    """Login tokens are stored by digest; the raw value only exists on the client"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+class UserSession(models.Model):
+    """Active login session (table: user_sessions)"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sessions')
+    session_token = models.CharField(max_length=255, unique=True)
+    device_info = models.JSONField(null=True, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_activity = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'user_sessions'
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='idx_sessions_user_active'),
+        ]
+
+# ============================================================================
+# CACHE AND SESSION HELPERS
+# ============================================================================
+
+# token digest -> (user id, expires_at timestamp, session id, SESSION_USER_FIELDS values,
+#                  revocation generation the entry was last checked at)
+session_cache = LRUTTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+# session id -> True for sessions ended since some worker may have cached them; entries only
+# need to outlive the cached ones, after that the database row says is_active = False
+revoked_sessions = get_store('revoked_session')
+# Bumped after every revocation, so workers know when a cached entry needs a store check
+revocation_generation = SharedGeneration(SESSION_REVOCATION_PATH)
+
+
+def _session_user(user_values):
+    """A fresh User for one request; fields outside SESSION_USER_FIELDS are deferred"""
+    return User.from_db('default', SESSION_USER_FIELDS, user_values)
+
+
+def _new_session(user, request):
+    """(raw token, unsaved UserSession row)"""
+    token = secrets.token_urlsafe(32)
+    return token, UserSession(
+        user=user,
+        session_token=session_token_digest(token),
+        device_info={'user_agent': request.headers.get('User-Agent', '')} if request else None,
+        ip_address=request.META.get('REMOTE_ADDR') if request else None,
+        expires_at=timezone.now() + SESSION_TTL
+    )
+
+
+def create_session(user, request=None):
+    """Create a session row for user and return the raw token for the client"""
+    token, session = _new_session(user, request)
+    session.save(force_insert=True)
+    return token
+
+
+async def acreate_session(user, request=None):
+    token, session = _new_session(user, request)
+    await session.asave(force_insert=True)
+    return token
+
+
+def _bulk_update_timestamps(model, field, batch):
+    """Write {pk: datetime} in one bulk_update on the flusher thread"""
+    close_old_connections()
+    try:
+        rows = [model(pk=pk, **{field: value}) for pk, value in batch.items()]
+        model.objects.bulk_update(rows, [field], batch_size=500)
+    finally:
+        close_old_connections()
+
+
+last_login_buffer = WriteBehindBuffer(
+    lambda batch: _bulk_update_timestamps(User, 'last_login', batch), name='last-login-writer'
+)
+last_activity_buffer = WriteBehindBuffer(
+    lambda batch: _bulk_update_timestamps(UserSession, 'last_activity', batch), name='last-activity-writer'
+)
+
+
+def record_login(user):
+    """Set user.last_login now and persist it with the next write-behind flush"""
+    user.last_login = timezone.now()
+    last_login_buffer.add(user.pk, user.last_login)
+
+
+def _end_sessions(sessions):
+    """Deactivate the rows and revoke them in every worker's cache; returns the count"""
+    session_ids = list(sessions.values_list('pk', flat=True))
+    for session_id in session_ids:
+        revoked_sessions.set(str(session_id), True, ttl=SESSION_CACHE_TTL_SECONDS)
+    UserSession.objects.filter(pk__in=session_ids).update(is_active=False)
+    if session_ids:
+        revocation_generation.bump()
+    return len(session_ids)
+
+
+async def _aend_sessions(sessions):
+    session_ids = [session_id async for session_id in sessions.values_list('pk', flat=True)]
+    for session_id in session_ids:
+        await revoked_sessions.aset(str(session_id), True, ttl=SESSION_CACHE_TTL_SECONDS)
+    await UserSession.objects.filter(pk__in=session_ids).aupdate(is_active=False)
+    if session_ids:
+        revocation_generation.bump()
+    return len(session_ids)
+
+
+def invalidate_session(token):
+    """Log out one token in every worker"""
+    digest = session_token_digest(token)
+    session_cache.delete(digest)
+    return _end_sessions(UserSession.objects.filter(session_token=digest, is_active=True))
+
+
+def invalidate_user_sessions(user_id):
+    """Log out every session of a user in every worker, e.g. after a password reset"""
+    session_cache.delete_where(lambda entry: entry[0] == user_id)
+    return _end_sessions(UserSession.objects.filter(user_id=user_id, is_active=True))
+
+
+async def ainvalidate_user_sessions(user_id):
+    session_cache.delete_where(lambda entry: entry[0] == user_id)
+    return await _aend_sessions(UserSession.objects.filter(user_id=user_id, is_active=True))
+
+
+@receiver(post_save, sender=User)
+def _user_deactivated(sender, instance, **kwargs):
+    # Cached sessions would otherwise keep a deactivated user signed in until they expire
+    if not instance.is_active:
+        user_id = instance.pk
+        transaction.on_commit(lambda: invalidate_user_sessions(user_id))
+
+# ============================================================================
+# AUTHENTICATION CLASS
+# ============================================================================
+
+class SessionTokenAuthentication(BaseAuthentication):
+    """
+    Authorization: Bearer <login token>
+
+    Unknown tokens yield an anonymous request instead of an error, so views that take
+    other bearer tokens (reset_password's reset token) keep working; IsAuthenticated
+    views still answer 401.
+    """
+
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if len(header) != 2 or header[0].lower() != self.keyword:
+            return None
+
+        try:
+            token = header[1].decode()
+        except UnicodeError:
+            return None
+
+        digest = session_token_digest(token)
+        now = timezone.now().timestamp()
+        # Read before the lookup: a revocation racing the query below forces a recheck
+        generation = revocation_generation.current()
+
+        cached = session_cache.get(digest)
+        if cached is not None:
+            user_id, expires_at, session_id, user_values, checked_at = cached
+            if expires_at <= now:
+                session_cache.delete(digest)
+                return None
+            if checked_at != generation:
+                # Some worker revoked sessions (logout, password reset, deactivation) since
+                # this entry was checked: one store read tells whether this one is among them
+                if revoked_sessions.get(str(session_id)) is not None:
+                    session_cache.delete(digest)
+                    return None
+                session_cache.replace(digest, (user_id, expires_at, session_id, user_values, generation))
+            last_activity_buffer.add(session_id, timezone.now())
+            return _session_user(user_values), token
+
+        session = (
+            UserSession.objects.select_related('user')
+            .only('pk', 'expires_at', 'user', *(f'user__{field}' for field in SESSION_USER_FIELDS))
+            .filter(session_token=digest, is_active=True, expires_at__gt=timezone.now())
+            .first()
+        )
+        if session is None or not session.user.is_active:
+            return None
+
+        expires_at = session.expires_at.timestamp()
+        user_values = tuple(getattr(session.user, field) for field in SESSION_USER_FIELDS)
+        session_cache.set(digest, (session.user_id, expires_at, session.pk, user_values, generation),
+                          ttl=expires_at - now)
+        last_activity_buffer.add(session.pk, timezone.now())
+        return _session_user(user_values), token
+
+    def authenticate_header(self, request):
+        return 'Bearer'
@@ -0,0 +1,63 @@
+"""
+Django Management Command: tune_password_hasher
+Save as your_app/management/commands/tune_password_hasher.py (CHANGE your_app)
+
+Benchmarks every configured hasher on this host and recommends the cost whose p99
+hash time meets --target-ms. Run it on production hardware, then export the printed
+env vars (read by the hashers in django_password_hashers.py):
+    python manage.py tune_password_hasher --target-ms 250
+    python manage.py tune_password_hasher --report
+"""
+
+import copy
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from your_app.hashers import TUNABLE_HASHERS, count_outdated_password_hashes  # CHANGE THIS
+from password_tuning import measure_p99, recommend_cost
+
+
+class Command(BaseCommand):
+    help = "Recommend password hasher costs that meet a target p99 latency on this host"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250.0,
+                            help='Target p99 hash time in milliseconds (default 250)')
+        parser.add_argument('--samples', type=int, default=20,
+                            help='Hashes timed per candidate cost (default 20)')
+        parser.add_argument('--report', action='store_true',
+                            help='Only count users still hashed with old parameters')
+
+    def handle(self, *args, **options):
+        if not options['report']:
+            self.tune(options['target_ms'] / 1000.0, options['samples'])
+        outdated = count_outdated_password_hashes()
+        self.stdout.write(f"👥 Users on old hash parameters: {outdated} (rehashed on their next login)")
+
+    def tune(self, target_p99, samples):
+        for configured in get_hashers():
+            if configured.algorithm not in TUNABLE_HASHERS:
+                self.stdout.write(f"⏭️ {configured.algorithm}: no tunable cost, skipped")
+                continue
+            attribute, scale, step, env_var = TUNABLE_HASHERS[configured.algorithm]
+            hasher = copy.copy(configured)
+
+            def hash_fn(cost):
+                setattr(hasher, attribute, cost)
+                hasher.encode('benchmark-password', hasher.salt())
+
+            current = getattr(configured, attribute)
+            try:
+                current_p99 = measure_p99(hash_fn, current, samples)
+                cost, p99 = recommend_cost(hash_fn, target_p99, current, scale=scale,
+                                           samples=samples, min_cost=step, step=step)
+            except (ImportError, ValueError) as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ {configured.algorithm}: cannot benchmark ({e})"))
+                continue
+
+            self.stdout.write(
+                f"🔐 {configured.algorithm}: {attribute}={current} p99 {current_p99 * 1000:.1f}ms -> "
+                f"{attribute}={cost} p99 {p99 * 1000:.1f}ms"
+            )
+            self.stdout.write(self.style.SUCCESS(f"   export {env_var}={cost}"))
@@ -0,0 +1,149 @@
+"""
+Django User-by-Email Cache
+Add this to your app (e.g. your_app/user_cache.py) and import it from AppConfig.ready()
+so the signal handlers are connected:
+
+    class YourAppConfig(AppConfig):
+        def ready(self):
+            from . import user_cache  # noqa: F401  CHANGE THIS
+
+request_otp, login and reset_password call get_user_by_email() instead of
+User.objects.get(email=email); the ASGI views (django_async_views.py) await
+aget_user_by_email(). Users are cached in the shared expiring store by normalized
+email; unknown emails are remembered in a rotating Bloom filter.
+
+Only CACHED_USER_FIELDS are cached (never the password hash or the staff/superuser flags:
+the store may be a file on disk). Other fields of a returned user are deferred and load
+by pk on access; ASGI views call aload_password() before a password check. Save
+a cached user with update_fields (e.g. user.save(update_fields=['password'])).
+
+Invalidation: post_save / post_delete signals drop the entry once the transaction
+commits, under the previous email too when it changed. Queryset .update() calls do not
+send signals; call invalidate_user() after them.
+"""
+
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from otp_store import get_store
+from signed_tokens import UsedTokenFilter
+from user_cache import ReadThroughCache
+
+USER_CACHE_TTL_SECONDS = 5 * 60
+UNKNOWN_EMAIL_TTL_SECONDS = 5 * 60
+UNKNOWN_EMAIL_FILTER_PATH = os.environ.get(
+    'ECHOHEALTH_UNKNOWN_EMAIL_FILTER_PATH',
+    os.path.join(tempfile.gettempdir(), 'echohealth_unknown_emails.bin')
+)
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+# What the lookups need, in User's column order (from_db needs it)
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'is_active')
+
+
+def _deserialize(data):
+    """A User with CACHED_USER_FIELDS set; every other field is deferred (loads by pk)"""
+    return User.from_db('default', CACHED_USER_FIELDS, [data[field] for field in CACHED_USER_FIELDS])
+
+
+def _users_by_email(email):
+    # Prefer an active account when several share the email, like login() did
+    return User.objects.filter(email=email).order_by('-is_active', 'pk').values(*CACHED_USER_FIELDS)
+
+
+def _load(email):
+    return _users_by_email(email).first()
+
+
+async def _aload(email):
+    return await _users_by_email(email).afirst()
+
+
+user_cache = ReadThroughCache(
+    _load,
+    store=get_store('user_by_email'),
+    exists_store=get_store('user_exists'),
+    ttl=USER_CACHE_TTL_SECONDS,
+    negative_ttl=UNKNOWN_EMAIL_TTL_SECONDS,
+    unknown_filter=UsedTokenFilter(bucket_seconds=UNKNOWN_EMAIL_TTL_SECONDS, path=UNKNOWN_EMAIL_FILTER_PATH),
+    normalize=normalize_email,
+    aload=_aload
+)
+
+
+def get_user_by_email(email):
+    """User for email (cached), or None"""
+    data = user_cache.get(email)
+    if data is None:
+        return None
+    if normalize_email(data.get('email')) != normalize_email(email):
+        # The user changed their email since this entry was cached
+        user_cache.invalidate(email)
+        return None
+    return _deserialize(data)
+
+
+async def aget_user_by_email(email):
+    data = await user_cache.aget(email)
+    if data is None:
+        return None
+    if normalize_email(data.get('email')) != normalize_email(email):
+        await ainvalidate_user(email)
+        return None
+    return _deserialize(data)
+
+
+def load_password(user):
+    """Read user.password by pk; cached users never carry the hash"""
+    user.password = User.objects.filter(pk=user.pk).values_list('password', flat=True).first() or ''
+    return user.password
+
+
+async def aload_password(user):
+    # Deferred fields cannot lazy-load in async code: read the hash explicitly
+    user.password = await User.objects.filter(pk=user.pk).values_list('password', flat=True).afirst() or ''
+    return user.password
+
+
+def invalidate_user(email):
+    user_cache.invalidate(email)
+
+
+async def ainvalidate_user(email):
+    await user_cache.ainvalidate(email)
+
+# ============================================================================
+# SIGNALS
+# ============================================================================
+
+@receiver(pre_save, sender=User)
+def _user_saving(sender, instance, update_fields=None, **kwargs):
+    # Remember the stored email, so post_save can drop the entry under the old address
+    instance._cached_email = None
+    if instance.pk is not None and (update_fields is None or 'email' in update_fields):
+        instance._cached_email = User.objects.filter(pk=instance.pk).values_list('email', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def _user_saved(sender, instance, **kwargs):
+    # A new user, or a changed email, may sit in the unknown-email filter: override it too
+    email = instance.email
+    previous_email = getattr(instance, '_cached_email', None)
+    transaction.on_commit(lambda: user_cache.mark_exists(email))
+    if previous_email and normalize_email(previous_email) != normalize_email(email):
+        transaction.on_commit(lambda: user_cache.invalidate(previous_email))
+
+
+@receiver(post_delete, sender=User)
+def _user_deleted(sender, instance, **kwargs):
+    email = instance.email
+    transaction.on_commit(lambda: user_cache.invalidate(email))
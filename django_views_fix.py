@@ -1,19 +1,35 @@
 # Temporary fix for Django views.py
 # Replace your current request-otp view with this version
+#
+# OTPs live in the shared expiring store (otp_store.get_store('otp'), same entries as the
+# auth-flow engine's "store" backend), not in request.session: requesting an OTP writes no
+# django_session row and verifying it needs no session cookie, so any worker can verify it.
+# No API endpoint reads Django sessions (DRF authenticates with SessionTokenAuthentication),
+# so SessionMiddleware is only needed if the admin site is served.
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-import json
 import random
 import string
-import time
+
+from auth_flow import MAX_OTP_ATTEMPTS, OTP_TTL_SECONDS, StoreOtpBackend, generate_otp  # or: from .auth_flow import ...
+from django_json import request_json  # or: from .drf_json import ...
+from otp_store import get_store  # or: from .otp_store import ...
+from shared_otp_table import INVALID, TOO_MANY_ATTEMPTS, VERIFIED
+from structured_log import get_logger  # or: from .structured_log import ...
+
+otp_backend = StoreOtpBackend(get_store('otp'))
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def request_otp(request):
+    data = request_json(request)
+    if data is None:
+        return JsonResponse({
+            'error': 'Invalid JSON'
+        }, status=400)
     try:
-        data = json.loads(request.body)
         email = data.get('email')
         
         if not email:
@@ -22,15 +38,13 @@ def request_otp(request):
             }, status=400)
         
         # Generate a simple 6-digit OTP
-        otp = ''.join(random.choices(string.digits, k=6))
+        otp = generate_otp()
         
-        # Store OTP in session or cache (temporary solution)
-        request.session[f'otp_{email}'] = otp
-        request.session[f'otp_time_{email}'] = time.time()
+        # Store OTP in the shared store; it expires after OTP_TTL_SECONDS (5 minutes)
+        otp_backend.issue(email, otp, OTP_TTL_SECONDS)
         
-        # For development, print OTP to console instead of sending email
-        print(f"=== OTP for {email}: {otp} ===")
-        print(f"Use this OTP to test your app")
+        # For development the OTP is in the response; the log only records that one was issued
+        get_logger('request_otp').info('otp_issued', email=email)
         
         # Return success response
         return JsonResponse({
@@ -38,12 +52,8 @@ def request_otp(request):
             'otp': otp  # Remove this in production!
         }, status=200)
         
-    except json.JSONDecodeError:
-        return JsonResponse({
-            'error': 'Invalid JSON'
-        }, status=400)
     except Exception as e:
-        print(f"Error in request_otp: {e}")
+        get_logger('request_otp').exception('unhandled_error', error=str(e))
         return JsonResponse({
             'error': 'Internal server error'
         }, status=500)
@@ -51,8 +61,12 @@ def request_otp(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def verify_otp(request):
+    data = request_json(request)
+    if data is None:
+        return JsonResponse({
+            'error': 'Invalid JSON'
+        }, status=400)
     try:
-        data = json.loads(request.body)
         email = data.get('email')
         otp = data.get('otp')
         
@@ -61,30 +75,10 @@ def verify_otp(request):
                 'error': 'Email and OTP are required'
             }, status=400)
         
-        # Get stored OTP
-        stored_otp = request.session.get(f'otp_{email}')
-        stored_time = request.session.get(f'otp_time_{email}')
+        # Check and consume the stored OTP (expired OTPs are never returned by the store)
+        result, remaining_attempts = otp_backend.verify(email, str(otp), MAX_OTP_ATTEMPTS)
         
-        if not stored_otp:
-            return JsonResponse({
-                'error': 'OTP not found or expired'
-            }, status=400)
-        
-        # Check if OTP is expired (5 minutes)
-        if time.time() - stored_time > 300:
-            # Clear expired OTP
-            del request.session[f'otp_{email}']
-            del request.session[f'otp_time_{email}']
-            return JsonResponse({
-                'error': 'OTP expired'
-            }, status=400)
-        
-        # Verify OTP
-        if otp == stored_otp:
-            # Clear OTP after successful verification
-            del request.session[f'otp_{email}']
-            del request.session[f'otp_time_{email}']
-            
+        if result == VERIFIED:
             # Generate a simple token
             token = ''.join(random.choices(string.ascii_letters + string.digits, k=32))
             
@@ -92,17 +86,22 @@ def verify_otp(request):
                 'message': 'OTP verified successfully',
                 'token': token
             }, status=200)
+        elif result == INVALID:
+            return JsonResponse({
+                'error': 'Invalid OTP',
+                'remaining_attempts': remaining_attempts
+            }, status=400)
+        elif result == TOO_MANY_ATTEMPTS:
+            return JsonResponse({
+                'error': 'Too many verification attempts. Please request a new OTP.'
+            }, status=400)
         else:
             return JsonResponse({
-                'error': 'Invalid OTP'
+                'error': 'OTP not found or expired'
             }, status=400)
             
-    except json.JSONDecodeError:
-        return JsonResponse({
-            'error': 'Invalid JSON'
-        }, status=400)
     except Exception as e:
-        print(f"Error in verify_otp: {e}")
+        get_logger('verify_otp').exception('unhandled_error', error=str(e))
         return JsonResponse({
             'error': 'Internal server error'
         }, status=500)
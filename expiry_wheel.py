@@ -0,0 +1,122 @@
+"""
+Hierarchical Timing Wheel and Background Reaper for Expiring Keys
+Replaces full-scan cleanup of otp_storage / token_storage on the request path
+
+TimingWheel.schedule() is O(1); TimingWheel.advance() only touches the buckets whose
+time has come, so every key is moved at most `levels` times before it expires
+(amortized O(1) per key). ExpiryReaper calls store.expire() from a daemon thread,
+so verify_otp / is_token_valid never pay for housekeeping.
+"""
+
+import math
+import os
+import threading
+
+from structured_log import get_logger
+
+# How often the reaper thread purges expired keys (seconds)
+REAPER_INTERVAL = float(os.environ.get('ECHOHEALTH_REAPER_INTERVAL', '1.0'))
+
+log = get_logger('expiry_reaper')
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel keyed by absolute deadlines
+
+    Level 0 has `wheel_size` buckets of one tick each; level n buckets span
+    wheel_size ** n ticks. With the defaults (1s tick, 64 buckets, 4 levels)
+    the wheel covers ~194 days; anything further out waits in an overflow list.
+    """
+
+    def __init__(self, tick=1.0, wheel_size=64, levels=4, start=0.0):
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.current_tick = int(start // tick)
+        self._spans = [wheel_size ** level for level in range(levels + 1)]
+        self._wheels = [[[] for _ in range(wheel_size)] for _ in range(levels)]
+        self._overflow = []
+        self._due = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, key, deadline):
+        """Register key to be reported by advance() once deadline has passed"""
+        expire_tick = math.ceil(deadline / self.tick)
+        if expire_tick <= self.current_tick:
+            self._due.append(key)
+        else:
+            self._place(key, expire_tick)
+        self._count += 1
+
+    def _place(self, key, expire_tick):
+        """Put an entry into the lowest level whose range covers it"""
+        delta = expire_tick - self.current_tick
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                slot = (expire_tick // self._spans[level]) % self.wheel_size
+                self._wheels[level][slot].append((key, expire_tick))
+                return
+        self._overflow.append((key, expire_tick))
+
+    def _cascade(self, bucket, expired):
+        """Re-place entries from a higher-level bucket now that they are closer"""
+        for key, expire_tick in bucket:
+            if expire_tick <= self.current_tick:
+                expired.append(key)
+            else:
+                self._place(key, expire_tick)
+
+    def advance(self, now):
+        """Move the wheel forward to time `now` and return every key whose deadline passed"""
+        target_tick = int(now // self.tick)
+        expired, self._due = self._due, []
+        while self.current_tick < target_tick:
+            self.current_tick += 1
+            tick = self.current_tick
+
+            if self._overflow and tick % self._spans[self.levels] == 0:
+                overflow, self._overflow = self._overflow, []
+                self._cascade(overflow, expired)
+
+            for level in range(self.levels - 1, 0, -1):
+                if tick % self._spans[level] == 0:
+                    slot = (tick // self._spans[level]) % self.wheel_size
+                    bucket = self._wheels[level][slot]
+                    if bucket:
+                        self._wheels[level][slot] = []
+                        self._cascade(bucket, expired)
+
+            slot = tick % self.wheel_size
+            bucket = self._wheels[0][slot]
+            if bucket:
+                self._wheels[0][slot] = []
+                expired.extend(key for key, _ in bucket)
+
+        self._count -= len(expired)
+        return expired
+
+
+class ExpiryReaper(threading.Thread):
+    """Daemon thread that periodically calls expire() on every store returned by get_stores()"""
+
+    def __init__(self, get_stores, interval=REAPER_INTERVAL):
+        super().__init__(name='expiry-reaper', daemon=True)
+        self.get_stores = get_stores
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for store in self.get_stores():
+                try:
+                    store.expire()
+                except Exception as e:
+                    log.exception('expire_failed', store=type(store).__name__, error=str(e))
+
+    def stop(self):
+        """Ask the thread to exit after its current pass"""
+        self._stop_event.set()
@@ -0,0 +1,70 @@
+"""
+Fast JSON Encoding and Decoding for the API
+loads/dumps on orjson when it is installed (pip install orjson), otherwise on the stdlib
+json module with the same output: compact separators, UTF-8 (not \\u escapes), bytes out.
+
+    data = loads(request_body)          # bytes or str
+    body = dumps({'token': token})      # bytes
+
+Values JSON has no type for are converted like DRF's encoder does: datetimes as ISO 8601
+(UTC as "Z"), Decimal as float, UUID as str, sets and other iterables as lists, numpy
+arrays and scalars through tolist()/item().
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def default(obj):
+    """Fallback for values the JSON library cannot encode itself"""
+    if isinstance(obj, datetime.datetime):
+        text = obj.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def loads(data):
+        """bytes/str -> object; raises ValueError (orjson.JSONDecodeError) on invalid JSON"""
+        return orjson.loads(data)
+
+    def dumps(obj):
+        """object -> UTF-8 bytes"""
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+
+else:
+    _decoder = json.JSONDecoder()
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=default)
+
+    def loads(data):
+        """bytes/str -> object; raises ValueError on invalid JSON or invalid UTF-8"""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data).decode('utf-8')
+        return _decoder.decode(data)
+
+    def dumps(obj):
+        """object -> UTF-8 bytes"""
+        return _encoder.encode(obj).encode('utf-8')
@@ -0,0 +1,163 @@
+"""
+Micro-Batching Scheduler for /api/predict/ Model Calls
+Concurrent requests hand their encoded feature row to one scheduler thread, which collects
+rows for up to a short window (or until the batch is full), runs ONE vectorized model call
+and hands every caller its own (score, level):
+
+    batcher = MicroBatcher(lambda matrix: model_registry.get('risk').predict(matrix))
+    score, level = batcher.submit(row)            # sync views: blocks this request only
+    score, level = await batcher.asubmit(row)     # async views: never blocks the event loop
+
+A row is a list of len(FEATURE_COLUMNS) ints (risk_scoring.encode_row). Exceptions raised by
+the model call (ModelNotReady, ...) are re-raised in every caller of that batch, and so is a
+ValueError when the model returns a different number of scores than rows. A caller waits at
+most ECHOHEALTH_PREDICT_TIMEOUT_MS and then gets TimeoutError; a scheduler thread that died
+is restarted by the next submit.
+
+Configuration (env vars):
+    ECHOHEALTH_PREDICT_BATCH_WINDOW_MS  how long to wait for more rows after the first (default 0:
+                                        batch the rows that queued up during the previous call);
+                                        2-5 ms gives bigger batches when requests arrive spread
+                                        out, at the cost of that much latency per request
+    ECHOHEALTH_PREDICT_MAX_BATCH        rows per model call (default 64)
+    ECHOHEALTH_PREDICT_TIMEOUT_MS       how long a caller waits for its batch (default 10000)
+
+Batching pays for models with a fixed cost per call (a compiled runtime, a remote model):
+one call serves many requests. The builtin rules model costs a few µs per call, less than
+handing a row to another thread, so it is faster unbatched (see the benchmark).
+
+Benchmark: python benchmark_inference_batcher.py
+"""
+
+import asyncio
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from risk_scoring import np
+
+BATCH_WINDOW_SECONDS = float(os.environ.get('ECHOHEALTH_PREDICT_BATCH_WINDOW_MS', '0')) / 1000
+MAX_BATCH_SIZE = int(os.environ.get('ECHOHEALTH_PREDICT_MAX_BATCH', '64'))
+SUBMIT_TIMEOUT_SECONDS = float(os.environ.get('ECHOHEALTH_PREDICT_TIMEOUT_MS', '10000')) / 1000
+
+
+class MicroBatcher:
+    """Queue of (row, future) drained in batches by one scheduler thread per process"""
+
+    def __init__(self, predict, window=BATCH_WINDOW_SECONDS, max_batch=MAX_BATCH_SIZE,
+                 timeout=SUBMIT_TIMEOUT_SECONDS):
+        self.predict = predict
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.SimpleQueue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._stopped = False
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.failed_batches = 0
+        atexit.register(self.close)
+
+    def submit(self, row):
+        """(score, level) for one encoded feature row, computed in a shared batch"""
+        try:
+            return self.submit_future(row).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"no prediction within {self.timeout:g}s") from None
+
+    async def asubmit(self, row):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.submit_future(row)), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"no prediction within {self.timeout:g}s") from None
+
+    def submit_future(self, row):
+        if self._stopped:
+            raise RuntimeError("MicroBatcher is closed")
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _ensure_thread(self):
+        """Start the scheduler (threads do not survive fork, so once per worker), or restart a dead one"""
+        if self._thread_pid != os.getpid() or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread_pid != os.getpid() or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='predict-batcher', daemon=True)
+                    self._thread.start()
+                    self._thread_pid = os.getpid()
+
+    def _collect(self):
+        """Block for the first row, then gather more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                # Rows that queued up during the previous model call are taken without waiting
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # None is close()'s stop marker
+            items = [item for item in batch if item is not None]
+            if items:
+                self._predict(items)
+            if len(items) < len(batch):
+                return
+
+    def _predict(self, items):
+        rows = [row for row, _ in items]
+        try:
+            scores, levels = self.predict(np.array(rows, dtype=np.int32) if np is not None else rows)
+            scores = scores.tolist() if hasattr(scores, 'tolist') else scores
+            levels = levels.tolist() if hasattr(levels, 'tolist') else levels
+            if len(scores) != len(items) or len(levels) != len(items):
+                raise ValueError(f"model returned {len(scores)} scores and {len(levels)} levels "
+                                 f"for {len(items)} rows")
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in items:
+                future.set_exception(e)
+            return
+        for (_, future), score, level in zip(items, scores, levels):
+            future.set_result((score, level))
+        self.batches += 1
+        self.rows += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0,
+            'largest_batch': self.largest_batch,
+            'failed_batches': self.failed_batches,
+            'queued': self._queue.qsize(),
+        }
@@ -0,0 +1,154 @@
+"""
+Precomputed Lookup Table over the Whole Symptom Feature Space
+Apart from age, SymptomFeatures is 10 yes/no flags and a gender code (4 values with
+"unknown"): 4096 combinations. With age cut into bands, the model's answer for every
+combination fits in a small table built once when the model loads; a prediction is then
+one index computation and one array read:
+
+    table = LookupTableModel.build(model, age_bands=(0, 40))
+    mismatches = table.verify(model)             # every age in CHECK_AGES x every combination
+    score, level = table.predict_row(row)        # one encoded row, no NumPy call
+    scores, levels = table.predict(matrix)       # same interface as RiskModel.predict
+
+Index of a row: band(age) * 4096 + gender * 1024 + flag bits (Tobacco_Use = bit 0, ...).
+The table is only exact if the model gives the same answer for every age inside a band;
+verify() checks that against the live model, and model_registry.py serves the table only
+when it found no mismatch.
+
+Benchmark: python benchmark_lookup_table.py
+"""
+
+import bisect
+from array import array
+
+from risk_scoring import (
+    AGE_COLUMN, FEATURE_COLUMNS, FIRST_FLAG_COLUMN, FLAG_COLUMNS, GENDER_CODES, GENDER_COLUMN, MAX_AGE, np
+)
+
+FLAG_COMBINATIONS = 1 << len(FLAG_COLUMNS)
+GENDER_VALUES = len(GENDER_CODES) + 1
+ROWS_PER_BAND = GENDER_VALUES * FLAG_COMBINATIONS
+CHECK_AGES = range(MAX_AGE + 1)
+# Narrowest signed typecode that holds every score: int16 for the builtin rules
+SCORE_TYPECODES = (('h', 16), ('i', 32), ('q', 64))
+
+
+def age_bands_for(model):
+    """Band lower bounds that keep the table exact for a RiskModel (one band per age rule)"""
+    threshold = getattr(model, 'age_threshold', None)
+    return (0, threshold) if threshold else (0,)
+
+
+def band_grid(age):
+    """Every gender x flag combination at one age, in table order"""
+    rows = []
+    for gender in range(GENDER_VALUES):
+        for bits in range(FLAG_COMBINATIONS):
+            row = [0] * len(FEATURE_COLUMNS)
+            row[AGE_COLUMN] = age
+            row[GENDER_COLUMN] = gender
+            for flag in range(len(FLAG_COLUMNS)):
+                row[FIRST_FLAG_COLUMN + flag] = (bits >> flag) & 1
+            rows.append(row)
+    return np.array(rows, dtype=np.int32) if np is not None else rows
+
+
+def _to_list(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def score_typecode(scores):
+    """array/NumPy typecode for the table's scores; OverflowError past int64"""
+    low, high = min(scores, default=0), max(scores, default=0)
+    for typecode, bits in SCORE_TYPECODES:
+        if -(1 << (bits - 1)) <= low and high < 1 << (bits - 1):
+            return typecode
+    raise OverflowError(f"scores {low}..{high} do not fit in 64 bits")
+
+
+class LookupTableModel:
+    """Scores and levels for every (age band, gender, flags) combination"""
+
+    def __init__(self, age_bands, scores, levels):
+        self.age_bands = tuple(age_bands)
+        typecode = score_typecode(scores)
+        if np is not None:
+            self.scores = np.asarray(scores, dtype=np.dtype(typecode))
+            self.levels = np.asarray(levels, dtype=np.int8)
+            self._bands = np.asarray(self.age_bands, dtype=np.int32)
+            self._bit_weights = (1 << np.arange(len(FLAG_COLUMNS))).astype(np.int32)
+        else:
+            self.scores = array(typecode, scores)
+            self.levels = array('b', levels)
+
+    @classmethod
+    def build(cls, model, age_bands=None):
+        """Run model once over the full grid of every band"""
+        age_bands = age_bands_for(model) if age_bands is None else age_bands
+        scores, levels = [], []
+        for age in age_bands:
+            band_scores, band_levels = model.predict(band_grid(age))
+            scores.extend(_to_list(band_scores))
+            levels.extend(_to_list(band_levels))
+        return cls(age_bands, scores, levels)
+
+    @property
+    def nbytes(self):
+        if np is not None:
+            return self.scores.nbytes + self.levels.nbytes
+        return len(self.scores) * self.scores.itemsize + len(self.levels) * self.levels.itemsize
+
+    def __len__(self):
+        return len(self.scores)
+
+    def band(self, age):
+        return max(0, bisect.bisect_right(self.age_bands, age) - 1)
+
+    def index(self, row):
+        bits = 0
+        for flag in range(len(FLAG_COLUMNS)):
+            if row[FIRST_FLAG_COLUMN + flag]:
+                bits |= 1 << flag
+        return self.band(row[AGE_COLUMN]) * ROWS_PER_BAND + row[GENDER_COLUMN] * FLAG_COMBINATIONS + bits
+
+    def predict_row(self, row):
+        """(score, level) for one encoded row (a list of ints)"""
+        i = self.index(row)
+        return int(self.scores[i]), int(self.levels[i])
+
+    def predict(self, matrix):
+        """(N x 12) feature matrix -> (scores, level indexes), like RiskModel.predict"""
+        if np is None:
+            indexes = [self.index(row) for row in matrix]
+            return [self.scores[i] for i in indexes], [self.levels[i] for i in indexes]
+        matrix = np.asarray(matrix)
+        bands = np.maximum(np.searchsorted(self._bands, matrix[:, AGE_COLUMN], side='right') - 1, 0)
+        indexes = (
+            bands * ROWS_PER_BAND
+            + matrix[:, GENDER_COLUMN] * FLAG_COMBINATIONS
+            + matrix[:, FIRST_FLAG_COLUMN:] @ self._bit_weights
+        )
+        return self.scores[indexes], self.levels[indexes]
+
+    def verify(self, model, ages=CHECK_AGES):
+        """Rows where the table disagrees with the live model, over every combination at each age"""
+        mismatches = 0
+        grid = band_grid(0)
+        for age in ages:
+            if np is not None:
+                grid[:, AGE_COLUMN] = age
+            else:
+                for row in grid:
+                    row[AGE_COLUMN] = age
+            live_scores, live_levels = model.predict(grid)
+            table_scores, table_levels = self.predict(grid)
+            if np is not None:
+                mismatches += int(np.count_nonzero((np.asarray(live_scores) != table_scores)
+                                                   | (np.asarray(live_levels) != table_levels)))
+            else:
+                mismatches += sum(
+                    1 for live_score, live_level, score, level
+                    in zip(live_scores, live_levels, table_scores, table_levels)
+                    if live_score != score or live_level != level
+                )
+        return mismatches
@@ -0,0 +1,213 @@
+"""
+Model Registry: load, validate and warm up the predict models before serving traffic
+Every configured model is loaded once per process by load_all(), checked on sample rows and
+run through a warm-up batch; until that has finished, ready() is False and get() raises
+ModelNotReady (the views answer 503 and the readiness probe fails).
+
+Call load_all() at boot, never from a request. In your AppConfig:
+
+    class YourAppConfig(AppConfig):                  # CHANGE THIS
+        def ready(self):
+            from model_registry import model_registry
+            model_registry.load_all()
+
+gunicorn loads the Django app in each worker before the worker accepts connections; with
+preload_app = True it is loaded once in the master and the workers inherit the warm models
+through fork().
+
+Configuration (env vars):
+    ECHOHEALTH_MODELS           name=source pairs, e.g. "risk=builtin" (default) or
+                                "risk=/srv/models/risk_weights.json"; a source is "builtin" (the
+                                app's rules), a JSON weights file for RiskModel, or a pickled object
+                                with the same predict(matrix) -> (scores, levels) method
+    ECHOHEALTH_PREDICT_LOOKUP   1 precomputes every feature combination per age band
+                                (lookup_table.py) and serves the table instead of the model,
+                                if it matches the model on every checked age
+    ECHOHEALTH_LOOKUP_AGE_BANDS band lower bounds, e.g. "0,40"; default: the model's age rule
+
+Cold-start times (load, validation, warm-up per model) and the lookup table's size and
+mismatch count are in stats(), exported on /metrics.
+"""
+
+import json
+import os
+import pickle
+import random
+import threading
+import time
+
+from lookup_table import LookupTableModel
+from risk_scoring import FEATURE_COLUMNS, FLAG_COLUMNS, GENDER_CODES, RISK_LEVELS, RiskModel, np
+from structured_log import get_logger
+
+MODEL_SOURCES = os.environ.get('ECHOHEALTH_MODELS', 'risk=builtin')
+PREDICT_LOOKUP = os.environ.get('ECHOHEALTH_PREDICT_LOOKUP', '0') == '1'
+LOOKUP_AGE_BANDS = tuple(
+    int(age) for age in os.environ.get('ECHOHEALTH_LOOKUP_AGE_BANDS', '').split(',') if age.strip()
+)
+WARMUP_ROWS = 1024
+VALIDATION_ROWS = 64
+
+log = get_logger('model_registry')
+
+
+class ModelNotReady(Exception):
+    """The model has not finished loading (or failed to load) in this process"""
+
+
+def parse_model_sources(spec):
+    """"risk=builtin,other=/path" -> {'risk': 'builtin', 'other': '/path'}"""
+    sources = {}
+    for part in spec.split(','):
+        name, _, source = part.partition('=')
+        if name.strip() and source.strip():
+            sources[name.strip()] = source.strip()
+    return sources
+
+
+def load_model(source):
+    """Build the model for one source string"""
+    if source == 'builtin':
+        return RiskModel()
+    if source.endswith('.json'):
+        with open(source) as f:
+            return RiskModel(**json.load(f))
+    with open(source, 'rb') as f:
+        return pickle.load(f)
+
+
+def sample_matrix(rows, seed=0):
+    """Random but valid feature rows (ages 18-90, every gender code, 0/1 flags)"""
+    rng = random.Random(seed)
+    matrix = [
+        [rng.randint(18, 90), rng.randint(0, len(GENDER_CODES))] + [rng.randint(0, 1) for _ in FLAG_COLUMNS]
+        for _ in range(rows)
+    ]
+    return np.array(matrix, dtype=np.int32) if np is not None else matrix
+
+
+def validate_model(model):
+    """Raise ValueError unless predict() gives one score and one valid level per row"""
+    matrix = sample_matrix(VALIDATION_ROWS, seed=1)
+    scores, levels = model.predict(matrix)
+    if len(scores) != VALIDATION_ROWS or len(levels) != VALIDATION_ROWS:
+        raise ValueError(f"predict() returned {len(scores)} scores / {len(levels)} levels "
+                         f"for {VALIDATION_ROWS} rows of {len(FEATURE_COLUMNS)} features")
+    if any(not 0 <= int(level) < len(RISK_LEVELS) for level in levels):
+        raise ValueError("predict() returned a risk level outside RISK_LEVELS")
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class ModelRegistry:
+    """Named models plus what it took to make each one ready"""
+
+    def __init__(self, sources=None, loader=load_model, warmup_rows=WARMUP_ROWS, lookup=PREDICT_LOOKUP,
+                 lookup_age_bands=LOOKUP_AGE_BANDS or None):
+        self.sources = parse_model_sources(MODEL_SOURCES) if sources is None else dict(sources)
+        self.loader = loader
+        self.warmup_rows = warmup_rows
+        self.lookup = lookup
+        self.lookup_age_bands = lookup_age_bands
+        self._models = {}
+        self._model_stats = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.cold_start_seconds = None
+
+    def load_all(self):
+        """Load, validate and warm up every configured model; True if all are ready"""
+        with self._lock:
+            if self._loaded:
+                return self.ready()
+            started = time.perf_counter()
+            for name, source in self.sources.items():
+                try:
+                    self._models[name], self._model_stats[name] = self._prepare(name, source)
+                except Exception as e:
+                    self._failures[name] = str(e)
+                    log.exception('model_load_failed', model=name, source=source, error=str(e))
+            self.cold_start_seconds = time.perf_counter() - started
+            self._loaded = True
+            log.info('models_loaded', ready=self.ready(), models=sorted(self._models),
+                     cold_start_seconds=round(self.cold_start_seconds, 4))
+            return self.ready()
+
+    def _prepare(self, name, source):
+        timings = {}  # also carries the lookup table's counters
+        start = time.perf_counter()
+        model = self.loader(source)
+        timings['load_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        validate_model(model)
+        timings['validate_seconds'] = time.perf_counter() - start
+
+        # First calls pay for lazy imports, allocator growth and BLAS setup: not a user's request
+        start = time.perf_counter()
+        model.predict(sample_matrix(1))
+        model.predict(sample_matrix(self.warmup_rows))
+        timings['warmup_seconds'] = time.perf_counter() - start
+        if self.lookup:
+            model = self._lookup_table(name, model, timings)
+        return model, timings
+
+    def _lookup_table(self, name, model, timings):
+        """The precomputed table for model if it is exact, else model itself"""
+        try:
+            start = time.perf_counter()
+            table = LookupTableModel.build(model, self.lookup_age_bands)
+            timings['lookup_build_seconds'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            mismatches = table.verify(model)
+            timings['lookup_verify_seconds'] = time.perf_counter() - start
+        except Exception as e:
+            # A table that cannot hold this model's output must not fail the model itself
+            log.warning('lookup_table_failed', model=name, error=str(e))
+            return model
+        timings['lookup_entries'] = len(table)
+        timings['lookup_bytes'] = table.nbytes
+        timings['lookup_mismatches'] = mismatches
+        if mismatches:
+            log.warning('lookup_table_inexact', model=name, mismatches=mismatches, age_bands=table.age_bands)
+            return model
+        log.info('lookup_table_ready', model=name, entries=len(table), bytes=table.nbytes)
+        return table
+
+    def ready(self):
+        return self._loaded and not self._failures and len(self._models) == len(self.sources)
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is None:
+            raise ModelNotReady(self._failures.get(name, f"model '{name}' is not loaded yet"))
+        return model
+
+    def status(self):
+        """Readiness details for the probe endpoint"""
+        return {
+            'ready': self.ready(),
+            'models': {
+                name: 'failed' if name in self._failures else 'ready' if name in self._models else 'loading'
+                for name in self.sources
+            },
+        }
+
+    def stats(self):
+        stats = {
+            'ready': int(self.ready()),
+            'models': len(self._models),
+            'load_failures': len(self._failures),
+        }
+        if self.cold_start_seconds is not None:
+            stats['cold_start_seconds'] = self.cold_start_seconds
+        for name, model_stats in self._model_stats.items():
+            for stat, value in model_stats.items():
+                stats[f'{name}_{stat}'] = value
+        return stats
+
+
+model_registry = ModelRegistry()
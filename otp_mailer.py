@@ -0,0 +1,303 @@
+"""
+Asynchronous OTP Mail Queue with Pooled SMTP Connections
+request_otp only enqueues the email and returns once the OTP is stored.
+
+MAIL_WORKERS threads each keep one persistent SMTP connection (the pool), take up to
+MAIL_BATCH_SIZE queued messages at a time and send them over that connection.
+Transient failures (4xx replies, dropped connections) are retried with exponential
+backoff and jitter up to MAIL_MAX_ATTEMPTS; permanent 5xx failures are dropped and counted.
+
+Django settings (see django_email_fix.py) choose the transport: the SMTP backend is
+replaced by pooled smtplib connections, any other backend (console, file, dummy) is
+driven through Django's own connection so development setups keep working.
+"""
+
+import atexit
+import heapq
+import itertools
+import os
+import queue
+import random
+import smtplib
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+
+from structured_log import get_logger
+
+MAIL_WORKERS = int(os.environ.get('ECHOHEALTH_MAIL_WORKERS', '2'))
+MAIL_BATCH_SIZE = int(os.environ.get('ECHOHEALTH_MAIL_BATCH_SIZE', '50'))
+MAIL_QUEUE_SIZE = int(os.environ.get('ECHOHEALTH_MAIL_QUEUE_SIZE', '10000'))
+MAIL_MAX_ATTEMPTS = 5
+MAIL_BACKOFF_BASE = 1.0
+MAIL_BACKOFF_MAX = 60.0
+MAIL_IDLE_TIMEOUT = 60.0
+MAIL_POLL_INTERVAL = 0.5
+
+log = get_logger('otp_mail')
+
+
+def build_otp_message(to_email, otp, from_email='noreply@echohealth.com', subject_prefix='', ttl_minutes=5):
+    """Plain-text OTP email"""
+    message = EmailMessage()
+    message['Subject'] = f"{subject_prefix}Your EchoHealth verification code"
+    message['From'] = from_email
+    message['To'] = to_email
+    message.set_content(
+        f"Your verification code is {otp}. It expires in {ttl_minutes} minutes.\n\n"
+        "If you did not request a password reset, you can ignore this email."
+    )
+    return message
+
+
+def smtp_connector(host, port, username=None, password=None, use_tls=False, use_ssl=False, timeout=10):
+    """Return a factory that opens an authenticated smtplib connection"""
+    def connect():
+        if use_ssl:
+            connection = smtplib.SMTP_SSL(host, port, timeout=timeout, context=ssl.create_default_context())
+        else:
+            connection = smtplib.SMTP(host, port, timeout=timeout)
+            if use_tls:
+                connection.starttls(context=ssl.create_default_context())
+        if username:
+            connection.login(username, password)
+        return connection
+    return connect
+
+
+def is_transient(error):
+    """True if sending may succeed later (4xx reply, network trouble)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def _connection_lost(error):
+    return isinstance(error, smtplib.SMTPServerDisconnected) or (
+        isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+    )
+
+
+def _close(connection):
+    try:
+        connection.quit()
+    except Exception:
+        pass
+
+# ============================================================================
+# MAIL QUEUE
+# ============================================================================
+
+class MailQueue:
+    """Bounded outbound queue drained by worker threads with persistent connections"""
+
+    def __init__(self, connect, workers=MAIL_WORKERS, batch_size=MAIL_BATCH_SIZE, maxsize=MAIL_QUEUE_SIZE,
+                 max_attempts=MAIL_MAX_ATTEMPTS, backoff_base=MAIL_BACKOFF_BASE,
+                 backoff_max=MAIL_BACKOFF_MAX, idle_timeout=MAIL_IDLE_TIMEOUT):
+        self.connect = connect
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue(maxsize)
+        self._retries = []
+        self._retry_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._threads_pid = None
+        self._stopped = False
+        self.enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        atexit.register(self.close)
+
+    def enqueue(self, message):
+        """Queue message for delivery; False if the queue is full"""
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((1, message))
+        except queue.Full:
+            self.rejected += 1
+            log.error('mail_queue_full', to=message['To'])
+            return False
+        self.enqueued += 1
+        return True
+
+    def _ensure_workers(self):
+        """Start the sender threads (threads do not survive fork, so once per worker)"""
+        if self._threads_pid != os.getpid() and not self._stopped:
+            with self._start_lock:
+                if self._threads_pid != os.getpid():
+                    self._threads = [
+                        threading.Thread(target=self._run, name=f'mail-sender-{i}', daemon=True)
+                        for i in range(self.workers)
+                    ]
+                    for thread in self._threads:
+                        thread.start()
+                    self._threads_pid = os.getpid()
+
+    def _schedule_retry(self, attempt, message, error):
+        if attempt >= self.max_attempts:
+            self.failed += 1
+            log.error('mail_failed', to=message['To'], attempts=attempt, error=str(error))
+            return
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+        with self._retry_lock:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), attempt + 1, message))
+        self.retried += 1
+
+    def _poll_timeout(self):
+        """Wait for new mail no longer than until the next retry is due"""
+        with self._retry_lock:
+            if self._retries:
+                return max(0.0, min(MAIL_POLL_INTERVAL, self._retries[0][0] - time.monotonic()))
+        return MAIL_POLL_INTERVAL
+
+    def _next_batch(self):
+        batch = []
+        now = time.monotonic()
+        with self._retry_lock:
+            while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+                _, _, attempt, message = heapq.heappop(self._retries)
+                batch.append((attempt, message))
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=self._poll_timeout()))
+            except queue.Empty:
+                return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _send_batch(self, connection, batch):
+        """Send batch over connection (opening one if needed); returns the connection to keep"""
+        for index, (attempt, message) in enumerate(batch):
+            try:
+                if connection is None:
+                    connection = self.connect()
+                connection.send_message(message)
+                self.sent += 1
+            except Exception as e:
+                if not is_transient(e):
+                    self.failed += 1
+                    log.error('mail_rejected', to=message['To'], error=str(e))
+                    continue
+                self._schedule_retry(attempt, message, e)
+                if connection is None or _connection_lost(e):
+                    if connection is not None:
+                        _close(connection)
+                    # Server unreachable: retry the rest of the batch later instead of reconnecting per message
+                    for later_attempt, later_message in batch[index + 1:]:
+                        self._schedule_retry(later_attempt, later_message, e)
+                    return None
+        self.batches += 1
+        return connection
+
+    def _run(self):
+        connection = None
+        last_used = time.monotonic()
+        while not (self._stopped and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                connection = self._send_batch(connection, batch)
+                last_used = time.monotonic()
+            elif connection is not None and time.monotonic() - last_used > self.idle_timeout:
+                _close(connection)
+                connection = None
+        if connection is not None:
+            _close(connection)
+
+    def close(self, timeout=10.0):
+        """Stop accepting work, drain the queue and close connections"""
+        self._stopped = True
+        if self._threads_pid == os.getpid():
+            deadline = time.monotonic() + timeout
+            for thread in self._threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        if self._retries:
+            log.warning('mail_queue_closed', pending_retries=len(self._retries))
+
+    def stats(self):
+        """Counters for instrumentation"""
+        return {
+            'depth': self._queue.qsize(),
+            'retrying': len(self._retries),
+            'enqueued': self.enqueued,
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'batches': self.batches,
+        }
+
+# ============================================================================
+# DJANGO INTEGRATION
+# ============================================================================
+
+class DjangoBackendConnection:
+    """Drives a non-SMTP Django email backend (console, file, dummy) from the queue"""
+
+    def __init__(self):
+        from django.core.mail import get_connection
+        self.backend = get_connection(fail_silently=False)
+        self.backend.open()
+
+    def send_message(self, message):
+        from django.core.mail import EmailMessage as DjangoEmailMessage
+        self.backend.send_messages([
+            DjangoEmailMessage(message['Subject'], message.get_content(), message['From'], [message['To']])
+        ])
+
+    def quit(self):
+        self.backend.close()
+
+
+_mailer = None
+
+
+def get_mailer():
+    """Process-wide MailQueue built from Django's EMAIL_* settings"""
+    global _mailer
+    if _mailer is None:
+        from django.conf import settings
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+            connect = smtp_connector(
+                settings.EMAIL_HOST, settings.EMAIL_PORT,
+                settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD,
+                use_tls=settings.EMAIL_USE_TLS, use_ssl=settings.EMAIL_USE_SSL,
+                timeout=settings.EMAIL_TIMEOUT or 10
+            )
+        else:
+            connect = DjangoBackendConnection
+        _mailer = MailQueue(connect)
+    return _mailer
+
+
+def send_otp_email(email, otp, ttl_minutes=5):
+    """Queue the OTP email; returns immediately"""
+    from django.conf import settings
+    return get_mailer().enqueue(build_otp_message(
+        email, otp,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        subject_prefix=getattr(settings, 'EMAIL_SUBJECT_PREFIX', ''),
+        ttl_minutes=ttl_minutes
+    ))
+
+
+async def asend_otp_email(email, otp, ttl_minutes=5):
+    """send_otp_email() for ASGI views; enqueue() never waits, so it runs inline"""
+    return send_otp_email(email, otp, ttl_minutes)
@@ -0,0 +1,583 @@
+"""
+Shared Expiring Store for OTPs and Reset Tokens
+Replaces the module-level otp_storage / token_storage dicts in the django_*_fix.py views
+
+All backends expose the same interface, so a view only ever talks to get_store():
+
+    otp_storage = get_store('otp')
+    otp_storage.set(email, {'otp': otp, 'attempts': 0}, ttl=OTP_TTL_SECONDS)
+    stored_data = otp_storage.get(email)      # None if missing or expired
+    otp_storage.replace(email, stored_data)   # update value, keep expiry
+    otp_storage.delete(email)
+    status, remaining = otp_storage.verify_otp(email, otp, max_attempts=3)  # atomic
+    dropped = otp_storage.append(key, item, ttl=60, keep=5)   # atomic list append
+
+ASGI views use the same calls with an "a" prefix (await otp_storage.aget(email), ...);
+backends that do I/O run them in a worker thread so the event loop never blocks.
+
+Backends:
+    memory  - LocalMemoryStore, one process only (runserver / single worker), lock-striped
+    manager - ManagerStore, one store process shared by every gunicorn worker; only processes
+              holding the authkey may connect (the manager protocol unpickles requests)
+    sqlite  - SQLiteStore, a WAL-mode SQLite file shared by every worker on the node
+
+Values must be JSON-serialisable (store timestamps as time.time() floats, not datetime).
+Expired keys are never returned; they are purged by a background ExpiryReaper
+(see expiry_wheel.py), never on the request path.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from expiry_wheel import ExpiryReaper, TimingWheel
+from private_files import open_private
+from shared_otp_table import INVALID, MISSING, TOO_MANY_ATTEMPTS, VERIFIED
+from structured_log import get_logger
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Backend used by get_store(): "memory", "manager" or "sqlite"
+STORE_BACKEND = os.environ.get('ECHOHEALTH_STORE_BACKEND', 'sqlite')
+
+# SQLite backend: one file per node, shared by all workers
+SQLITE_PATH = os.environ.get(
+    'ECHOHEALTH_STORE_PATH',
+    os.path.join(tempfile.gettempdir(), 'echohealth_store.sqlite3')
+)
+
+# Memory backend: independent locks; a key always maps to the same one
+MEMORY_STORE_STRIPES = int(os.environ.get('ECHOHEALTH_STORE_STRIPES', '16'))
+
+# Manager backend: address of the store process started by serve_store(). Without
+# ECHOHEALTH_STORE_AUTHKEY the key is None: multiprocessing then uses the random authkey
+# of the gunicorn master, which the store process and every forked worker inherit
+MANAGER_ADDRESS = os.environ.get('ECHOHEALTH_STORE_ADDRESS', '127.0.0.1:50505')
+MANAGER_AUTHKEY = os.environ.get('ECHOHEALTH_STORE_AUTHKEY', '').encode() or None
+
+log = get_logger('otp_store')
+
+
+def now():
+    """Clock used for all expiry decisions (wall clock, shared between processes)"""
+    return time.time()
+
+# ============================================================================
+# STORE INTERFACE
+# ============================================================================
+
+class ExpiringStore:
+    """Key/value store where every key carries its own expiry time"""
+
+    # False for in-process backends whose calls never wait on I/O
+    blocking = True
+
+    def get(self, key, default=None):
+        """Return the live value for key, or default if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds, replacing any previous value"""
+        raise NotImplementedError
+
+    def replace(self, key, value):
+        """Update the value of a live key without touching its expiry; False if gone"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove key; True if a live value was removed"""
+        raise NotImplementedError
+
+    def pop(self, key, default=None):
+        """Remove key and return its live value"""
+        raise NotImplementedError
+
+    def expire(self):
+        """Drop every expired key and return how many were removed"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every key"""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def verify_otp(self, key, otp, max_attempts):
+        """
+        Check otp against the {'otp', 'attempts'} entry under key as one atomic step
+        Returns (status, remaining attempts) like SharedOtpTable.verify(): the entry is
+        deleted when verified or when the attempts are used up, otherwise attempts += 1
+        """
+        raise NotImplementedError
+
+    def append(self, key, item, ttl, keep=None):
+        """
+        Append item to the list under key as one atomic step (a missing key starts a new list)
+        Only the newest `keep` items are kept and the key's expiry is reset to ttl; returns
+        the items that were dropped
+        """
+        raise NotImplementedError
+
+    # Async interface (ASGI views)
+
+    async def _arun(self, fn, *args):
+        if not self.blocking:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def aget(self, key, default=None):
+        return await self._arun(self.get, key, default)
+
+    async def aset(self, key, value, ttl):
+        return await self._arun(self.set, key, value, ttl)
+
+    async def areplace(self, key, value):
+        return await self._arun(self.replace, key, value)
+
+    async def adelete(self, key):
+        return await self._arun(self.delete, key)
+
+    async def apop(self, key, default=None):
+        return await self._arun(self.pop, key, default)
+
+    async def averify_otp(self, key, otp, max_attempts):
+        return await self._arun(self.verify_otp, key, otp, max_attempts)
+
+    async def aappend(self, key, item, ttl, keep=None):
+        return await self._arun(self.append, key, item, ttl, keep)
+
+
+def check_otp_entry(value, otp, max_attempts):
+    """
+    One verification attempt against a stored {'otp', 'attempts'} value
+    Returns (status, remaining, new value); a new value of None means delete the entry
+    """
+    if value['attempts'] >= max_attempts:
+        return TOO_MANY_ATTEMPTS, 0, None
+    attempts = value['attempts'] + 1
+    if hmac.compare_digest(str(value['otp']).encode(), str(otp).encode()):
+        return VERIFIED, max_attempts - attempts, None
+    return INVALID, max_attempts - attempts, dict(value, attempts=attempts)
+
+def append_item(items, item, keep):
+    """(new list, dropped items) for one append() to the stored list items (None if missing)"""
+    items = list(items or []) + [item]
+    if keep is None or len(items) <= keep:
+        return items, []
+    return items[-keep:], items[:-keep]
+
+# ============================================================================
+# IN-PROCESS BACKEND
+# ============================================================================
+
+class _Stripe:
+    """One lock with the keys it guards and their timing wheel"""
+
+    __slots__ = ('lock', 'data', 'wheel')
+
+    def __init__(self, tick):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.wheel = TimingWheel(tick=tick, start=now())
+
+
+class LocalMemoryStore(ExpiringStore):
+    """
+    Dict-backed store for a single process, split into lock stripes by key hash
+    Writers only lock their key's stripe, so threads working on different emails do not
+    wait on each other. Expiry is checked lazily on read; expire() only visits keys the
+    timing wheels report
+    """
+
+    blocking = False
+
+    def __init__(self, tick=1.0, stripes=MEMORY_STORE_STRIPES):
+        self.tick = tick
+        self._stripes = [_Stripe(tick) for _ in range(max(1, stripes))]
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key, default=None):
+        stripe = self._stripe(key)
+        entry = stripe.data.get(key)
+        if entry is None:
+            return default
+        if entry[1] <= now():
+            with stripe.lock:
+                if stripe.data.get(key) is entry:
+                    del stripe.data[key]
+            return default
+        return entry[0]
+
+    def set(self, key, value, ttl):
+        expires_at = now() + ttl
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.data[key] = (value, expires_at)
+            stripe.wheel.schedule(key, expires_at)
+
+    def replace(self, key, value):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.get(key)
+            if entry is None or entry[1] <= now():
+                return False
+            stripe.data[key] = (value, entry[1])
+            return True
+
+    def delete(self, key):
+        return self.pop(key) is not None
+
+    def pop(self, key, default=None):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.pop(key, None)
+        if entry is None or entry[1] <= now():
+            return default
+        return entry[0]
+
+    def verify_otp(self, key, otp, max_attempts):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.get(key)
+            if entry is None or entry[1] <= now():
+                return MISSING, 0
+            status, remaining, value = check_otp_entry(entry[0], otp, max_attempts)
+            if value is None:
+                del stripe.data[key]
+            else:
+                stripe.data[key] = (value, entry[1])
+            return status, remaining
+
+    def append(self, key, item, ttl, keep=None):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.get(key)
+            current_time = now()
+            items, dropped = append_item(
+                entry[0] if entry is not None and entry[1] > current_time else None, item, keep
+            )
+            stripe.data[key] = (items, current_time + ttl)
+            stripe.wheel.schedule(key, current_time + ttl)
+            return dropped
+
+    def expire(self):
+        current_time = now()
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                # The wheel may report keys that were since overwritten or deleted
+                for key in stripe.wheel.advance(current_time):
+                    entry = stripe.data.get(key)
+                    if entry is not None and entry[1] <= current_time:
+                        del stripe.data[key]
+                        removed += 1
+        return removed
+
+    def clear(self):
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.data.clear()
+                stripe.wheel = TimingWheel(tick=self.tick, start=now())
+
+    def __len__(self):
+        return sum(len(stripe.data) for stripe in self._stripes)
+
+# ============================================================================
+# MULTI-PROCESS BACKEND
+# ============================================================================
+
+class _StoreManager(BaseManager):
+    """Manager that hosts one LocalMemoryStore per store name"""
+
+
+_served_stores = {}
+
+
+def _served_store(name):
+    """Return (creating on first use) the server-side store for name"""
+    if name not in _served_stores:
+        _served_stores[name] = LocalMemoryStore()
+    return _served_stores[name]
+
+
+_StoreManager.register(
+    'store',
+    callable=_served_store,
+    exposed=('get', 'set', 'replace', 'delete', 'pop', 'verify_otp', 'append', 'expire', 'clear', '__len__',
+             '__contains__')
+)
+
+
+def _parse_address(address):
+    """Turn "host:port" into a (host, port) tuple; other strings are unix socket paths"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def serve_store(address=MANAGER_ADDRESS, authkey=MANAGER_AUTHKEY):
+    """
+    Run the shared store process (blocks forever)
+    Start it once per node, e.g. from gunicorn's on_starting hook:
+
+        def on_starting(server):
+            multiprocessing.Process(target=otp_store.serve_store, daemon=True).start()
+
+    Started that way it shares the master's random authkey with the workers; a store
+    run outside the master's process tree needs ECHOHEALTH_STORE_AUTHKEY set (a long
+    random secret) in both.
+    """
+    manager = _StoreManager(address=_parse_address(address), authkey=authkey)
+    server = manager.get_server()
+    ExpiryReaper(lambda: list(_served_stores.values())).start()
+    log.info('store_listening', address=address)
+    server.serve_forever()
+
+
+class ManagerStore(ExpiringStore):
+    """Proxy to the store process started by serve_store(); one connection per worker"""
+
+    def __init__(self, name, address=MANAGER_ADDRESS, authkey=MANAGER_AUTHKEY):
+        self.name = name
+        self.address = _parse_address(address)
+        self.authkey = authkey
+        self._proxy = None
+        self._pid = None
+
+    def _store(self):
+        # Proxies must not be shared across fork(), so reconnect in each worker
+        if self._proxy is None or self._pid != os.getpid():
+            manager = _StoreManager(address=self.address, authkey=self.authkey)
+            manager.connect()
+            self._proxy = manager.store(self.name)
+            self._pid = os.getpid()
+        return self._proxy
+
+    def get(self, key, default=None):
+        value = self._store().get(key)
+        return default if value is None else value
+
+    def set(self, key, value, ttl):
+        self._store().set(key, value, ttl)
+
+    def replace(self, key, value):
+        return self._store().replace(key, value)
+
+    def delete(self, key):
+        return self._store().delete(key)
+
+    def pop(self, key, default=None):
+        value = self._store().pop(key)
+        return default if value is None else value
+
+    def verify_otp(self, key, otp, max_attempts):
+        # Runs inside the store process, under the key's stripe lock there
+        return self._store().verify_otp(key, otp, max_attempts)
+
+    def append(self, key, item, ttl, keep=None):
+        return self._store().append(key, item, ttl, keep)
+
+    def expire(self):
+        return self._store().expire()
+
+    def clear(self):
+        self._store().clear()
+
+    def __len__(self):
+        return self._store().__len__()
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+
+class SQLiteStore(ExpiringStore):
+    """
+    Store backed by a local SQLite file in WAL mode
+    Every key is a PRIMARY KEY lookup, so get/set stay O(1)-ish (B-tree) across all workers
+    """
+
+    def __init__(self, name, path=SQLITE_PATH):
+        self.table = f"store_{name}"
+        self.path = path
+        self._local = threading.local()
+        self._create_file()
+        self._create_table()
+
+    def _create_file(self):
+        """Create the file owner-only (it holds plaintext OTPs); SQLite gives -wal/-shm the same mode"""
+        os.close(open_private(self.path))
+
+    def _conn(self):
+        # sqlite3 connections are per thread and must not survive fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_table(self):
+        conn = self._conn()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_expires_at ON {self.table}(expires_at)"
+        )
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, now())
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        self._conn().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), now() + ttl)
+        )
+
+    def replace(self, key, value):
+        cursor = self._conn().execute(
+            f"UPDATE {self.table} SET value = ? WHERE key = ? AND expires_at > ?",
+            (json.dumps(value), key, now())
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        cursor = self._conn().execute(
+            f"DELETE FROM {self.table} WHERE key = ? AND expires_at > ?", (key, now())
+        )
+        return cursor.rowcount == 1
+
+    def pop(self, key, default=None):
+        row = self._conn().execute(
+            f"DELETE FROM {self.table} WHERE key = ? AND expires_at > ? RETURNING value",
+            (key, now())
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def verify_otp(self, key, otp, max_attempts):
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so no other worker reads between check and update
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?", (key, now())
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return MISSING, 0
+            status, remaining, value = check_otp_entry(json.loads(row[0]), otp, max_attempts)
+            if value is None:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            else:
+                conn.execute(f"UPDATE {self.table} SET value = ? WHERE key = ?", (json.dumps(value), key))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return status, remaining
+
+    def append(self, key, item, ttl, keep=None):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current_time = now()
+            row = conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?", (key, current_time)
+            ).fetchone()
+            items, dropped = append_item(None if row is None else json.loads(row[0]), item, keep)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(items), current_time + ttl)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return dropped
+
+    def expire(self):
+        # Range scan on the expires_at index: cost is proportional to expired rows only
+        cursor = self._conn().execute(
+            f"DELETE FROM {self.table} WHERE expires_at <= ?", (now(),)
+        )
+        return cursor.rowcount
+
+    def clear(self):
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        row = self._conn().execute(
+            f"SELECT COUNT(*) FROM {self.table} WHERE expires_at > ?", (now(),)
+        ).fetchone()
+        return row[0]
+
+# ============================================================================
+# STORE REGISTRY
+# ============================================================================
+
+_stores = {}
+_reaper = None
+_reaper_pid = None
+
+
+def _ensure_reaper():
+    """Start this process's reaper thread (threads do not survive fork, so once per worker)"""
+    global _reaper, _reaper_pid
+    if _reaper is None or _reaper_pid != os.getpid():
+        _reaper = ExpiryReaper(
+            lambda: [store for store in list(_stores.values()) if not isinstance(store, ManagerStore)]
+        )
+        _reaper.start()
+        _reaper_pid = os.getpid()
+
+
+def _restart_reaper_in_child():
+    # Views keep the store they got at import, so with gunicorn preload_app get_store() runs
+    # in the master only: restart the reaper in every forked worker here instead
+    if _reaper is not None:
+        _ensure_reaper()
+
+
+os.register_at_fork(after_in_child=_restart_reaper_in_child)
+
+
+def create_store(name, backend=None):
+    """Build a new store for name using the given (or configured) backend"""
+    backend = backend or STORE_BACKEND
+    if backend == 'memory':
+        return LocalMemoryStore()
+    if backend == 'manager':
+        return ManagerStore(name)
+    if backend == 'sqlite':
+        return SQLiteStore(name)
+    raise ValueError(f"Unknown store backend: {backend}")
+
+
+def get_store(name):
+    """Return the process-wide store for name ('otp', 'token', ...)"""
+    if name not in _stores:
+        _stores[name] = create_store(name)
+    _ensure_reaper()
+    return _stores[name]
@@ -0,0 +1,156 @@
+"""
+Off-Thread Password Hashing Pool
+PBKDF2 in check_password / make_password holds a web worker for the whole hash.
+These helpers run it in a bounded process pool instead, so a burst of logins queues
+in the pool while the worker threads keep serving cheap requests.
+
+Sync views:   verify_password(raw, encoded), hash_password(raw)
+Async views:  await averify_password(raw, encoded), await ahash_password(raw)
+
+verify_and_upgrade_password() also returns a fresh hash when the stored one was made
+with outdated hasher parameters, computed in the same pool call (see
+django_password_hashers.py for the tuned costs).
+
+When more than PASSWORD_POOL_MAX_PENDING hashes are waiting, new ones fail fast with
+HashingPoolBusy; the views answer 503 with Retry-After instead of piling up threads.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+PASSWORD_POOL_WORKERS = int(os.environ.get('ECHOHEALTH_PASSWORD_POOL_WORKERS', os.cpu_count() or 2))
+PASSWORD_POOL_MAX_PENDING = int(os.environ.get('ECHOHEALTH_PASSWORD_POOL_MAX_PENDING',
+                                               PASSWORD_POOL_WORKERS * 8))
+PASSWORD_POOL_RETRY_AFTER = 1
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+def _init_worker():
+    """Pool processes started without fork need Django configured before touching hashers"""
+    if os.environ.get('DJANGO_SETTINGS_MODULE'):
+        import django
+        from django.apps import apps
+        if not apps.ready:
+            django.setup()
+
+
+def _check_password(password, encoded):
+    from django.contrib.auth.hashers import check_password
+    return check_password(password, encoded)
+
+
+def _verify_and_upgrade(password, encoded):
+    from django.contrib.auth.hashers import check_password, make_password
+    upgraded = []
+    # check_password only calls the setter for a correct password whose hash must be updated
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, (upgraded[0] if upgraded else None)
+
+
+def _make_password(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
+
+
+class BoundedProcessPool:
+    """ProcessPoolExecutor with a cap on queued work and queue-depth counters"""
+
+    def __init__(self, max_workers=PASSWORD_POOL_WORKERS, max_pending=PASSWORD_POOL_MAX_PENDING,
+                 initializer=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        """Create the executor lazily, once per worker process (pools do not survive fork)"""
+        if self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) in the pool; raises HashingPoolBusy when the queue is full"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy(f"{self.pending} hashes already queued")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except Exception:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn, *args):
+        """Run fn(*args) in the pool and wait for the result"""
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """Run fn(*args) in the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._executor = None
+        self._executor_pid = None
+
+    def stats(self):
+        """Queue-depth metrics for instrumentation"""
+        return {
+            'workers': self.max_workers,
+            'pending': self.pending,
+            'peak_pending': self.peak_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+
+password_pool = BoundedProcessPool(initializer=_init_worker)
+
+
+def verify_password(password, encoded):
+    """check_password(password, encoded) in the hashing pool"""
+    return password_pool.run(_check_password, password, encoded)
+
+
+def verify_and_upgrade_password(password, encoded):
+    """Return (valid, upgraded_hash); upgraded_hash is None unless a rehash is due"""
+    return password_pool.run(_verify_and_upgrade, password, encoded)
+
+
+def hash_password(password):
+    """make_password(password) in the hashing pool"""
+    return password_pool.run(_make_password, password)
+
+
+async def averify_password(password, encoded):
+    return await password_pool.arun(_check_password, password, encoded)
+
+
+async def averify_and_upgrade_password(password, encoded):
+    return await password_pool.arun(_verify_and_upgrade, password, encoded)
+
+
+async def ahash_password(password):
+    return await password_pool.arun(_make_password, password)
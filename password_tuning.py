@@ -0,0 +1,63 @@
+"""
+Password Hash Cost Tuning
+Finds the largest hasher cost (PBKDF2 iterations, argon2 time_cost, bcrypt rounds)
+whose p99 hash time on this host stays under a target latency.
+
+Used by the tune_password_hasher management command; kept free of Django so the
+search itself can be tested with plain hashlib.
+"""
+
+import math
+import time
+
+from bench_utils import percentile
+
+# How the cost parameter scales hash time
+LINEAR = 'linear'  # time ~ cost (PBKDF2 iterations, argon2 time_cost)
+LOG2 = 'log2'      # time ~ 2 ** cost (bcrypt rounds)
+
+
+def measure_p99(hash_fn, cost, samples=20, clock=time.perf_counter):
+    """p99 latency in seconds of hash_fn(cost) over samples calls"""
+    timings = []
+    for _ in range(samples):
+        start = clock()
+        hash_fn(cost)
+        timings.append(clock() - start)
+    return percentile(timings, 99)
+
+
+def _scale(cost, ratio, scale, step):
+    if scale == LOG2:
+        return cost + math.floor(math.log2(ratio))
+    return max(step, int(cost * ratio) // step * step)
+
+
+def recommend_cost(hash_fn, target_p99, start_cost, scale=LINEAR, samples=20,
+                   min_cost=1, step=1, max_rounds=8, clock=time.perf_counter):
+    """
+    Return (cost, measured_p99) for the largest cost meeting target_p99 seconds
+
+    Extrapolates from a measurement at start_cost, re-measures at the estimate and
+    repeats until the estimate settles, then steps down while the p99 is over target,
+    stopping at min_cost (or the smallest step) if the target cannot be met at all.
+    clock is the timer measure_p99() uses (tests pass a fake one).
+    """
+    cost = start_cost
+    p99 = measure_p99(hash_fn, cost, samples, clock)
+    for _ in range(max_rounds):
+        estimate = max(min_cost, _scale(cost, target_p99 / p99, scale, step))
+        if scale == LINEAR and abs(estimate - cost) <= max(step, cost * 0.05):
+            break
+        if estimate == cost:
+            break
+        cost = estimate
+        p99 = measure_p99(hash_fn, cost, samples, clock)
+
+    while p99 > target_p99 and cost > min_cost:
+        lower = max(min_cost, cost - 1 if scale == LOG2 else (int(cost * 0.9) // step * step or step))
+        if lower == cost:
+            break
+        cost = lower
+        p99 = measure_p99(hash_fn, cost, samples, clock)
+    return cost, p99
@@ -0,0 +1,31 @@
+"""
+Owner-Only Files for State Shared Between Workers
+The OTP table, used-token filter, rate limiter, SQLite store and metrics files live in
+/tmp by default, where any local user can pre-create a file or plant a symlink at the
+path. open_private() refuses both and leaves the file readable by its owner only:
+
+    fd = open_private(path)                           # O_RDWR | O_CREAT
+    fd = open_private(tmp_path, os.O_WRONLY | os.O_TRUNC)
+"""
+
+import os
+
+PRIVATE_MODE = 0o600
+
+
+def open_private(path, flags=os.O_RDWR):
+    """
+    fd for path, created with mode 0o600 if missing
+    Raises OSError for a symlink (O_NOFOLLOW) and PermissionError for a file owned by
+    another user; an existing file of ours is chmod-ed to 0o600 (older versions used the umask)
+    """
+    fd = os.open(path, flags | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), PRIVATE_MODE)
+    try:
+        owner = os.fstat(fd).st_uid
+        if owner != os.getuid():
+            raise PermissionError(f"{path} is owned by uid {owner}, not by this user")
+        os.fchmod(fd, PRIVATE_MODE)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
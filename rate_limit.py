@@ -0,0 +1,245 @@
+"""
+Shared-Memory Sliding-Window Rate Limiter
+Counts requests per key (email, client IP) in a fixed-size mmap file shared by every
+worker on the host, so limits hold across gunicorn workers and memory never grows.
+
+Sliding window counter: each key keeps the count of the current and the previous fixed
+window; the estimate is previous * (1 - elapsed fraction) + current.
+
+Layout:
+    header (48 bytes): magic, version, slot count, sketch width, sketch depth, hash key
+    slots  (24 bytes each), in buckets of SLOTS_PER_BUCKET:
+        key hash (8) | window (4) | current count (4) | previous count (4)
+    sketch: window (8) | current counters | previous counters (depth x width uint32 each)
+
+Keys are counted exactly in their home bucket. When a bucket has no free or stale slot
+(many distinct keys at once, e.g. an enumeration burst), the key is counted in a
+count-min sketch instead: approximate, but it only ever over-counts, so memory pressure
+can make a limit stricter, never let a client through.
+
+Usage:
+    limiter = RateLimiter('login_ip', limit=30, window=300)
+    allowed, retry_after = limiter.hit(client_ip)
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+
+from private_files import open_private
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RATE_LIMIT_DIR = os.environ.get('ECHOHEALTH_RATE_LIMIT_DIR', tempfile.gettempdir())
+RATE_LIMIT_CAPACITY = int(os.environ.get('ECHOHEALTH_RATE_LIMIT_CAPACITY', '32768'))
+RATE_LIMIT_SKETCH_WIDTH = int(os.environ.get('ECHOHEALTH_RATE_LIMIT_SKETCH_WIDTH', '16384'))
+RATE_LIMIT_SKETCH_DEPTH = 4
+
+MAGIC = b'ECHORL01'
+VERSION = 1
+HEADER = struct.Struct('<8sIIII16s8x')
+SLOT = struct.Struct('<QIII4x')
+SKETCH_HEADER = struct.Struct('<I4x')
+COUNTER_SIZE = 4
+SLOTS_PER_BUCKET = 8
+THREAD_LOCK_STRIPES = 64
+
+
+class RateLimiter:
+    """Fixed-budget sliding-window limiter: at most `limit` hits per `window` seconds per key"""
+
+    def __init__(self, name, limit, window, path=None, capacity=RATE_LIMIT_CAPACITY,
+                 sketch_width=RATE_LIMIT_SKETCH_WIDTH, sketch_depth=RATE_LIMIT_SKETCH_DEPTH):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.path = path or os.path.join(RATE_LIMIT_DIR, f'echohealth_ratelimit_{name}.bin')
+        self._fd = open_private(self.path)
+        self._init_file(capacity, sketch_width, sketch_depth)
+        self._sketch_offset = HEADER.size + self.slot_count * SLOT.size
+        self._sketch_rows_size = self.sketch_depth * self.sketch_width * COUNTER_SIZE
+        self.memory_bytes = self._sketch_offset + SKETCH_HEADER.size + 2 * self._sketch_rows_size
+        self._map = mmap.mmap(self._fd, self.memory_bytes)
+        counters_offset = self._sketch_offset + SKETCH_HEADER.size
+        self._current = memoryview(self._map)[counters_offset:counters_offset + self._sketch_rows_size].cast('I')
+        self._previous = memoryview(self._map)[
+            counters_offset + self._sketch_rows_size:counters_offset + 2 * self._sketch_rows_size
+        ].cast('I')
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+        self._sketch_lock = threading.Lock()
+        self.sketch_hits = 0
+
+    def _init_file(self, capacity, sketch_width, sketch_depth):
+        """Create the header on first use, or adopt the existing file's geometry"""
+        buckets = max(1, -(-capacity // SLOTS_PER_BUCKET))
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER.size, 0)
+        try:
+            raw = os.pread(self._fd, HEADER.size, 0)
+            if len(raw) == HEADER.size:
+                magic, version, slot_count, width, depth, key = HEADER.unpack(raw)
+                if magic == MAGIC and version == VERSION:
+                    self.slot_count, self.sketch_width, self.sketch_depth, self._key = slot_count, width, depth, key
+                    return
+            self.slot_count = buckets * SLOTS_PER_BUCKET
+            self.sketch_width = sketch_width
+            self.sketch_depth = sketch_depth
+            self._key = secrets.token_bytes(16)
+            size = (HEADER.size + self.slot_count * SLOT.size + SKETCH_HEADER.size
+                    + 2 * sketch_depth * sketch_width * COUNTER_SIZE)
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+            os.pwrite(self._fd, HEADER.pack(MAGIC, VERSION, self.slot_count, sketch_width,
+                                            sketch_depth, self._key), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER.size, 0)
+
+    @property
+    def bucket_count(self):
+        return self.slot_count // SLOTS_PER_BUCKET
+
+    def close(self):
+        self._current.release()
+        self._previous.release()
+        self._map.close()
+        os.close(self._fd)
+
+    # ------------------------------------------------------------------------
+    # Hashing and locking
+    # ------------------------------------------------------------------------
+
+    def _key_hash(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=8, key=self._key).digest()
+        # 0 marks an empty slot
+        return int.from_bytes(digest, 'little') or 1
+
+    def _slot_offset(self, bucket, index):
+        return HEADER.size + (bucket * SLOTS_PER_BUCKET + index) * SLOT.size
+
+    def _locked(self, offset, length, thread_lock):
+        return _RangeLock(self._fd, offset, length, thread_lock)
+
+    # ------------------------------------------------------------------------
+    # Sliding window arithmetic
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _roll(stored_window, window, current, previous):
+        """Shift counts so they describe (window, window - 1)"""
+        if stored_window == window:
+            return current, previous
+        if stored_window == window - 1:
+            return 0, current
+        return 0, 0
+
+    def _decide(self, current, previous, elapsed):
+        """(allowed, retry_after seconds) for one more hit given the window counts"""
+        if previous * (1.0 - elapsed) + current + 1 <= self.limit:
+            return True, 0
+        if current + 1 <= self.limit and previous:
+            # Wait for the previous window's weight to decay enough
+            wait = (1.0 - (self.limit - 1 - current) / previous - elapsed) * self.window
+        else:
+            # Wait for this window to end and its own count to decay
+            wait = (1.0 - elapsed) * self.window + self.window * max(0.0, 1.0 - (self.limit - 1) / current)
+        return False, max(1, math.ceil(wait))
+
+    # ------------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------------
+
+    def hit(self, key, now=None):
+        """Count one request for key if it is within the limit; returns (allowed, retry_after)"""
+        now = time.time() if now is None else now
+        window = int(now // self.window)
+        elapsed = (now - window * self.window) / self.window
+        key_hash = self._key_hash(key)
+        bucket = key_hash % self.bucket_count
+        bucket_offset = self._slot_offset(bucket, 0)
+
+        with self._locked(bucket_offset, SLOTS_PER_BUCKET * SLOT.size,
+                          self._thread_locks[bucket % THREAD_LOCK_STRIPES]):
+            claim = None
+            for index in range(SLOTS_PER_BUCKET):
+                offset = self._slot_offset(bucket, index)
+                slot_hash, slot_window, current, previous = SLOT.unpack_from(self._map, offset)
+                if slot_hash == key_hash:
+                    break
+                if claim is None and (slot_hash == 0 or slot_window < window - 1):
+                    claim = offset
+            else:
+                if claim is None:
+                    offset = None
+                else:
+                    offset, slot_window, current, previous = claim, window, 0, 0
+
+            if offset is not None:
+                current, previous = self._roll(slot_window, window, current, previous)
+                allowed, retry_after = self._decide(current, previous, elapsed)
+                SLOT.pack_into(self._map, offset, key_hash, window, current + allowed, previous)
+                return allowed, retry_after
+
+        return self._hit_sketch(key_hash, window, elapsed)
+
+    def _hit_sketch(self, key_hash, window, elapsed):
+        """Count-min sketch fallback with conservative update"""
+        self.sketch_hits += 1
+        low, high = key_hash & 0xFFFFFFFF, (key_hash >> 32) | 1
+        positions = [row * self.sketch_width + (low + row * high) % self.sketch_width
+                     for row in range(self.sketch_depth)]
+        sketch_size = SKETCH_HEADER.size + 2 * self._sketch_rows_size
+
+        with self._locked(self._sketch_offset, sketch_size, self._sketch_lock):
+            (stored_window,) = SKETCH_HEADER.unpack_from(self._map, self._sketch_offset)
+            if stored_window != window:
+                counters = self._sketch_offset + SKETCH_HEADER.size
+                previous_rows = counters + self._sketch_rows_size
+                if stored_window == window - 1:
+                    self._map[previous_rows:previous_rows + self._sketch_rows_size] = \
+                        self._map[counters:counters + self._sketch_rows_size]
+                else:
+                    self._map[previous_rows:previous_rows + self._sketch_rows_size] = bytes(self._sketch_rows_size)
+                self._map[counters:counters + self._sketch_rows_size] = bytes(self._sketch_rows_size)
+                SKETCH_HEADER.pack_into(self._map, self._sketch_offset, window)
+
+            current = min(self._current[position] for position in positions)
+            previous = min(self._previous[position] for position in positions)
+            allowed, retry_after = self._decide(current, previous, elapsed)
+            if allowed:
+                for position in positions:
+                    if self._current[position] <= current:
+                        self._current[position] = current + 1
+            return allowed, retry_after
+
+
+class _RangeLock:
+    """Thread lock + fcntl byte-range lock on one region of the limiter file"""
+
+    def __init__(self, fd, offset, length, thread_lock):
+        self.fd = fd
+        self.offset = offset
+        self.length = length
+        self.thread_lock = thread_lock
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.length, self.offset)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.offset)
+        finally:
+            self.thread_lock.release()
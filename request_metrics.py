@@ -0,0 +1,388 @@
+"""
+Per-Route Request Metrics in Shared Memory (HDR-style latency histograms)
+Each worker process records into its own mmap file, so recording needs no cross-process
+lock; /metrics sums every worker's file and renders Prometheus text.
+
+Per route:
+    count, latency sum, DB queries, DB time, request bytes, response bytes
+    latency histogram: log-linear buckets over microseconds (8 linear sub-buckets per
+                       power of two, so any recorded value is off by at most 12.5%), 1µs..~60s
+    status codes: one counter per code 100..599
+
+Layout of metrics-<pid>.bin:
+    header (64 bytes): magic, version, max routes, routes in use
+    route names: max_routes x ROUTE_NAME_SIZE bytes (utf-8, NUL padded)
+    counters: max_routes x ROUTE_WORDS int64
+
+When a worker exits (recycled by max_requests, crashed), its counters must not be lost
+and its file must not be read on every scrape forever: aggregate() folds the files of
+exited workers into metrics-retired.bin (same layout, one slot per route) and removes
+them, so a scrape reads one file per live worker plus one. Clear the directory when the
+server starts (reset_metrics_dir()).
+
+Usage:
+    metrics = worker_metrics()
+    metrics.record('api/login/', status=200, latency_ns=..., db_queries=2, db_time_ns=...,
+                   request_bytes=64, response_bytes=310)
+    text = render_prometheus(aggregate())
+"""
+
+import fcntl
+import glob
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from private_files import open_private
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+METRICS_DIR = os.environ.get(
+    'ECHOHEALTH_METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'echohealth_metrics')
+)
+MAX_ROUTES = int(os.environ.get('ECHOHEALTH_METRICS_MAX_ROUTES', '64'))
+
+MAGIC = b'ECHOMET1'
+VERSION = 1
+HEADER = struct.Struct('<8sIII44x')
+ROUTE_NAME_SIZE = 96
+OTHER_ROUTE = '__other__'
+RETIRED_FILE = 'metrics-retired.bin'
+FOLD_LOCK_FILE = 'fold.lock'
+
+# Histogram: values below 16µs get their own bucket, then 8 sub-buckets per power of two
+SUB_BUCKETS = 8
+LINEAR_LIMIT = 2 * SUB_BUCKETS
+HIST_BUCKETS = 192
+STATUS_MIN = 100
+STATUS_CODES = 500
+
+# Word offsets inside one route's counter block
+COUNT, LATENCY_SUM_NS, DB_QUERIES, DB_TIME_NS, REQUEST_BYTES, RESPONSE_BYTES = range(6)
+HIST_OFFSET = 6
+STATUS_OFFSET = HIST_OFFSET + HIST_BUCKETS
+ROUTE_WORDS = STATUS_OFFSET + STATUS_CODES
+
+# Prometheus histogram buckets (seconds) and reported quantiles
+PROMETHEUS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(micros):
+    """Histogram bucket of a latency in whole microseconds"""
+    if micros < LINEAR_LIMIT:
+        return max(0, micros)
+    shift = micros.bit_length() - 4  # micros >> shift is in [8, 16)
+    return min(HIST_BUCKETS - 1, LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS)
+
+
+def bucket_upper(index):
+    """Largest latency (µs) that lands in bucket index"""
+    if index < LINEAR_LIMIT:
+        return index
+    shift, sub = divmod(index - LINEAR_LIMIT, SUB_BUCKETS)
+    shift += 1
+    return ((sub + SUB_BUCKETS) << shift) + (1 << shift) - 1
+
+# ============================================================================
+# PER-WORKER RECORDER
+# ============================================================================
+
+class WorkerMetrics:
+    """Counters of one process; only that process writes its file"""
+
+    def __init__(self, path, max_routes=MAX_ROUTES):
+        self.path = path
+        self.max_routes = max_routes
+        self._counters_offset = HEADER.size + max_routes * ROUTE_NAME_SIZE
+        size = self._counters_offset + max_routes * ROUTE_WORDS * 8
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd = open_private(path, os.O_RDWR | os.O_TRUNC)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, max_routes, 0)
+        self._words = memoryview(self._map)[self._counters_offset:].cast('q')
+        self._slots = {}  # route name written to the file -> slot
+        self._bases = {}  # any route seen -> word offset of its counters (cache)
+        self._lock = threading.Lock()
+
+    def _register(self, name):
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = len(self._slots)
+            encoded = name.encode()[:ROUTE_NAME_SIZE]
+            offset = HEADER.size + slot * ROUTE_NAME_SIZE
+            self._map[offset:offset + len(encoded)] = encoded
+            self._slots[name] = slot
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.max_routes, len(self._slots))
+        return slot * ROUTE_WORDS
+
+    def _route_base(self, route):
+        """Word offset of route's counter block, registering the route on first use"""
+        base = self._bases.get(route)
+        if base is not None:
+            return base
+        with self._lock:
+            if route in self._slots or len(self._slots) < self.max_routes - 1:
+                base = self._register(route)
+            else:
+                # The last slot collects every route beyond the limit
+                base = self._register(OTHER_ROUTE)
+            self._bases[route] = base
+        return base
+
+    def record(self, route, status, latency_ns, db_queries=0, db_time_ns=0, request_bytes=0, response_bytes=0):
+        base = self._route_base(route)
+        words = self._words
+        status_index = status - STATUS_MIN if STATUS_MIN <= status < STATUS_MIN + STATUS_CODES else 0
+        with self._lock:
+            words[base + COUNT] += 1
+            words[base + LATENCY_SUM_NS] += latency_ns
+            words[base + DB_QUERIES] += db_queries
+            words[base + DB_TIME_NS] += db_time_ns
+            words[base + REQUEST_BYTES] += request_bytes
+            words[base + RESPONSE_BYTES] += response_bytes
+            words[base + HIST_OFFSET + bucket_index(latency_ns // 1000)] += 1
+            words[base + STATUS_OFFSET + status_index] += 1
+
+    def close(self):
+        self._words.release()
+        self._map.close()
+
+
+_worker_metrics = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def worker_metrics(directory=None):
+    """This process's WorkerMetrics (a new file after fork)"""
+    global _worker_metrics, _worker_pid
+    if _worker_pid != os.getpid():
+        with _worker_lock:
+            if _worker_pid != os.getpid():
+                directory = directory or METRICS_DIR
+                path = os.path.join(directory, f'metrics-{os.getpid()}.bin')
+                if os.path.exists(path):
+                    # Left by an exited worker that had our pid: keep its counters
+                    retire_worker_files(directory, [path])
+                _worker_metrics = WorkerMetrics(path)
+                _worker_pid = os.getpid()
+    return _worker_metrics
+
+
+def reset_metrics_dir(directory=None):
+    """Remove every worker file and the retired file, e.g. from gunicorn's on_starting hook"""
+    directory = directory or METRICS_DIR
+    paths = glob.glob(os.path.join(directory, 'metrics-*.bin')) + glob.glob(os.path.join(directory, FOLD_LOCK_FILE))
+    for path in paths:
+        os.unlink(path)
+
+# ============================================================================
+# AGGREGATION AND RENDERING
+# ============================================================================
+
+def read_worker_file(path):
+    """{route: [ROUTE_WORDS ints]} from one worker file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return {}
+    magic, version, max_routes, used = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        return {}
+    counters_offset = HEADER.size + max_routes * ROUTE_NAME_SIZE
+    words = memoryview(data)[counters_offset:counters_offset + max_routes * ROUTE_WORDS * 8].cast('q')
+    routes = {}
+    for slot in range(min(used, max_routes)):
+        raw = data[HEADER.size + slot * ROUTE_NAME_SIZE:HEADER.size + (slot + 1) * ROUTE_NAME_SIZE]
+        name = raw.rstrip(b'\0').decode(errors='replace')
+        if name:
+            routes[name] = words[slot * ROUTE_WORDS:(slot + 1) * ROUTE_WORDS].tolist()
+    return routes
+
+
+def _add_routes(totals, routes):
+    for route, words in routes.items():
+        total = totals.get(route)
+        totals[route] = words if total is None else [a + b for a, b in zip(total, words)]
+
+
+def write_counters_file(path, routes):
+    """Write {route: [ROUTE_WORDS ints]} in the worker file layout, replacing path atomically"""
+    max_routes = max(1, len(routes))
+    counters_offset = HEADER.size + max_routes * ROUTE_NAME_SIZE
+    data = bytearray(counters_offset + max_routes * ROUTE_WORDS * 8)
+    HEADER.pack_into(data, 0, MAGIC, VERSION, max_routes, len(routes))
+    for slot, (route, words) in enumerate(sorted(routes.items())):
+        encoded = route.encode()[:ROUTE_NAME_SIZE]
+        offset = HEADER.size + slot * ROUTE_NAME_SIZE
+        data[offset:offset + len(encoded)] = encoded
+        struct.pack_into(f'<{ROUTE_WORDS}q', data, counters_offset + slot * ROUTE_WORDS * 8, *words)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    fd = open_private(tmp_path, os.O_WRONLY | os.O_TRUNC)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def _worker_file_pid(path):
+    """pid in metrics-<pid>.bin, None for the retired file"""
+    name = os.path.basename(path)[len('metrics-'):-len('.bin')]
+    return int(name) if name.isdigit() else None
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # alive, owned by another user
+    return True
+
+
+def dead_worker_files(directory=None):
+    paths = glob.glob(os.path.join(directory or METRICS_DIR, 'metrics-*.bin'))
+    return [
+        path for path in paths
+        if _worker_file_pid(path) not in (None, os.getpid()) and not _process_exists(_worker_file_pid(path))
+    ]
+
+
+def retire_worker_files(directory=None, paths=None):
+    """Fold worker files (default: those of exited workers) into the retired file; returns how many"""
+    directory = directory or METRICS_DIR
+    lock_fd = open_private(os.path.join(directory, FOLD_LOCK_FILE))
+    try:
+        # One folder at a time: two scrapes folding the same file would count it twice
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        paths = [path for path in (dead_worker_files(directory) if paths is None else paths) if os.path.exists(path)]
+        if not paths:
+            return 0
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        totals = read_worker_file(retired_path) if os.path.exists(retired_path) else {}
+        for path in paths:
+            _add_routes(totals, read_worker_file(path))
+        write_counters_file(retired_path, totals)
+        # Removed only once the retired file holds their counters
+        for path in paths:
+            os.unlink(path)
+        return len(paths)
+    finally:
+        os.close(lock_fd)
+
+
+def aggregate(directory=None):
+    """Sum of every worker's counters (exited workers via the retired file): {route: [ROUTE_WORDS ints]}"""
+    directory = directory or METRICS_DIR
+    if dead_worker_files(directory):
+        retire_worker_files(directory)
+    totals = {}
+    for path in glob.glob(os.path.join(directory, 'metrics-*.bin')):
+        try:
+            routes = read_worker_file(path)
+        except OSError:
+            continue  # folded into the retired file while we were listing
+        _add_routes(totals, routes)
+    return totals
+
+
+def quantile(words, q):
+    """Latency (seconds) at quantile q from a route's histogram (bucket upper bound)"""
+    histogram = words[HIST_OFFSET:STATUS_OFFSET]
+    count = sum(histogram)
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0
+    for index, bucket_count in enumerate(histogram):
+        seen += bucket_count
+        if seen >= rank:
+            return bucket_upper(index) / 1e6
+    return bucket_upper(HIST_BUCKETS - 1) / 1e6
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(totals, extra_lines=()):
+    """Prometheus text exposition (format 0.0.4) of aggregated route metrics"""
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    routes = sorted(totals)
+    uppers = [bucket_upper(index) / 1e6 for index in range(HIST_BUCKETS)]
+
+    family('echohealth_http_request_duration_seconds', 'histogram', 'Request latency by route')
+    for route in routes:
+        words = totals[route]
+        label = _label(route)
+        histogram = words[HIST_OFFSET:STATUS_OFFSET]
+        cumulative, index = 0, 0
+        for le in PROMETHEUS_BUCKETS:
+            while index < HIST_BUCKETS and uppers[index] <= le:
+                cumulative += histogram[index]
+                index += 1
+            lines.append(f'echohealth_http_request_duration_seconds_bucket{{route="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'echohealth_http_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {words[COUNT]}')
+        lines.append(f'echohealth_http_request_duration_seconds_sum{{route="{label}"}} {words[LATENCY_SUM_NS] / 1e9}')
+        lines.append(f'echohealth_http_request_duration_seconds_count{{route="{label}"}} {words[COUNT]}')
+
+    family('echohealth_http_request_duration_quantile_seconds', 'gauge',
+           'Latency quantiles from the HDR histogram (at most 12.5% high)')
+    for route in routes:
+        for q in QUANTILES:
+            lines.append(f'echohealth_http_request_duration_quantile_seconds{{route="{_label(route)}",quantile="{q}"}} '
+                         f'{quantile(totals[route], q)}')
+
+    family('echohealth_http_responses_total', 'counter', 'Responses by route and status code')
+    for route in routes:
+        statuses = totals[route][STATUS_OFFSET:STATUS_OFFSET + STATUS_CODES]
+        for offset, count in enumerate(statuses):
+            if count:
+                lines.append(f'echohealth_http_responses_total{{route="{_label(route)}",status="{STATUS_MIN + offset}"}} {count}')
+
+    for name, word, scale, help_text in (
+        ('echohealth_db_queries_total', DB_QUERIES, 1, 'Database queries run by requests'),
+        ('echohealth_db_query_seconds_total', DB_TIME_NS, 1e9, 'Time spent in database queries'),
+        ('echohealth_http_request_bytes_total', REQUEST_BYTES, 1, 'Request body bytes'),
+        ('echohealth_http_response_bytes_total', RESPONSE_BYTES, 1, 'Response body bytes'),
+    ):
+        family(name, 'counter', help_text)
+        for route in routes:
+            value = totals[route][word]
+            lines.append(f'{name}{{route="{_label(route)}"}} {value / scale if scale != 1 else value}')
+
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
+
+
+def render_component_stats(components, worker=None):
+    """Gauge lines for {component: stats dict} (numeric values only)"""
+    worker = os.getpid() if worker is None else worker
+    lines = [
+        "# HELP echohealth_component_stat Internal component counters of the worker serving /metrics",
+        "# TYPE echohealth_component_stat gauge",
+    ]
+    for component, stats in sorted(components.items()):
+        for stat, value in sorted(stats.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f'echohealth_component_stat{{component="{_label(component)}",stat="{_label(stat)}",'
+                         f'worker="{worker}"}} {value}')
+    return lines
@@ -0,0 +1,160 @@
+"""
+Password Reset Tokens Indexed by SHA-256 Digest
+Replaces token_storage[email] = {'token': token, ...} in the django_*_fix.py views
+
+- the raw token is never stored: the store key is sha256(token)
+- reset_password resolves a token with one O(1) lookup, no email needed
+- a user may hold several outstanding tokens (one per verified OTP)
+- shards are picked by digest prefix, so tokens spread evenly over several stores
+
+Usage:
+    token = issue_reset_token(email)       # or store_reset_token(email, token)
+    email = resolve_reset_token(token)     # None if unknown or expired
+    email = consume_reset_token(token)     # one-time use
+
+ResetTokenStore also has async versions (aissue, aresolve, aconsume, arevoke_all) for ASGI views.
+"""
+
+import hashlib
+import secrets
+
+from otp_store import get_store
+
+TOKEN_TTL_SECONDS = 10 * 60
+MAX_TOKENS_PER_USER = 5
+
+
+def token_digest(token):
+    """Hex SHA-256 of the token; this is what gets stored and indexed"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class ResetTokenStore:
+    """Reset tokens keyed by digest, optionally sharded across several ExpiringStores"""
+
+    def __init__(self, shards=None, ttl=TOKEN_TTL_SECONDS):
+        self.shards = shards or [get_store('reset_token')]
+        self.ttl = ttl
+
+    def _shard(self, digest):
+        """Pick a shard from the first 32 bits of the digest"""
+        return self.shards[int(digest[:8], 16) % len(self.shards)]
+
+    def _user_index(self, email):
+        return self._shard(token_digest(email)), f"user:{email}"
+
+    def issue(self, email):
+        """Create a new token for email and return it (the only time the raw value exists)"""
+        token = secrets.token_urlsafe(32)
+        self.store(email, token)
+        return token
+
+    def store(self, email, token):
+        """Register an existing token for email by its digest"""
+        digest = token_digest(token)
+        self._shard(digest).set(digest, {'email': email, 'digest': digest}, ttl=self.ttl)
+
+        # Per-user index so all of a user's tokens can be revoked after a reset; the append is
+        # atomic, so concurrent issues never lose a digest. Only the newest MAX_TOKENS_PER_USER
+        # stay valid
+        index_store, index_key = self._user_index(email)
+        for old_digest in index_store.append(index_key, digest, ttl=self.ttl, keep=MAX_TOKENS_PER_USER):
+            self._shard(old_digest).delete(old_digest)
+
+    def _lookup(self, token, consume):
+        if not token:
+            return None
+        digest = token_digest(token)
+        shard = self._shard(digest)
+        record = shard.pop(digest) if consume else shard.get(digest)
+        return None if record is None else record['email']
+
+    def resolve(self, token):
+        """Return the email a live token belongs to, or None"""
+        return self._lookup(token, consume=False)
+
+    def consume(self, token):
+        """Resolve and delete a token in one step; None if it was unknown, expired or used"""
+        return self._lookup(token, consume=True)
+
+    def revoke_all(self, email):
+        """Delete every outstanding token of email; returns how many were live"""
+        index_store, index_key = self._user_index(email)
+        revoked = 0
+        for digest in index_store.pop(index_key, []):
+            if self._shard(digest).delete(digest):
+                revoked += 1
+        return revoked
+
+    # Async interface (ASGI views): same steps over the stores' async calls
+
+    async def aissue(self, email):
+        token = secrets.token_urlsafe(32)
+        await self.astore(email, token)
+        return token
+
+    async def astore(self, email, token):
+        digest = token_digest(token)
+        await self._shard(digest).aset(digest, {'email': email, 'digest': digest}, ttl=self.ttl)
+
+        index_store, index_key = self._user_index(email)
+        for old_digest in await index_store.aappend(index_key, digest, ttl=self.ttl, keep=MAX_TOKENS_PER_USER):
+            await self._shard(old_digest).adelete(old_digest)
+
+    async def _alookup(self, token, consume):
+        if not token:
+            return None
+        digest = token_digest(token)
+        shard = self._shard(digest)
+        record = await (shard.apop(digest) if consume else shard.aget(digest))
+        return None if record is None else record['email']
+
+    async def aresolve(self, token):
+        return await self._alookup(token, consume=False)
+
+    async def aconsume(self, token):
+        return await self._alookup(token, consume=True)
+
+    async def arevoke_all(self, email):
+        index_store, index_key = self._user_index(email)
+        revoked = 0
+        for digest in await index_store.apop(index_key, []):
+            if await self._shard(digest).adelete(digest):
+                revoked += 1
+        return revoked
+
+
+_default_store = None
+
+
+def default_token_store():
+    """Process-wide ResetTokenStore on the shared 'reset_token' store"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ResetTokenStore()
+    return _default_store
+
+
+def issue_reset_token(email):
+    """Generate a secure token for password reset and store its digest"""
+    return default_token_store().issue(email)
+
+
+def store_reset_token(email, token):
+    """Store the digest of an already generated token"""
+    default_token_store().store(email, token)
+
+
+def resolve_reset_token(token):
+    """Email for a live token, or None"""
+    return default_token_store().resolve(token)
+
+
+def consume_reset_token(token):
+    """Email for a live token, deleting it; None if invalid"""
+    return default_token_store().consume(token)
+
+
+def revoke_reset_tokens(email):
+    """Invalidate every outstanding reset token of email"""
+    return default_token_store().revoke_all(email)
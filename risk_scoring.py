@@ -0,0 +1,290 @@
+"""
+Vectorized Symptom Risk Scoring for /api/predict/ and /api/predict/batch/
+The additive rules of the app's SymptomChecker.calculateRiskScore / determineRiskLevel,
+held as weight vectors and applied to a whole (N x 12) feature matrix in one operation:
+
+    model = RiskModel()
+    matrix = encode_rows(rows)                # rows: SymptomFeatures dicts
+    scores, levels = model.predict(matrix)    # int arrays of length N
+    RISK_LEVELS[levels[0]]                    # 'High Risk'
+
+Matrix columns follow SymptomFeatures: Age, Gender (code, see GENDER_CODES), then the ten
+0/1 flags in FLAG_COLUMNS order.
+
+Rows may use either key spelling clients send, or mix them:
+    Kotlin SymptomFeatures:  {"Age": 45, "Gender": "Male", "Tobacco_Use": 1, ...}
+    form labels:             {"Age": 45, "Tobacco Use": "Yes", "Oral Cancer (Diagnosis)": "No", ...}
+FEATURE_SCHEMA maps every accepted key and value spelling straight to a column and a code,
+so a row is decoded in one pass over its items into a preallocated matrix. Unknown keys,
+values that are not yes/no and a feature given twice are rejected (FeatureError); a
+missing flag or gender counts as "No" / unknown, like the app's unchecked radio buttons.
+
+Uses NumPy when installed (pip install numpy); otherwise the same rules run row by row in
+plain Python, with lists in place of arrays.
+"""
+
+import re
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# ============================================================================
+# RULES (same numbers as symptom_checker.kt)
+# ============================================================================
+
+AGE_COLUMN = 0
+GENDER_COLUMN = 1
+FLAG_COLUMNS = (
+    'Tobacco_Use', 'Alcohol_Consumption', 'HPV_Infection', 'Betel_Quid_Use', 'Poor_Oral_Hygiene',
+    'Oral_Lesions', 'Unexplained_Bleeding', 'Difficulty_Swallowing', 'White_or_Red_Patches_in_Mouth',
+    'Oral_Cancer_Diagnosis',
+)
+FEATURE_COLUMNS = ('Age', 'Gender') + FLAG_COLUMNS
+FIRST_FLAG_COLUMN = 2
+# Form label spelling (test_symptom_check_api.py) where it is not just spaces for underscores
+LABEL_NAMES = {'Oral_Cancer_Diagnosis': 'Oral Cancer (Diagnosis)'}
+MAX_AGE = 150
+MAX_DECODE_PLANS = 64
+
+AGE_THRESHOLD = 40
+AGE_POINTS = 15
+# Code 0 is a missing/unknown gender (no points, like no radio button checked)
+GENDER_CODES = {'Male': 1, 'Female': 2, 'Other': 3}
+UNKNOWN_GENDERS = (None, '', 'Unknown')  # the app sends "Unknown" when nothing is checked
+GENDER_POINTS = (0, 10, 5, 7)
+FLAG_WEIGHTS = (25, 20, 30, 25, 10, 35, 40, 30, 35, 50)
+
+# Score >= RISK_THRESHOLDS[i] moves the result up to RISK_LEVELS[i + 1]
+RISK_THRESHOLDS = (40, 80, 150)
+RISK_LEVELS = ('Very Low Risk', 'Low Risk', 'Moderate Risk', 'High Risk')
+
+RECOMMENDATIONS = {
+    'High Risk': [
+        "Immediate medical consultation recommended",
+        "Schedule an appointment with an oral specialist",
+        "Consider biopsy for suspicious lesions",
+        "Stop tobacco and alcohol use immediately",
+        "Regular monitoring every 3 months",
+    ],
+    'Moderate Risk': [
+        "Schedule a dental checkup within 2 weeks",
+        "Consider specialist consultation",
+        "Reduce or eliminate tobacco/alcohol use",
+        "Improve oral hygiene practices",
+        "Monitor symptoms closely",
+    ],
+    'Low Risk': [
+        "Regular dental checkups every 6 months",
+        "Maintain good oral hygiene",
+        "Limit alcohol consumption",
+        "Avoid tobacco products",
+        "Monitor for new symptoms",
+    ],
+    'Very Low Risk': [
+        "Continue regular dental checkups",
+        "Maintain good oral hygiene",
+        "Avoid tobacco and excessive alcohol",
+        "Stay informed about oral health",
+        "Report any new symptoms promptly",
+    ],
+}
+
+
+class FeatureError(ValueError):
+    """A feature row that cannot be scored; the message names the row and field"""
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def normalize_key(key):
+    """'Oral Cancer (Diagnosis)' / 'Oral_Cancer_Diagnosis' / 'oral cancer diagnosis' -> 'oral_cancer_diagnosis'"""
+    return re.sub(r'[^a-z0-9]+', '_', key.lower()).strip('_')
+
+
+def parse_age(value):
+    """Whole years 0-MAX_AGE from a whole float or a numeric string (ints hit the code table)"""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if type(value) is not int or not 0 <= value <= MAX_AGE:
+        raise ValueError
+    return value
+
+
+class FeatureSchema:
+    """
+    Every accepted key spelling -> (column, value codes), compiled once at import.
+    decode() also compiles each key order it sees (clients send the same keys in the same
+    order every time) into a plan: one (column, codes) per value, already checked for unknown
+    and repeated features, so a row is one zip over its values and one dict lookup per value.
+    """
+
+    def __init__(self, max_plans=MAX_DECODE_PLANS):
+        flag_codes = {0: 0, 1: 1, None: 0}
+        for no, yes in (('no', 'yes'), ('n', 'y'), ('false', 'true'), ('0', '1')):
+            for spell in (str.lower, str.title, str.upper):
+                flag_codes[spell(no)], flag_codes[spell(yes)] = 0, 1
+        gender_codes = {gender: 0 for gender in UNKNOWN_GENDERS}
+        gender_codes.update(GENDER_CODES)
+        gender_codes.update({gender.lower(): code for gender, code in gender_codes.items() if gender})
+        age_codes = {age: age for age in range(MAX_AGE + 1)}
+        self.expected = {AGE_COLUMN: f'a whole number of years 0-{MAX_AGE}',
+                         GENDER_COLUMN: 'Male, Female, Other or Unknown'}
+
+        self.fields = {}
+        for column, name in enumerate(FEATURE_COLUMNS):
+            codes = age_codes if column == AGE_COLUMN else gender_codes if column == GENDER_COLUMN else flag_codes
+            self.expected.setdefault(column, 'Yes/No or 1/0')
+            for key in (name, name.replace('_', ' '), LABEL_NAMES.get(name, name), normalize_key(name)):
+                self.fields[key] = (column, codes)
+        self.max_plans = max_plans
+        self._plans = {}
+
+    def field(self, key, index=0):
+        """(column, codes) for one key in any accepted spelling"""
+        entry = self.fields.get(key)
+        if entry is None and isinstance(key, str):
+            # Other case/spacing/punctuation of a known name
+            entry = self.fields.get(normalize_key(key))
+        if entry is None:
+            raise FeatureError(f"row {index}: unknown feature '{key}'")
+        return entry
+
+    def plan(self, keys, index=0):
+        """Checked (column, codes) per key, in the order of keys"""
+        plan = self._plans.get(keys)
+        if plan is not None:
+            return plan
+        plan = tuple(self.field(key, index) for key in keys)
+        columns = [column for column, _ in plan]
+        for column in set(columns):
+            if columns.count(column) > 1:
+                raise FeatureError(f"row {index}: {FEATURE_COLUMNS[column]} given more than once")
+        if AGE_COLUMN not in columns:
+            raise FeatureError(f"row {index}: Age is required")
+        # Key orders come from clients: keep the cache bounded, decode uncached past it
+        if len(self._plans) < self.max_plans:
+            self._plans[keys] = plan
+        return plan
+
+    def decode(self, features, out, base=0, index=0):
+        """Write one features dict into out[base:base + 12]; unset columns are left as they are"""
+        keys = tuple(features)
+        plan = self._plans.get(keys) or self.plan(keys, index)
+        try:
+            for (column, codes), value in zip(plan, features.values()):
+                out[base + column] = codes[value]
+            # True/False hash like 1/0, so only an age of 0 or 1 can have been a bool
+            if out[base + AGE_COLUMN] > 1:
+                return
+        except (KeyError, TypeError):  # TypeError: unhashable value (a list, an object)
+            pass
+        # A value outside the code tables (or a possible bool age): redo the row value by value
+        for (column, codes), value in zip(plan, features.values()):
+            out[base + column] = self.code(column, codes, value, index)
+
+    def code(self, column, codes, value, index=0):
+        """Code for one value, including other case/whitespace and ages as strings"""
+        if column != AGE_COLUMN or value.__class__ is not bool:
+            try:
+                return codes[value]
+            except (KeyError, TypeError):
+                pass
+        try:
+            if column == AGE_COLUMN:
+                return parse_age(value)
+            if isinstance(value, str) and value.strip().lower() in codes:
+                return codes[value.strip().lower()]
+        except ValueError:
+            pass
+        raise FeatureError(f"row {index}: invalid {FEATURE_COLUMNS[column]} {value!r} "
+                           f"(expected {self.expected[column]})")
+
+
+FEATURE_SCHEMA = FeatureSchema()
+
+
+def encode_row(features, out, index=0):
+    """Write one features dict (either key spelling) into the zeroed row out[index]"""
+    FEATURE_SCHEMA.decode(features, out[index], 0, index)
+
+
+def encode_rows(rows):
+    """List of features dicts -> (N x 12) feature matrix"""
+    width = len(FEATURE_COLUMNS)
+    # One zeroed C int buffer for the whole matrix, wrapped by NumPy without a copy; item
+    # assignment into an array('i') is as cheap as into a list, into an ndarray it is not
+    flat = array('i', bytes(len(rows) * width * array('i').itemsize))
+    decode = FEATURE_SCHEMA.decode
+    for index, features in enumerate(rows):
+        if not isinstance(features, dict):
+            raise FeatureError(f"row {index}: features must be an object")
+        decode(features, flat, index * width, index)
+    if np is not None:
+        return np.frombuffer(flat, dtype=np.intc).reshape(len(rows), width)
+    return [flat[start:start + width].tolist() for start in range(0, len(flat), width)]
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+class RiskModel:
+    """The additive risk rules as weight vectors; predict() scores a whole matrix at once"""
+
+    def __init__(self, age_threshold=AGE_THRESHOLD, age_points=AGE_POINTS, gender_points=GENDER_POINTS,
+                 flag_weights=FLAG_WEIGHTS, risk_thresholds=RISK_THRESHOLDS):
+        self.age_threshold = age_threshold
+        self.age_points = age_points
+        if len(flag_weights) != len(FLAG_COLUMNS) or len(gender_points) != len(GENDER_CODES) + 1:
+            raise ValueError("weights do not match the feature columns")
+        if np is not None:
+            self.gender_points = np.asarray(gender_points, dtype=np.int32)
+            self.flag_weights = np.asarray(flag_weights, dtype=np.int32)
+            self.risk_thresholds = np.asarray(risk_thresholds, dtype=np.int32)
+        else:
+            self.gender_points = tuple(gender_points)
+            self.flag_weights = tuple(flag_weights)
+            self.risk_thresholds = tuple(risk_thresholds)
+
+    def scores(self, matrix):
+        if np is not None:
+            matrix = np.asarray(matrix)
+            return (
+                (matrix[:, AGE_COLUMN] >= self.age_threshold) * self.age_points
+                + self.gender_points[matrix[:, GENDER_COLUMN]]
+                + matrix[:, FIRST_FLAG_COLUMN:] @ self.flag_weights
+            )
+        return [
+            (self.age_points if row[AGE_COLUMN] >= self.age_threshold else 0)
+            + self.gender_points[row[GENDER_COLUMN]]
+            + sum(weight for weight, flag in zip(self.flag_weights, row[FIRST_FLAG_COLUMN:]) if flag)
+            for row in matrix
+        ]
+
+    def levels(self, scores):
+        """Index into RISK_LEVELS for every score"""
+        if np is not None:
+            return np.searchsorted(self.risk_thresholds, scores, side='right')
+        return [sum(score >= threshold for threshold in self.risk_thresholds) for score in scores]
+
+    def predict(self, matrix):
+        """(N x 12) feature matrix -> (scores, level indexes)"""
+        scores = self.scores(matrix)
+        return scores, self.levels(scores)
+
+
+def result_body(score, level):
+    """One /api/predict/ response body (SymptomCheckResponse fields)"""
+    risk_level = RISK_LEVELS[level]
+    return {
+        'mode': 'symptoms',
+        'risk_score': int(score),
+        'risk_level': risk_level,
+        'recommendations': RECOMMENDATIONS[risk_level],
+        'message': 'Risk assessment completed',
+    }
@@ -0,0 +1,253 @@
+"""
+Memory-Mapped Shared OTP/Token Table
+A fixed-slot hash table in a file that every gunicorn worker on the host maps into memory
+
+Why not a dict: otp_storage = {email: {'otp': ..., 'timestamp': datetime, 'attempts': 0}}
+lives in one worker only and costs several hundred bytes per entry. Here every entry
+is one 64-byte slot, all workers see the same slots, and the file survives restarts,
+so OTPs issued before a deploy can still be verified after it.
+
+Layout:
+    header (64 bytes): magic, version, slot count, HMAC key for digests
+    slots  (64 bytes each), grouped into buckets of SLOTS_PER_BUCKET:
+        email hash (16) | secret digest (32) | expires_at (8) | attempts (4) | state (4)
+
+An email only ever lives in its home bucket (set-associative open addressing), so every
+operation locks exactly one bucket: a byte-range fcntl lock across processes plus a
+striped threading lock inside the process. Expired slots are reclaimed on insert.
+
+Usage:
+    table = SharedOtpTable()
+    table.put(email, otp, ttl=300)
+    status, remaining = table.verify(email, submitted_otp, max_attempts=3)
+"""
+
+import fcntl
+import hashlib
+import hmac
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+
+from private_files import open_private
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TABLE_PATH = os.environ.get(
+    'ECHOHEALTH_OTP_TABLE_PATH',
+    os.path.join(tempfile.gettempdir(), 'echohealth_otp_table.bin')
+)
+TABLE_CAPACITY = int(os.environ.get('ECHOHEALTH_OTP_TABLE_CAPACITY', '65536'))
+
+MAGIC = b'ECHOOTP1'
+VERSION = 1
+HEADER = struct.Struct('<8sII32s16x')
+SLOT = struct.Struct('<16s32sdII')
+SLOTS_PER_BUCKET = 8
+THREAD_LOCK_STRIPES = 64
+
+STATE_EMPTY = 0
+STATE_USED = 1
+
+# verify() results
+VERIFIED = 'verified'
+MISSING = 'missing'
+INVALID = 'invalid'
+TOO_MANY_ATTEMPTS = 'too_many_attempts'
+
+
+def normalize_email(email):
+    """Lowercase and strip so 'User@Example.com ' and 'user@example.com' share a slot"""
+    return email.strip().lower()
+
+
+class SharedOtpTable:
+    """Fixed-capacity, mmap-backed table of (email -> secret digest, expiry, attempts)"""
+
+    def __init__(self, path=TABLE_PATH, capacity=TABLE_CAPACITY):
+        self.path = path
+        # The header holds the HMAC key: owner-only, never through a planted symlink
+        self._fd = open_private(path)
+        self._init_file(capacity)
+        self._map = mmap.mmap(self._fd, HEADER.size + self.slot_count * SLOT.size)
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+
+    def _init_file(self, capacity):
+        """Create the header on first use, or adopt the existing file's geometry"""
+        # Round capacity up to a whole number of buckets
+        buckets = max(1, -(-capacity // SLOTS_PER_BUCKET))
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER.size, 0)
+        try:
+            raw = os.pread(self._fd, HEADER.size, 0)
+            if len(raw) == HEADER.size:
+                magic, version, slot_count, key = HEADER.unpack(raw)
+                if magic == MAGIC and version == VERSION:
+                    self.slot_count = slot_count
+                    self._key = key
+                    return
+            self.slot_count = buckets * SLOTS_PER_BUCKET
+            self._key = secrets.token_bytes(32)
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, HEADER.size + self.slot_count * SLOT.size)
+            os.pwrite(self._fd, HEADER.pack(MAGIC, VERSION, self.slot_count, self._key), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER.size, 0)
+
+    @property
+    def bucket_count(self):
+        return self.slot_count // SLOTS_PER_BUCKET
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    # ------------------------------------------------------------------------
+    # Hashing and locking
+    # ------------------------------------------------------------------------
+
+    def _email_hash(self, email):
+        return hashlib.blake2b(normalize_email(email).encode(), digest_size=16, key=self._key).digest()
+
+    def _digest(self, secret):
+        return hmac.new(self._key, str(secret).encode(), hashlib.sha256).digest()
+
+    def _bucket_of(self, email_hash):
+        return int.from_bytes(email_hash[:8], 'little') % self.bucket_count
+
+    def _slot_offset(self, bucket, index):
+        return HEADER.size + (bucket * SLOTS_PER_BUCKET + index) * SLOT.size
+
+    def _lock(self, bucket):
+        """Context manager holding the bucket against other threads and other processes"""
+        return _BucketLock(self, bucket)
+
+    def _find(self, bucket, email_hash):
+        """Return (index, slot) for email_hash in bucket, or (None, None)"""
+        for index in range(SLOTS_PER_BUCKET):
+            slot = SLOT.unpack_from(self._map, self._slot_offset(bucket, index))
+            if slot[4] == STATE_USED and slot[0] == email_hash:
+                return index, slot
+        return None, None
+
+    def _write(self, bucket, index, email_hash, digest, expires_at, attempts, state=STATE_USED):
+        SLOT.pack_into(self._map, self._slot_offset(bucket, index),
+                       email_hash, digest, expires_at, attempts, state)
+
+    def _clear(self, bucket, index):
+        SLOT.pack_into(self._map, self._slot_offset(bucket, index), b'', b'', 0.0, 0, STATE_EMPTY)
+
+    # ------------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------------
+
+    def put(self, email, secret, ttl):
+        """Store (or overwrite) the secret for email with a fresh attempt counter"""
+        email_hash = self._email_hash(email)
+        bucket = self._bucket_of(email_hash)
+        current_time = time.time()
+        with self._lock(bucket):
+            index, _ = self._find(bucket, email_hash)
+            if index is None:
+                index = self._free_index(bucket, current_time)
+            self._write(bucket, index, email_hash, self._digest(secret), current_time + ttl, 0)
+
+    def _free_index(self, bucket, current_time):
+        """Pick an empty or expired slot; if the bucket is full, evict the soonest-expiring entry"""
+        victim, victim_expiry = 0, None
+        for index in range(SLOTS_PER_BUCKET):
+            slot = SLOT.unpack_from(self._map, self._slot_offset(bucket, index))
+            if slot[4] != STATE_USED or slot[2] <= current_time:
+                return index
+            if victim_expiry is None or slot[2] < victim_expiry:
+                victim, victim_expiry = index, slot[2]
+        return victim
+
+    def get(self, email):
+        """Return {'expires_at', 'attempts'} for a live entry, or None"""
+        email_hash = self._email_hash(email)
+        bucket = self._bucket_of(email_hash)
+        with self._lock(bucket):
+            _, slot = self._find(bucket, email_hash)
+        if slot is None or slot[2] <= time.time():
+            return None
+        return {'expires_at': slot[2], 'attempts': slot[3]}
+
+    def verify(self, email, secret, max_attempts=3):
+        """
+        Check secret for email, counting the attempt atomically
+        Returns (status, remaining_attempts); the entry is removed on success or lockout
+        """
+        email_hash = self._email_hash(email)
+        bucket = self._bucket_of(email_hash)
+        with self._lock(bucket):
+            index, slot = self._find(bucket, email_hash)
+            if slot is None or slot[2] <= time.time():
+                if index is not None:
+                    self._clear(bucket, index)
+                return MISSING, 0
+
+            _, digest, expires_at, attempts, _ = slot
+            if attempts >= max_attempts:
+                self._clear(bucket, index)
+                return TOO_MANY_ATTEMPTS, 0
+
+            attempts += 1
+            if hmac.compare_digest(digest, self._digest(secret)):
+                self._clear(bucket, index)
+                return VERIFIED, max_attempts - attempts
+
+            self._write(bucket, index, email_hash, digest, expires_at, attempts)
+            return INVALID, max_attempts - attempts
+
+    def delete(self, email):
+        """Remove email's entry; True if one was present"""
+        email_hash = self._email_hash(email)
+        bucket = self._bucket_of(email_hash)
+        with self._lock(bucket):
+            index, _ = self._find(bucket, email_hash)
+            if index is None:
+                return False
+            self._clear(bucket, index)
+            return True
+
+    def __len__(self):
+        """Number of live entries (full scan, for diagnostics only)"""
+        current_time = time.time()
+        count = 0
+        for offset in range(HEADER.size, HEADER.size + self.slot_count * SLOT.size, SLOT.size):
+            slot = SLOT.unpack_from(self._map, offset)
+            if slot[4] == STATE_USED and slot[2] > current_time:
+                count += 1
+        return count
+
+
+class _BucketLock:
+    """Thread stripe lock + fcntl byte-range lock on one bucket of the table file"""
+
+    def __init__(self, table, bucket):
+        self.table = table
+        self.bucket = bucket
+        self.thread_lock = table._thread_locks[bucket % THREAD_LOCK_STRIPES]
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.table._fd, fcntl.LOCK_EX, SLOTS_PER_BUCKET * SLOT.size,
+                        self.table._slot_offset(self.bucket, 0))
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.lockf(self.table._fd, fcntl.LOCK_UN, SLOTS_PER_BUCKET * SLOT.size,
+                        self.table._slot_offset(self.bucket, 0))
+        finally:
+            self.thread_lock.release()
@@ -0,0 +1,197 @@
+"""
+Stateless HMAC-Signed Password Reset Tokens
+An alternative to storing reset tokens: verify_otp signs a token, reset_password checks
+it with pure CPU work, no token store round-trip.
+
+Token layout (base64url, 52 chars):
+    version (1) | token id (12) | email digest (16) | expires_at (4, unix seconds) | HMAC (16)
+
+The HMAC also covers an optional `bind` string. The views pass the user's current
+password hash, so once the password changes, every outstanding token stops verifying
+on every node.
+
+One-time use inside a host is enforced by UsedTokenFilter: a time-bucketed Bloom filter
+of consumed token ids. Buckets are keyed by the token's expiry window and reused once
+that window is over, so the filter never grows and never needs a cleanup pass.
+A false positive only rejects a valid token (the user requests a new OTP); the rate
+is ~1e-8 at 10k resets per window with the default size.
+"""
+
+import base64
+import fcntl
+import hashlib
+import hmac
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+
+from private_files import open_private
+
+TOKEN_TTL_SECONDS = 10 * 60
+TOKEN_VERSION = 1
+
+PAYLOAD = struct.Struct('>B12s16sI')
+MAC_SIZE = 16
+
+# Used-token filter geometry
+FILTER_BITS = 1 << 20
+FILTER_HASHES = 7
+FILTER_BUCKETS = 3
+FILTER_PATH = os.environ.get(
+    'ECHOHEALTH_USED_TOKEN_FILTER_PATH',
+    os.path.join(tempfile.gettempdir(), 'echohealth_used_tokens.bin')
+)
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def email_digest(email):
+    """16-byte digest of the normalized email embedded in the token"""
+    return hashlib.blake2b(email.strip().lower().encode(), digest_size=16).digest()
+
+# ============================================================================
+# USED-TOKEN FILTER
+# ============================================================================
+
+class UsedTokenFilter:
+    """
+    Time-bucketed Bloom filter of consumed token ids
+
+    With path=None the bits live in this process only; with a path they live in an
+    mmap'd file shared by every worker on the host (writes take an fcntl lock).
+    """
+
+    BUCKET_HEADER = struct.Struct('<q')
+
+    def __init__(self, bucket_seconds=TOKEN_TTL_SECONDS, bits=FILTER_BITS,
+                 hashes=FILTER_HASHES, buckets=FILTER_BUCKETS, path=None):
+        self.bucket_seconds = bucket_seconds
+        self.bits = bits
+        self.hashes = hashes
+        self.buckets = buckets
+        self.bucket_size = self.BUCKET_HEADER.size + bits // 8
+        self._lock = threading.Lock()
+        self._fd = None
+        size = self.bucket_size * buckets
+        if path is None:
+            self._buf = bytearray(size)
+        else:
+            self._fd = open_private(path)
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+            self._buf = mmap.mmap(self._fd, size)
+
+    def _positions(self, token_id):
+        """k bit positions by double hashing one blake2b digest"""
+        digest = hashlib.blake2b(token_id, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _bucket_offset(self, expires_at):
+        window = int(expires_at) // self.bucket_seconds
+        return window, (window % self.buckets) * self.bucket_size
+
+    def add(self, token_id, expires_at):
+        """Record token_id as used until its expiry window is over; False if it already was"""
+        window, offset = self._bucket_offset(expires_at)
+        with self._lock:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, self.bucket_size, offset)
+            try:
+                (stored_window,) = self.BUCKET_HEADER.unpack_from(self._buf, offset)
+                if stored_window != window:
+                    # Slot held an older window whose tokens have all expired: recycle it
+                    self._buf[offset:offset + self.bucket_size] = bytes(self.bucket_size)
+                    self.BUCKET_HEADER.pack_into(self._buf, offset, window)
+                bits_offset = offset + self.BUCKET_HEADER.size
+                added = False
+                for position in self._positions(token_id):
+                    mask = 1 << (position % 8)
+                    if not self._buf[bits_offset + position // 8] & mask:
+                        self._buf[bits_offset + position // 8] |= mask
+                        added = True
+                return added
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, self.bucket_size, offset)
+
+    def __contains__(self, item):
+        """item is (token_id, expires_at); lock-free read"""
+        token_id, expires_at = item
+        window, offset = self._bucket_offset(expires_at)
+        (stored_window,) = self.BUCKET_HEADER.unpack_from(self._buf, offset)
+        if stored_window != window:
+            return False
+        bits_offset = offset + self.BUCKET_HEADER.size
+        return all(self._buf[bits_offset + position // 8] & (1 << (position % 8))
+                   for position in self._positions(token_id))
+
+# ============================================================================
+# SIGNER
+# ============================================================================
+
+class SignedTokenSigner:
+    """Issue and verify signed reset tokens"""
+
+    def __init__(self, secret, ttl=TOKEN_TTL_SECONDS, used_filter=None):
+        if isinstance(secret, str):
+            secret = secret.encode()
+        # Derive a dedicated key so the signing secret is never used directly
+        self._key = hmac.new(secret, b'echohealth.reset-token', hashlib.sha256).digest()
+        self.ttl = ttl
+        self.used = used_filter if used_filter is not None else UsedTokenFilter()
+
+    def _mac(self, payload, bind):
+        return hmac.new(self._key, payload + bind.encode(), hashlib.sha256).digest()[:MAC_SIZE]
+
+    def sign(self, email, bind=''):
+        """Return a new token for email, valid for ttl seconds"""
+        payload = PAYLOAD.pack(TOKEN_VERSION, secrets.token_bytes(12), email_digest(email),
+                               int(time.time()) + self.ttl)
+        return _b64encode(payload + self._mac(payload, bind))
+
+    def _decode(self, token):
+        """Split a token into (payload fields, payload bytes, mac); None if malformed"""
+        try:
+            raw = _b64decode(token)
+        except (ValueError, TypeError):
+            return None
+        if len(raw) != PAYLOAD.size + MAC_SIZE:
+            return None
+        payload, mac = raw[:PAYLOAD.size], raw[PAYLOAD.size:]
+        return PAYLOAD.unpack(payload), payload, mac
+
+    def verify(self, token, email, bind=''):
+        """Return the token id if token is authentic, unexpired, for email and unused; else None"""
+        decoded = self._decode(token or '')
+        if decoded is None:
+            return None
+        (version, token_id, token_email_digest, expires_at), payload, mac = decoded
+        if version != TOKEN_VERSION or expires_at <= time.time():
+            return None
+        if not hmac.compare_digest(mac, self._mac(payload, bind)):
+            return None
+        if not hmac.compare_digest(token_email_digest, email_digest(email or '')):
+            return None
+        if (token_id, expires_at) in self.used:
+            return None
+        return token_id
+
+    def mark_used(self, token):
+        """Record a verified token as consumed; False if it already was (or is malformed)"""
+        decoded = self._decode(token or '')
+        if decoded is None:
+            return False
+        (_, token_id, _, expires_at), _, _ = decoded
+        return self.used.add(token_id, expires_at)
@@ -0,0 +1,99 @@
+"""
+Local SMTP Stand-In for Tests and Benchmarks
+A minimal threaded SMTP server: accepts EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT,
+records every delivered message and can add latency or fail on purpose.
+
+    server = SMTPStandIn(latency=0.02)
+    server.start()
+    ... connect to ('127.0.0.1', server.port) ...
+    server.stop()
+"""
+
+import email
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server.standin
+        with server.lock:
+            server.connections += 1
+        self.reply('220 standin ESMTP')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 standin')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip('<> '), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip('<> '))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line == b'.\r\n':
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                if server.latency:
+                    time.sleep(server.latency)
+                with server.lock:
+                    if server.fail_next:
+                        server.fail_next -= 1
+                        failing = True
+                    else:
+                        failing = False
+                        server.messages.append((sender, recipients, email.message_from_bytes(b''.join(lines))))
+                self.reply('451 Try again later' if failing else '250 Queued')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPStandIn:
+    """Threaded SMTP server on 127.0.0.1; latency is added per DATA, fail_next answers 451"""
+
+    def __init__(self, latency=0.0, fail_next=0):
+        self.latency = latency
+        self.fail_next = fail_next
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.standin = self
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
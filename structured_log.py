@@ -0,0 +1,256 @@
+"""
+Non-Blocking Structured Logging for the Request Path
+Replaces print() in the auth views: a log call only checks the level, applies the
+endpoint's sample rate and puts a tuple on a bounded queue. One background thread
+redacts, formats (one JSON object per line) and writes the records.
+
+    log = get_logger('login')
+    log.info('login_succeeded', email=email, user_id=user.id)
+    log.exception('login_error')             # inside an except block; traceback added by the writer
+
+Endpoint names: login, logout, request_otp, verify_otp, reset_password, rate_limit, otp_mail;
+the prediction views (/api/predict/, /api/oral-cancer-detect/) use get_logger('predict'),
+model loading at boot get_logger('model_registry'); background threads log as write_behind,
+expiry_reaper and otp_store.
+
+Configuration (env vars):
+    ECHOHEALTH_LOG_LEVEL        DEBUG | INFO (default) | WARNING | ERROR
+    ECHOHEALTH_LOG_SAMPLE       per-endpoint sample rates for DEBUG/INFO, e.g. "verify_otp=0.1,*=0.5";
+                                warnings and errors are always kept
+    ECHOHEALTH_LOG_QUEUE_SIZE   records waiting for the writer (default 10000); overflow is dropped and counted
+
+Fields named like secrets (otp, token, password, ...) are written as "[REDACTED]".
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+REDACTED = '[REDACTED]'
+REDACTED_FIELDS = frozenset({
+    'otp', 'token', 'password', 'confirm_password', 'new_password', 'authorization',
+    'secret', 'session_token', 'reset_token', 'upgraded_hash',
+})
+
+
+def parse_sample_rates(spec):
+    """"verify_otp=0.1,*=0.5" -> {'verify_otp': 0.1, '*': 0.5}"""
+    rates = {}
+    for part in spec.split(','):
+        endpoint, _, rate = part.partition('=')
+        if endpoint.strip() and rate.strip():
+            rates[endpoint.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+LOG_LEVEL = LEVELS[os.environ.get('ECHOHEALTH_LOG_LEVEL', 'INFO').upper()]
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get('ECHOHEALTH_LOG_SAMPLE', ''))
+LOG_QUEUE_SIZE = int(os.environ.get('ECHOHEALTH_LOG_QUEUE_SIZE', '10000'))
+LOG_BATCH_SIZE = 500
+
+
+def redact(fields):
+    return {key: REDACTED if key.lower() in REDACTED_FIELDS else value for key, value in fields.items()}
+
+
+def format_record(record):
+    """(timestamp, level, endpoint, event, fields, exc_info) -> JSON line"""
+    timestamp, level, endpoint, event, fields, exc_info = record
+    entry = {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(timestamp)) + f'.{int(timestamp % 1 * 1000):03d}Z',
+        'level': LEVEL_NAMES[level],
+        'endpoint': endpoint,
+        'event': event,
+    }
+    entry.update(redact(fields))
+    if exc_info is not None:
+        entry['traceback'] = ''.join(traceback.format_exception(*exc_info))
+    return json.dumps(entry, default=str)
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+class LogWriter:
+    """Bounded queue of records drained by one background thread"""
+
+    def __init__(self, stream=None, maxsize=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE):
+        # None writes to the current sys.stderr (so test runners can capture it)
+        self.stream = stream
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize)
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._stopped = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        atexit.register(self.close)
+
+    def put(self, record):
+        """Queue a record; never blocks (drops it when the writer is behind)"""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def _ensure_thread(self):
+        """Start the writer (threads do not survive fork, so once per worker)"""
+        if self._thread_pid != os.getpid() and not self._stopped:
+            with self._start_lock:
+                if self._thread_pid != os.getpid():
+                    self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                    self._thread.start()
+                    self._thread_pid = os.getpid()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is close()'s stop marker
+            records = [record for record in batch if record is not None]
+            stopping = len(records) < len(batch)
+            if records:
+                self._write(records)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(format_record(record))
+            except Exception as e:
+                lines.append(json.dumps({'level': 'ERROR', 'event': 'log_format_failed', 'error': str(e)}))
+        stream = self.stream or sys.stderr
+        try:
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+        except (OSError, ValueError):
+            return  # stream closed (e.g. at exit); nothing else to report to
+        self.written += len(batch)
+
+    def flush(self):
+        """Wait until every queued record has been written"""
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+
+    def stats(self):
+        return {
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'written': self.written,
+            'queued': self._queue.qsize(),
+        }
+
+# ============================================================================
+# LOGGERS
+# ============================================================================
+
+class EndpointLogger:
+    """Logger for one endpoint; level and sample rate are resolved once, not per call"""
+
+    def __init__(self, endpoint, writer, level=LOG_LEVEL, sample_rate=1.0):
+        self.endpoint = endpoint
+        self.writer = writer
+        self.level = level
+        self.sample_rate = sample_rate
+        self.sampled_out = 0
+
+    def log(self, level, event, fields, exc_info=None):
+        if level < self.level:
+            return
+        if level < WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return
+        self.writer.put((time.time(), level, self.endpoint, event, fields, exc_info))
+
+    def debug(self, event, **fields):
+        self.log(DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self.log(INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self.log(WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self.log(ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """error() with the exception being handled; formatted by the writer, not here"""
+        self.log(ERROR, event, fields, exc_info=sys.exc_info())
+
+
+log_writer = LogWriter()
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+
+def sample_rate_for(endpoint, rates=None):
+    rates = LOG_SAMPLE_RATES if rates is None else rates
+    return rates.get(endpoint, rates.get('*', 1.0))
+
+
+def get_logger(endpoint):
+    """Shared EndpointLogger for endpoint (e.g. 'login', 'verify_otp')"""
+    logger = _loggers.get(endpoint)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.setdefault(
+                endpoint, EndpointLogger(endpoint, log_writer, LOG_LEVEL, sample_rate_for(endpoint))
+            )
+    return logger
+
+
+def configure(level=None, sample_rates=None, stream=None):
+    """Change level, sample rates or output stream at runtime (tests, benchmarks, manage.py)"""
+    global LOG_LEVEL, LOG_SAMPLE_RATES
+    if level is not None:
+        LOG_LEVEL = LEVELS[level.upper()] if isinstance(level, str) else level
+    if sample_rates is not None:
+        LOG_SAMPLE_RATES = dict(sample_rates)
+    if stream is not None:
+        log_writer.flush()
+        log_writer.stream = stream
+    for logger in list(_loggers.values()):
+        logger.level = LOG_LEVEL
+        logger.sample_rate = sample_rate_for(logger.endpoint)
+
+
+def log_stats():
+    """Writer counters plus records sampled out per endpoint, for instrumentation"""
+    stats = log_writer.stats()
+    stats['sampled_out'] = {endpoint: logger.sampled_out for endpoint, logger in _loggers.items()}
+    return stats
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test script for the auth-flow engine (request OTP -> verify OTP -> reset password)
+Runs without a Django server: python test_auth_flow.py
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import auth_flow
+from otp_store import LocalMemoryStore, SQLiteStore
+from password_hashing import HashingPoolBusy
+from reset_tokens import ResetTokenStore
+from shared_otp_table import SharedOtpTable
+from signed_tokens import SignedTokenSigner, UsedTokenFilter
+
+EMAIL = "user@example.com"
+
+
+def make_flow(otps=None, tokens=None):
+    sent = {}
+    users = auth_flow.MemoryUserDirectory()
+    users.add(EMAIL, "old-password")
+    flow = auth_flow.AuthFlow(
+        users=users,
+        otps=otps or auth_flow.StoreOtpBackend(LocalMemoryStore()),
+        tokens=tokens or auth_flow.StoredTokenBackend(ResetTokenStore(shards=[LocalMemoryStore()])),
+        send_otp=lambda email, otp, minutes: sent.update({email: otp}) or True
+    )
+    return flow, users, sent
+
+
+def run_full_flow(flow, users, sent):
+    assert flow.request_otp(EMAIL).status == 200
+    result = flow.verify_otp(EMAIL, sent[EMAIL])
+    assert result.status == 200 and result.body['success']
+    token = result.body['token']
+    assert flow.reset_password(EMAIL, token, "new-password", "new-password").status == 200
+    assert users.get(EMAIL).password == "plain$new-password"
+    # Tokens are single use
+    assert flow.reset_password(EMAIL, token, "other-password", "other-password").status == 401
+
+
+def test_full_flow_store_backend():
+    run_full_flow(*make_flow())
+
+
+def test_full_flow_shared_table_and_signed_tokens():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        signer = SignedTokenSigner('secret', used_filter=UsedTokenFilter())
+        run_full_flow(*make_flow(auth_flow.SharedTableOtpBackend(table), auth_flow.SignedTokenBackend(signer)))
+        table.close()
+
+
+def test_request_otp_validation():
+    flow, _, sent = make_flow()
+    assert flow.request_otp('').status == 400
+    assert flow.request_otp('nobody@example.com').status == 404
+    result = flow.request_otp(EMAIL)
+    assert 'otp' not in result.body and EMAIL in sent
+
+
+def test_verify_otp_attempts():
+    flow, _, sent = make_flow()
+    flow.request_otp(EMAIL)
+    wrong = '000000' if sent[EMAIL] != '000000' else '111111'
+    assert flow.verify_otp(EMAIL, wrong).body['error'] == 'Invalid OTP. 2 attempts remaining.'
+    flow.verify_otp(EMAIL, wrong)
+    flow.verify_otp(EMAIL, wrong)
+    result = flow.verify_otp(EMAIL, sent[EMAIL])
+    assert result.status == 400 and 'Too many' in result.body['error']
+    assert 'No OTP found' in flow.verify_otp(EMAIL, sent[EMAIL]).body['error']
+
+
+def test_reset_password_validation():
+    flow, _, _ = make_flow()
+    assert flow.reset_password(EMAIL, None, "new-password", "new-password").status == 401
+    assert flow.reset_password(EMAIL, '', "new-password", "new-password").status == 401
+    assert flow.reset_password(EMAIL, 'x', "new-password", "different").body['error'] == 'Passwords do not match'
+    assert flow.reset_password(EMAIL, 'x', "short", "short").status == 400
+    assert flow.reset_password(EMAIL, 'bogus-token', "new-password", "new-password").status == 401
+
+
+def test_reset_password_busy_hashing_pool():
+    flow, users, sent = make_flow()
+
+    def busy(user, password):
+        raise HashingPoolBusy("full")
+
+    users.set_password = busy
+    flow.request_otp(EMAIL)
+    token = flow.verify_otp(EMAIL, sent[EMAIL]).body['token']
+    result = flow.reset_password(EMAIL, token, "new-password", "new-password")
+    assert result.status == 503 and 'Retry-After' in result.headers
+    # The token survives so the client can retry
+    users.set_password = auth_flow.MemoryUserDirectory.set_password.__get__(users)
+    assert flow.reset_password(EMAIL, token, "new-password", "new-password").status == 200
+
+
+def test_concurrent_resets_with_one_token():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        signer = SignedTokenSigner('secret', used_filter=UsedTokenFilter())
+        for tokens in (None, auth_flow.SignedTokenBackend(signer)):
+            flow, users, sent = make_flow(auth_flow.SharedTableOtpBackend(table), tokens)
+            set_password = users.set_password
+
+            def slow_set_password(user, password):
+                time.sleep(0.05)  # both requests are past the token check before either finishes
+                set_password(user, password)
+
+            users.set_password = slow_set_password
+            flow.request_otp(EMAIL)
+            token = flow.verify_otp(EMAIL, sent[EMAIL]).body['token']
+            statuses = []
+            start = threading.Barrier(2)
+
+            def reset(password):
+                start.wait()
+                statuses.append(flow.reset_password(EMAIL, token, password, password).status)
+
+            threads = [threading.Thread(target=reset, args=(password,)) for password in ("first-pass", "second-pass")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert sorted(statuses) == [200, 401], statuses
+        table.close()
+
+
+def run_async_flow(otps, tokens):
+    sent = {}
+    users = auth_flow.MemoryUserDirectory()
+    users.add(EMAIL, "old-password")
+
+    async def send_otp(email, otp, minutes):
+        sent[email] = otp
+        return True
+
+    flow = auth_flow.AsyncAuthFlow(users=users, otps=otps, tokens=tokens, send_otp=send_otp)
+
+    async def scenario():
+        assert (await flow.request_otp(EMAIL)).status == 200
+        wrong = '000000' if sent[EMAIL] != '000000' else '111111'
+        assert (await flow.verify_otp(EMAIL, wrong)).body['error'] == 'Invalid OTP. 2 attempts remaining.'
+        token = (await flow.verify_otp(EMAIL, sent[EMAIL])).body['token']
+        assert (await flow.reset_password(EMAIL, token, "new-password", "new-password")).status == 200
+        assert (await flow.reset_password(EMAIL, token, "new-password", "new-password")).status == 401
+
+    asyncio.run(scenario())
+    assert users.get(EMAIL).password == "plain$new-password"
+
+
+class CachedUser:
+    """Like a user from django_user_cache: reading .password would lazy-load it"""
+
+    def __init__(self, email):
+        self.email = email
+
+    @property
+    def password(self):
+        raise AssertionError("deferred field loaded lazily")
+
+
+class CachedUserDirectory(auth_flow.MemoryUserDirectory):
+    """users backend that returns cached users and reads the hash explicitly"""
+
+    def get(self, email):
+        return CachedUser(email) if email in self.users else None
+
+    async def apassword_hash(self, user):
+        return self.users[user.email].password
+
+    def set_password(self, user, password):
+        super().set_password(self.users[user.email], password)
+
+
+def test_async_signed_tokens_bind_cached_users():
+    users = CachedUserDirectory()
+    users.add(EMAIL, "old-password")
+    sent = {}
+
+    async def send_otp(email, otp, minutes):
+        sent[email] = otp
+        return True
+
+    signer = SignedTokenSigner('secret', used_filter=UsedTokenFilter())
+    flow = auth_flow.AsyncAuthFlow(users=users, otps=auth_flow.StoreOtpBackend(LocalMemoryStore()),
+                                   tokens=auth_flow.SignedTokenBackend(signer), send_otp=send_otp)
+
+    async def scenario():
+        await flow.request_otp(EMAIL)
+        token = (await flow.verify_otp(EMAIL, sent[EMAIL])).body['token']
+        assert (await flow.reset_password(EMAIL, token, "new-password", "new-password")).status == 200
+        # Bound to the old hash: invalid once the password changed
+        assert (await flow.reset_password(EMAIL, token, "other-password", "other-password")).status == 401
+
+    asyncio.run(scenario())
+    assert users.users[EMAIL].password == "plain$new-password"
+
+
+def test_async_flow_sqlite_store():
+    # SQLite calls run in worker threads (blocking backend)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'store.sqlite3')
+        run_async_flow(auth_flow.StoreOtpBackend(SQLiteStore('otp', path=path)),
+                       auth_flow.StoredTokenBackend(ResetTokenStore(shards=[SQLiteStore('token', path=path)])))
+
+
+def test_async_flow_shared_table_and_signed_tokens():
+    # Backends without async methods are called inline
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        signer = SignedTokenSigner('secret', used_filter=UsedTokenFilter())
+        run_async_flow(auth_flow.SharedTableOtpBackend(table), auth_flow.SignedTokenBackend(signer))
+        table.close()
+
+
+def main():
+    print("🧪 Testing Auth-Flow Engine")
+    print("=" * 50)
+    for test in (test_full_flow_store_backend, test_full_flow_shared_table_and_signed_tokens,
+                 test_request_otp_validation, test_verify_otp_attempts, test_reset_password_validation,
+                 test_reset_password_busy_hashing_pool, test_concurrent_resets_with_one_token,
+                 test_async_flow_sqlite_store,
+                 test_async_flow_shared_table_and_signed_tokens, test_async_signed_tokens_bind_cached_users):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
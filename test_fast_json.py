@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the fast JSON encode/decode helpers
+Runs without a Django server: python test_fast_json.py
+Checks the orjson backend (when installed) and the stdlib fallback give the same results.
+"""
+
+import datetime
+import decimal
+import importlib.util
+import sys
+import uuid
+
+import fast_json
+
+SAMPLE = {
+    'message': 'Login successful',
+    'token': 'abc123',
+    'user': {'id': 7, 'email': 'user@example.com', 'username': 'Ünïcode'},
+    'joined': datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    'score': decimal.Decimal('87.5'),
+    'request_id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'flags': ('a', 'b'),
+}
+
+
+def stdlib_backend():
+    """A separate copy of fast_json loaded as if orjson were not installed"""
+    spec = importlib.util.spec_from_file_location('fast_json_stdlib', fast_json.__file__)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get('orjson')
+    sys.modules['orjson'] = None  # makes `import orjson` raise ImportError
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules['orjson']
+        else:
+            sys.modules['orjson'] = saved
+    return module
+
+
+def backends():
+    fallback = stdlib_backend()
+    return [fast_json, fallback] if fast_json.BACKEND == 'orjson' else [fallback]
+
+
+def test_round_trip():
+    for backend in backends():
+        body = backend.dumps(SAMPLE)
+        assert isinstance(body, bytes)
+        data = backend.loads(body)
+        assert data['user']['username'] == 'Ünïcode' and data['joined'] == '2024-01-02T03:04:05Z'
+        assert data['score'] == 87.5 and data['request_id'] == str(SAMPLE['request_id'])
+        assert data['flags'] == ['a', 'b']
+
+
+def test_fallback_is_stdlib():
+    assert stdlib_backend().BACKEND == 'json'
+
+
+def test_same_bytes_from_both_backends():
+    outputs = {backend.dumps(SAMPLE) for backend in backends()}
+    assert len(outputs) == 1, outputs
+    assert b'\\u' not in outputs.pop()  # UTF-8, not escapes
+
+
+def test_invalid_input_raises_value_error():
+    for backend in backends():
+        for body in (b'{"email": ', b'', b'\xff\xfe', 'not json'):
+            try:
+                backend.loads(body)
+            except ValueError:
+                continue
+            raise AssertionError(f"{backend.BACKEND} accepted {body!r}")
+
+
+def test_accepts_str_and_bytes():
+    for backend in backends():
+        assert backend.loads('{"otp": "123456"}') == backend.loads(b'{"otp": "123456"}') == {'otp': '123456'}
+
+
+def main():
+    print(f"🧪 Testing Fast JSON ({fast_json.BACKEND})")
+    print("=" * 50)
+    for test in (test_round_trip, test_fallback_is_stdlib, test_same_bytes_from_both_backends, test_invalid_input_raises_value_error,
+                 test_accepts_str_and_bytes):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
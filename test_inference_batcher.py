@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-batching predict scheduler
+Runs without a Django server: python test_inference_batcher.py
+"""
+
+import asyncio
+import threading
+
+from inference_batcher import MicroBatcher
+from risk_scoring import RiskModel, encode_rows
+from test_risk_scoring import random_rows
+
+
+def encoded(rows):
+    return [list(map(int, row)) for row in encode_rows(rows)]
+
+
+def submit_concurrently(batcher, rows):
+    results = [None] * len(rows)
+    start = threading.Barrier(len(rows))
+
+    def call(i):
+        start.wait()
+        results[i] = batcher.submit(rows[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_every_caller_gets_its_own_row():
+    model = RiskModel()
+    rows = encoded(random_rows(200))
+    scores, levels = model.predict(rows)
+    batcher = MicroBatcher(model.predict, window=0.005, max_batch=64)
+    results = submit_concurrently(batcher, rows)
+    assert results == [(int(score), int(level)) for score, level in zip(scores, levels)]
+    stats = batcher.stats()
+    assert stats['rows'] == 200 and 1 < stats['largest_batch'] <= 64, stats
+    assert stats['batches'] < 200
+    batcher.close()
+
+
+def test_model_errors_reach_every_caller():
+    def broken(matrix):
+        raise RuntimeError("model not loaded")
+
+    batcher = MicroBatcher(broken, window=0.005)
+    errors = []
+
+    def call():
+        try:
+            batcher.submit([45, 1] + [0] * 10)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["model not loaded"] * 8 and batcher.stats()['failed_batches'] >= 1
+    batcher.close()
+
+
+def test_async_submit():
+    model = RiskModel()
+    rows = encoded(random_rows(50))
+    batcher = MicroBatcher(model.predict, window=0.005)
+
+    async def run():
+        return await asyncio.gather(*(batcher.asubmit(row) for row in rows))
+
+    results = asyncio.run(run())
+    scores, levels = model.predict(rows)
+    assert results == [(int(score), int(level)) for score, level in zip(scores, levels)]
+    assert batcher.stats()['largest_batch'] > 1
+    batcher.close()
+
+
+def test_short_model_output_fails_the_batch():
+    batcher = MicroBatcher(lambda matrix: ([100], [1]), window=0.005, timeout=2.0)
+    results = [None] * 4
+
+    def call(i):
+        try:
+            results[i] = batcher.submit([45, 1] + [0] * 10)
+        except ValueError as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Nobody hangs: a batch of one is answered, a batch of several fails for every caller
+    assert all(result == (100, 1) or isinstance(result, ValueError) for result in results), results
+    batcher.close()
+
+
+def test_dead_scheduler_times_out_and_restarts():
+    def predict(matrix):
+        if calls.pop(0):
+            raise SystemExit  # ends the scheduler thread without resolving the batch
+        return [7] * len(matrix), [0] * len(matrix)
+
+    calls = [True, False]
+    batcher = MicroBatcher(predict, timeout=0.2)
+    try:
+        batcher.submit([45, 1] + [0] * 10)
+        raise AssertionError("expected TimeoutError")
+    except TimeoutError:
+        pass
+    assert batcher.submit([45, 1] + [0] * 10) == (7, 0)
+    batcher.close()
+
+
+def test_closed_batcher_rejects_rows():
+    batcher = MicroBatcher(RiskModel().predict)
+    batcher.close()
+    try:
+        batcher.submit([45, 1] + [0] * 10)
+    except RuntimeError:
+        return
+    raise AssertionError("expected RuntimeError")
+
+
+def main():
+    print("🧪 Testing Micro-Batching Scheduler")
+    print("=" * 50)
+    for test in (test_every_caller_gets_its_own_row, test_model_errors_reach_every_caller, test_async_submit,
+                 test_short_model_output_fails_the_batch, test_dead_scheduler_times_out_and_restarts,
+                 test_closed_batcher_rejects_rows):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed symptom lookup table
+Runs without a Django server: python test_lookup_table.py
+"""
+
+from lookup_table import LookupTableModel
+from model_registry import ModelRegistry
+from risk_scoring import RiskModel, encode_rows
+from test_risk_scoring import random_rows
+
+
+def test_table_matches_model_on_every_combination():
+    model = RiskModel()
+    table = LookupTableModel.build(model)
+    assert table.age_bands == (0, 40) and len(table) == 2 * 4 * 1024
+    assert table.verify(model) == 0
+
+
+def test_predict_and_predict_row_agree_with_model():
+    model = RiskModel()
+    table = LookupTableModel.build(model)
+    matrix = encode_rows(random_rows(500))
+    scores, levels = model.predict(matrix)
+    table_scores, table_levels = table.predict(matrix)
+    assert list(map(int, table_scores)) == list(map(int, scores))
+    assert list(map(int, table_levels)) == list(map(int, levels))
+    for row, score, level in zip(matrix, scores, levels):
+        assert table.predict_row(list(map(int, row))) == (int(score), int(level))
+
+
+def test_wrong_age_bands_are_detected():
+    model = RiskModel()
+    # the age rule switches at 40; a band starting at 50 scores ages 40-49 as "under 40"
+    table = LookupTableModel.build(model, age_bands=(0, 50))
+    assert table.verify(model) == 10 * 4 * 1024
+
+
+def test_scores_beyond_int16_widen_the_table():
+    model = RiskModel(flag_weights=[40000] * 10)
+    table = LookupTableModel.build(model)
+    assert table.verify(model) == 0
+    row = [45, 1] + [1] * 10
+    scores, levels = model.predict([row])
+    assert table.predict_row(row) == (int(scores[0]), int(levels[0])) and int(scores[0]) > 400000
+
+
+class HugeScoreModel:
+    """A custom model whose scores no integer array can hold"""
+
+    def predict(self, matrix):
+        return [1 << 70] * len(matrix), [2] * len(matrix)
+
+
+def test_registry_falls_back_when_table_cannot_hold_scores():
+    registry = ModelRegistry(sources={'risk': 'builtin'}, lookup=True)
+    model = HugeScoreModel()
+    assert registry._lookup_table('risk', model, {}) is model
+
+
+def test_registry_serves_exact_table_only():
+    registry = ModelRegistry(sources={'risk': 'builtin'}, lookup=True)
+    assert registry.load_all()
+    assert isinstance(registry.get('risk'), LookupTableModel)
+    stats = registry.stats()
+    assert stats['risk_lookup_mismatches'] == 0 and stats['risk_lookup_bytes'] == 8192 * 3
+
+    registry = ModelRegistry(sources={'risk': 'builtin'}, lookup=True, lookup_age_bands=(0, 50))
+    assert registry.load_all()
+    assert isinstance(registry.get('risk'), RiskModel)
+    assert registry.stats()['risk_lookup_mismatches'] > 0
+
+
+def main():
+    print("🧪 Testing Lookup Table")
+    print("=" * 50)
+    for test in (test_table_matches_model_on_every_combination, test_predict_and_predict_row_agree_with_model,
+                 test_wrong_age_bands_are_detected, test_scores_beyond_int16_widen_the_table,
+                 test_registry_falls_back_when_table_cannot_hold_scores, test_registry_serves_exact_table_only):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the predict model registry (warm loading and readiness)
+Runs without a Django server: python test_model_registry.py
+"""
+
+import json
+import os
+import tempfile
+
+from model_registry import ModelNotReady, ModelRegistry, load_model, parse_model_sources
+from risk_scoring import RiskModel, encode_rows
+from test_risk_scoring import HIGH_RISK_ROW
+
+
+class WrongShapeModel:
+    def predict(self, matrix):
+        return [0], [0]
+
+
+def test_not_ready_until_loaded():
+    registry = ModelRegistry(sources={'risk': 'builtin'})
+    assert not registry.ready() and registry.status()['models'] == {'risk': 'loading'}
+    try:
+        registry.get('risk')
+    except ModelNotReady:
+        pass
+    else:
+        raise AssertionError("expected ModelNotReady")
+    assert registry.load_all() and registry.ready()
+    scores, _ = registry.get('risk').predict(encode_rows([HIGH_RISK_ROW]))
+    assert int(scores[0]) == 215
+
+
+def test_cold_start_reported():
+    registry = ModelRegistry(sources={'risk': 'builtin'})
+    registry.load_all()
+    stats = registry.stats()
+    assert stats['ready'] == 1 and stats['models'] == 1 and stats['load_failures'] == 0
+    assert stats['cold_start_seconds'] >= stats['risk_load_seconds'] + stats['risk_warmup_seconds']
+
+
+def test_failed_model_keeps_registry_unready():
+    registry = ModelRegistry(sources={'risk': 'builtin', 'broken': 'broken'},
+                             loader=lambda source: WrongShapeModel() if source == 'broken' else RiskModel())
+    assert not registry.load_all()
+    assert registry.status() == {'ready': False, 'models': {'risk': 'ready', 'broken': 'failed'}}
+    assert registry.stats()['load_failures'] == 1
+    try:
+        registry.get('broken')
+    except ModelNotReady as e:
+        assert 'predict() returned' in str(e)
+    else:
+        raise AssertionError("expected ModelNotReady")
+
+
+def test_json_weights_source():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'risk_weights.json')
+        with open(path, 'w') as f:
+            json.dump({'flag_weights': [1] * 10, 'age_points': 0, 'gender_points': [0, 0, 0, 0]}, f)
+        scores, _ = load_model(path).predict(encode_rows([HIGH_RISK_ROW]))
+        assert int(scores[0]) == 7  # seven flags set
+
+
+def test_parse_model_sources():
+    assert parse_model_sources("risk=builtin, other=/srv/m.pkl,bad") == {'risk': 'builtin', 'other': '/srv/m.pkl'}
+
+
+def main():
+    print("🧪 Testing Model Registry")
+    print("=" * 50)
+    for test in (test_not_ready_until_loaded, test_cold_start_reported, test_failed_model_keeps_registry_unready,
+                 test_json_weights_source, test_parse_model_sources):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
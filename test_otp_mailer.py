@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the OTP mail queue against a local SMTP stand-in
+Runs without a Django server or real mail server: python test_otp_mailer.py
+"""
+
+import smtplib
+import time
+
+from otp_mailer import MailQueue, build_otp_message, is_transient, smtp_connector
+from smtp_standin import SMTPStandIn
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_messages_delivered_over_pooled_connections():
+    server = SMTPStandIn().start()
+    mailer = MailQueue(smtp_connector('127.0.0.1', server.port), workers=2, backoff_base=0.01)
+    try:
+        for i in range(40):
+            assert mailer.enqueue(build_otp_message(f"user{i}@example.com", str(100000 + i)))
+        assert wait_for(lambda: len(server.messages) == 40)
+        # Each worker keeps one connection open for all its batches
+        assert server.connections <= 2
+        recipients = sorted(recipients[0] for _, recipients, _ in server.messages)
+        assert recipients == sorted(f"user{i}@example.com" for i in range(40))
+        assert any('100000' in message.get_payload() for _, _, message in server.messages)
+    finally:
+        mailer.close()
+        server.stop()
+
+
+def test_transient_failure_retried_with_backoff():
+    server = SMTPStandIn(fail_next=2).start()
+    mailer = MailQueue(smtp_connector('127.0.0.1', server.port), workers=1, backoff_base=0.01)
+    try:
+        mailer.enqueue(build_otp_message('a@example.com', '123456'))
+        assert wait_for(lambda: len(server.messages) == 1)
+        stats = mailer.stats()
+        assert stats['retried'] == 2 and stats['sent'] == 1 and stats['failed'] == 0
+    finally:
+        mailer.close()
+        server.stop()
+
+
+def test_gives_up_after_max_attempts():
+    server = SMTPStandIn(fail_next=10).start()
+    mailer = MailQueue(smtp_connector('127.0.0.1', server.port), workers=1, max_attempts=3, backoff_base=0.01)
+    try:
+        mailer.enqueue(build_otp_message('a@example.com', '123456'))
+        assert wait_for(lambda: mailer.stats()['failed'] == 1)
+        assert server.messages == []
+    finally:
+        mailer.close()
+        server.stop()
+
+
+def test_unreachable_server_retries_whole_batch():
+    server = SMTPStandIn().start()
+    port = server.port
+    server.stop()
+    mailer = MailQueue(smtp_connector('127.0.0.1', port, timeout=1), workers=1, backoff_base=10)
+    try:
+        for i in range(3):
+            mailer.enqueue(build_otp_message(f"user{i}@example.com", '123456'))
+        assert wait_for(lambda: mailer.stats()['retrying'] == 3)
+    finally:
+        mailer.close(timeout=1)
+
+
+def test_full_queue_rejects():
+    mailer = MailQueue(smtp_connector('127.0.0.1', 1), workers=0, maxsize=1)
+    assert mailer.enqueue(build_otp_message('a@example.com', '1'))
+    assert not mailer.enqueue(build_otp_message('b@example.com', '2'))
+    assert mailer.stats()['rejected'] == 1
+
+
+def test_error_classification():
+    assert is_transient(smtplib.SMTPDataError(451, b'later'))
+    assert not is_transient(smtplib.SMTPDataError(550, b'no such user'))
+    assert is_transient(smtplib.SMTPServerDisconnected())
+    assert is_transient(ConnectionRefusedError())
+    assert not is_transient(smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'unknown')}))
+
+
+def main():
+    print("🧪 Testing OTP Mail Queue")
+    print("=" * 50)
+    for test in (test_messages_delivered_over_pooled_connections, test_transient_failure_retried_with_backoff,
+                 test_gives_up_after_max_attempts, test_unreachable_server_retries_whole_batch,
+                 test_full_queue_rejects, test_error_classification):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared OTP/token store backends
+Runs without a Django server: python test_otp_store.py
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import otp_store
+from shared_otp_table import INVALID, MISSING, TOO_MANY_ATTEMPTS, VERIFIED
+
+
+def check_store(store):
+    """Exercise the ExpiringStore contract on one backend"""
+    store.clear()
+
+    store.set('a@example.com', {'otp': '111111', 'attempts': 0}, ttl=60)
+    assert store.get('a@example.com') == {'otp': '111111', 'attempts': 0}
+    assert 'a@example.com' in store
+    assert store.get('missing@example.com') is None
+
+    assert store.replace('a@example.com', {'otp': '111111', 'attempts': 1})
+    assert store.get('a@example.com')['attempts'] == 1
+    assert not store.replace('missing@example.com', {'otp': '0'})
+
+    store.set('b@example.com', {'otp': '222222'}, ttl=0.2)
+    time.sleep(0.3)
+    assert store.get('b@example.com') is None
+    assert not store.replace('b@example.com', {'otp': '222222'})
+
+    store.set('c@example.com', {'otp': '333333'}, ttl=-1)
+    assert store.expire() >= 1
+    assert len(store) == 1
+
+    assert store.pop('a@example.com')['otp'] == '111111'
+    assert store.pop('a@example.com') is None
+    assert not store.delete('a@example.com')
+
+    store.set('d@example.com', {'otp': '444444', 'attempts': 0}, ttl=60)
+    assert store.verify_otp('d@example.com', '000000', 3) == (INVALID, 2)
+    assert store.get('d@example.com')['attempts'] == 1
+    assert store.verify_otp('d@example.com', '444444', 3) == (VERIFIED, 1)
+    assert store.verify_otp('d@example.com', '444444', 3) == (MISSING, 0)
+    store.set('e@example.com', {'otp': '555555', 'attempts': 3}, ttl=60)
+    assert store.verify_otp('e@example.com', '555555', 3) == (TOO_MANY_ATTEMPTS, 0)
+    assert store.get('e@example.com') is None
+
+    assert store.append('user:f@example.com', 'd1', ttl=60, keep=2) == []
+    assert store.append('user:f@example.com', 'd2', ttl=60, keep=2) == []
+    assert store.append('user:f@example.com', 'd3', ttl=60, keep=2) == ['d1']
+    assert store.get('user:f@example.com') == ['d2', 'd3']
+
+
+def guess_concurrently(store, threads, guesses_per_thread, max_attempts=3):
+    """Threads hammer one email with wrong OTPs; returns the count of each result"""
+    store.set('victim@example.com', {'otp': '123456', 'attempts': 0}, ttl=60)
+    results = {}
+    results_lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def guess():
+        start.wait()
+        for i in range(guesses_per_thread):
+            status, _ = store.verify_otp('victim@example.com', f'{i:06d}', max_attempts)
+            with results_lock:
+                results[status] = results.get(status, 0) + 1
+
+    workers = [threading.Thread(target=guess) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def _write_from_child(path):
+    """Simulates request_otp landing on another worker"""
+    otp_store.SQLiteStore('otp', path=path).set('x@example.com', {'otp': '999999'}, ttl=60)
+
+
+def test_local_memory_store():
+    check_store(otp_store.LocalMemoryStore())
+
+
+def test_concurrent_guesses_never_exceed_attempt_limit():
+    for store in (otp_store.LocalMemoryStore(stripes=1), otp_store.LocalMemoryStore(stripes=16)):
+        results = guess_concurrently(store, threads=16, guesses_per_thread=200)
+        # exactly max_attempts wrong guesses are checked, one more deletes the entry
+        assert results.get(INVALID) == 3 and results.get(TOO_MANY_ATTEMPTS) == 1, results
+        assert results.get(MISSING) == 16 * 200 - 4
+
+
+def test_concurrent_guesses_sqlite():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = otp_store.SQLiteStore('otp', path=os.path.join(tmpdir, 'store.sqlite3'))
+        results = guess_concurrently(store, threads=8, guesses_per_thread=20)
+        assert results.get(INVALID) == 3 and results.get(TOO_MANY_ATTEMPTS) == 1, results
+
+
+def test_sqlite_store():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        check_store(otp_store.SQLiteStore('otp', path=os.path.join(tmpdir, 'store.sqlite3')))
+
+
+def test_sqlite_store_is_shared_between_processes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'store.sqlite3')
+        store = otp_store.SQLiteStore('otp', path=path)
+        child = multiprocessing.Process(target=_write_from_child, args=(path,))
+        child.start()
+        child.join()
+        assert store.get('x@example.com') == {'otp': '999999'}
+
+
+def test_sqlite_file_is_owner_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'store.sqlite3')
+        old_umask = os.umask(0o022)
+        try:
+            otp_store.SQLiteStore('otp', path=path).set('x@example.com', {'otp': '123456'}, ttl=60)
+        finally:
+            os.umask(old_umask)
+        for name in (path, path + '-wal', path + '-shm'):
+            if os.path.exists(name):
+                assert os.stat(name).st_mode & 0o777 == 0o600, (name, oct(os.stat(name).st_mode))
+
+
+def test_reaper_runs_in_forked_workers():
+    otp_store._ensure_reaper()  # what get_store() does in a preloaded master
+    pid = os.fork()
+    if pid == 0:
+        alive = otp_store._reaper_pid == os.getpid() and otp_store._reaper.is_alive()
+        os._exit(0 if alive else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_manager_store():
+    address = '127.0.0.1:50556'
+    server = multiprocessing.Process(target=otp_store.serve_store, args=(address,), daemon=True)
+    server.start()
+    try:
+        time.sleep(0.5)
+        check_store(otp_store.ManagerStore('otp', address=address))
+        # The old hard-coded default key is refused
+        try:
+            otp_store.ManagerStore('otp', address=address, authkey=b'echohealth').get('k')
+            raise AssertionError("expected AuthenticationError")
+        except multiprocessing.AuthenticationError:
+            pass
+    finally:
+        server.terminate()
+
+
+def test_create_store_rejects_unknown_backend():
+    try:
+        otp_store.create_store('otp', backend='redis')
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+def main():
+    print("🧪 Testing OTP Store Backends")
+    print("=" * 50)
+    for test in (test_local_memory_store, test_concurrent_guesses_never_exceed_attempt_limit,
+                 test_concurrent_guesses_sqlite, test_sqlite_store,
+                 test_sqlite_store_is_shared_between_processes, test_sqlite_file_is_owner_only,
+                 test_reaper_runs_in_forked_workers, test_manager_store,
+                 test_create_store_rejects_unknown_backend):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded password hashing pool
+Runs without a Django server: python test_password_hashing.py
+"""
+
+import asyncio
+import hashlib
+import time
+
+from password_hashing import BoundedProcessPool, HashingPoolBusy
+
+
+def pbkdf2(password, salt):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 1000).hex()
+
+
+def slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_run_returns_result_from_worker():
+    pool = BoundedProcessPool(max_workers=2, max_pending=4)
+    try:
+        assert pool.run(pbkdf2, 'secret', 'salt') == pbkdf2('secret', 'salt')
+        # Counters are updated by the future's done callback
+        time.sleep(0.05)
+        assert pool.stats()['completed'] == 1
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_rejects_when_queue_full():
+    pool = BoundedProcessPool(max_workers=1, max_pending=2)
+    try:
+        futures = [pool.submit(slow, 0.3), pool.submit(slow, 0.3)]
+        try:
+            pool.submit(slow, 0.3)
+            assert False, "expected HashingPoolBusy"
+        except HashingPoolBusy:
+            pass
+        assert [f.result() for f in futures] == [0.3, 0.3]
+        time.sleep(0.05)
+        stats = pool.stats()
+        assert stats['rejected'] == 1 and stats['peak_pending'] == 2 and stats['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_async_wrapper():
+    pool = BoundedProcessPool(max_workers=2, max_pending=4)
+
+    async def both():
+        return await asyncio.gather(pool.arun(pbkdf2, 'a', 's'), pool.arun(pbkdf2, 'b', 's'))
+
+    try:
+        assert asyncio.run(both()) == [pbkdf2('a', 's'), pbkdf2('b', 's')]
+    finally:
+        pool.shutdown()
+
+
+def main():
+    print("🧪 Testing Password Hashing Pool")
+    print("=" * 50)
+    for test in (test_run_returns_result_from_worker, test_rejects_when_queue_full, test_async_wrapper):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the password hash cost search
+Runs without a Django server: python test_password_tuning.py
+Hash time comes from a fake clock, so the results do not depend on how loaded the machine is.
+"""
+
+from password_tuning import LOG2, measure_p99, recommend_cost
+
+
+class FakeHasher:
+    """hash_fn whose call advances a fake clock by seconds_per_unit * units(cost)"""
+
+    def __init__(self, seconds_per_unit, units=lambda cost: cost):
+        self.seconds_per_unit = seconds_per_unit
+        self.units = units
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def __call__(self, cost):
+        self.now += self.seconds_per_unit * self.units(cost)
+
+
+def test_linear_cost_meets_target():
+    # 1 µs per iteration: 5.5 ms allows 5000 iterations in steps of 1000
+    hasher = FakeHasher(1e-6)
+    target = 0.0055
+    cost, p99 = recommend_cost(hasher, target, start_cost=1000, samples=5, step=1000, clock=hasher.clock)
+    assert p99 <= target
+    assert cost == 5000, cost
+    # The largest cost under target: one more step and the target is missed
+    assert measure_p99(hasher, cost + 1000, samples=5, clock=hasher.clock) > target
+
+
+def test_log2_cost_moves_in_whole_rounds():
+    # 2 ** rounds units of 1 µs: 12 rounds = 4.1 ms, 13 rounds = 8.2 ms
+    hasher = FakeHasher(1e-6, units=lambda rounds: 2 ** rounds)
+    cost, p99 = recommend_cost(hasher, 0.005, start_cost=8, scale=LOG2, samples=5, clock=hasher.clock)
+    assert isinstance(cost, int)
+    assert cost == 12, cost
+    assert p99 <= 0.005
+
+
+def test_never_below_min_cost():
+    hasher = FakeHasher(1e-6)
+    cost, _ = recommend_cost(hasher, 1e-9, start_cost=5000, samples=3, min_cost=1000, step=1000,
+                             clock=hasher.clock)
+    assert cost == 1000
+
+
+def test_unreachable_target_stops_at_smallest_step():
+    # min_cost left at 1 while the cost moves in steps of 1000: the search must still end
+    hasher = FakeHasher(1e-6)
+    cost, p99 = recommend_cost(hasher, 1e-9, start_cost=5000, samples=3, step=1000, clock=hasher.clock)
+    assert cost == 1000 and p99 > 1e-9
+
+
+def main():
+    print("🧪 Testing Password Cost Tuning")
+    print("=" * 50)
+    for test in (test_linear_cost_meets_target, test_log2_cost_moves_in_whole_rounds, test_never_below_min_cost,
+                 test_unreachable_target_stops_at_smallest_step):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for owner-only shared-state files
+Runs without a Django server: python test_private_files.py
+"""
+
+import os
+import stat
+import tempfile
+
+from private_files import open_private
+from shared_otp_table import SharedOtpTable
+
+
+def mode_of(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_is_owner_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'state.bin')
+        os.close(open_private(path))
+        assert mode_of(path) == 0o600
+
+
+def test_existing_file_is_tightened():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'state.bin')
+        with open(path, 'wb'):
+            pass
+        os.chmod(path, 0o644)
+        os.close(open_private(path))
+        assert mode_of(path) == 0o600
+
+
+def test_symlink_is_refused():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = os.path.join(tmpdir, 'elsewhere.bin')
+        path = os.path.join(tmpdir, 'otp.bin')
+        os.symlink(target, path)
+        try:
+            SharedOtpTable(path=path, capacity=64)
+        except OSError:
+            assert not os.path.exists(target)
+            return
+        raise AssertionError("expected OSError")
+
+
+def main():
+    print("🧪 Testing Private Files")
+    print("=" * 50)
+    for test in (test_new_file_is_owner_only, test_existing_file_is_tightened, test_symlink_is_refused):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared-memory request metrics (histograms, aggregation, Prometheus text)
+Runs without a Django server: python test_request_metrics.py
+"""
+
+import os
+import random
+import tempfile
+
+import request_metrics
+from request_metrics import (
+    COUNT, DB_QUERIES, HIST_BUCKETS, STATUS_MIN, STATUS_OFFSET, WorkerMetrics, aggregate, bucket_index,
+    bucket_upper, quantile, render_prometheus
+)
+
+
+def test_bucket_bounds():
+    for index in range(HIST_BUCKETS):
+        assert bucket_index(bucket_upper(index)) == index
+    for _ in range(10000):
+        micros = random.randint(1, 60_000_000)
+        index = bucket_index(micros)
+        assert micros <= bucket_upper(index) <= micros * 1.125
+
+
+def test_record_and_aggregate_workers():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = WorkerMetrics(os.path.join(tmpdir, 'metrics-1.bin'))
+        second = WorkerMetrics(os.path.join(tmpdir, 'metrics-2.bin'))
+        first.record('api/login/', 200, 2_000_000, db_queries=2)
+        second.record('api/login/', 401, 4_000_000, db_queries=1)
+        second.record('api/predict/', 200, 80_000_000)
+        totals = aggregate(tmpdir)
+        login = totals['api/login/']
+        assert login[COUNT] == 2 and login[DB_QUERIES] == 3
+        assert login[STATUS_OFFSET + 200 - STATUS_MIN] == 1 and login[STATUS_OFFSET + 401 - STATUS_MIN] == 1
+        assert totals['api/predict/'][COUNT] == 1
+        first.close()
+        second.close()
+
+
+def test_quantiles_from_histogram():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics = WorkerMetrics(os.path.join(tmpdir, 'metrics-1.bin'))
+        for ms in range(1, 101):
+            metrics.record('api/verify-otp/', 200, ms * 1_000_000)
+        words = aggregate(tmpdir)['api/verify-otp/']
+        assert 0.050 <= quantile(words, 0.5) <= 0.050 * 1.125
+        assert 0.099 <= quantile(words, 0.99) <= 0.099 * 1.125
+        metrics.close()
+
+
+def test_routes_beyond_limit_share_other_slot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics = WorkerMetrics(os.path.join(tmpdir, 'metrics-1.bin'), max_routes=3)
+        for route in ('a', 'b', 'c', 'd', 'a'):
+            metrics.record(route, 200, 1000)
+        totals = aggregate(tmpdir)
+        assert sorted(totals) == ['__other__', 'a', 'b']
+        assert totals['a'][COUNT] == 2 and totals['__other__'][COUNT] == 2
+        metrics.close()
+
+
+def test_prometheus_text():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics = WorkerMetrics(os.path.join(tmpdir, 'metrics-1.bin'))
+        metrics.record('api/login/', 200, 3_000_000, request_bytes=50, response_bytes=300)
+        text = render_prometheus(aggregate(tmpdir))
+        assert 'echohealth_http_request_duration_seconds_bucket{route="api/login/",le="0.005"} 1' in text
+        assert 'echohealth_http_request_duration_seconds_bucket{route="api/login/",le="0.001"} 0' in text
+        assert 'echohealth_http_responses_total{route="api/login/",status="200"} 1' in text
+        assert 'echohealth_http_response_bytes_total{route="api/login/"} 300' in text
+        metrics.close()
+
+
+def test_worker_file_per_process():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        metrics = request_metrics.worker_metrics(tmpdir)
+        assert metrics is request_metrics.worker_metrics(tmpdir)
+        pid = os.fork()
+        if pid == 0:
+            request_metrics.worker_metrics(tmpdir).record('api/login/', 200, 1000)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        metrics.record('api/login/', 200, 1000)
+        assert len(os.listdir(tmpdir)) == 2
+        assert aggregate(tmpdir)['api/login/'][COUNT] == 2
+        # The exited child's file was folded into the retired file, counted once
+        assert not os.path.exists(os.path.join(tmpdir, f'metrics-{pid}.bin'))
+        assert os.path.exists(os.path.join(tmpdir, request_metrics.RETIRED_FILE))
+        assert aggregate(tmpdir)['api/login/'][COUNT] == 2
+        request_metrics.reset_metrics_dir(tmpdir)
+        assert os.listdir(tmpdir) == []
+
+
+def test_exited_workers_fold_into_one_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for worker in range(5):
+            path = os.path.join(tmpdir, f'metrics-{worker}.bin')
+            metrics = WorkerMetrics(path)
+            metrics.record('api/login/', 200, 1000, db_queries=1)
+            metrics.record(f'api/route-{worker}/', 500, 1000)
+            metrics.close()
+            # Recycled worker after worker: each new file is folded in on top of the last ones
+            assert request_metrics.retire_worker_files(tmpdir, [path]) == 1
+        assert sorted(os.listdir(tmpdir)) == sorted([request_metrics.RETIRED_FILE, request_metrics.FOLD_LOCK_FILE])
+        totals = aggregate(tmpdir)
+        assert totals['api/login/'][COUNT] == 5 and totals['api/login/'][DB_QUERIES] == 5
+        assert totals['api/route-3/'][STATUS_OFFSET + 500 - STATUS_MIN] == 1
+
+
+def main():
+    print("🧪 Testing Request Metrics")
+    print("=" * 50)
+    for test in (test_bucket_bounds, test_record_and_aggregate_workers, test_quantiles_from_histogram,
+                 test_routes_beyond_limit_share_other_slot, test_prometheus_text, test_worker_file_per_process,
+                 test_exited_workers_fold_into_one_file):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for digest-indexed password reset tokens
+Runs without a Django server: python test_reset_tokens.py
+"""
+
+import threading
+import time
+
+import otp_store
+from reset_tokens import MAX_TOKENS_PER_USER, ResetTokenStore, token_digest
+
+
+def make_store(shards=1, ttl=60):
+    return ResetTokenStore(shards=[otp_store.LocalMemoryStore() for _ in range(shards)], ttl=ttl)
+
+
+def test_raw_token_is_never_stored():
+    store = make_store()
+    token = store.issue('a@example.com')
+    shard = store.shards[0]
+    assert shard.get(token) is None
+    assert shard.get(token_digest(token))['email'] == 'a@example.com'
+
+
+def test_resolve_and_consume():
+    store = make_store()
+    token = store.issue('a@example.com')
+    assert store.resolve(token) == 'a@example.com'
+    assert store.resolve('not-a-token') is None
+    assert store.resolve('') is None
+    assert store.consume(token) == 'a@example.com'
+    assert store.consume(token) is None
+
+
+def test_several_tokens_per_user_and_revoke():
+    store = make_store(shards=4)
+    tokens = [store.issue('a@example.com') for _ in range(3)]
+    other = store.issue('b@example.com')
+    assert all(store.resolve(token) == 'a@example.com' for token in tokens)
+
+    assert store.revoke_all('a@example.com') == 3
+    assert all(store.resolve(token) is None for token in tokens)
+    assert store.resolve(other) == 'b@example.com'
+
+
+def test_oldest_tokens_dropped_past_limit():
+    store = make_store()
+    tokens = [store.issue('a@example.com') for _ in range(MAX_TOKENS_PER_USER + 2)]
+    assert store.resolve(tokens[0]) is None
+    assert store.resolve(tokens[1]) is None
+    assert all(store.resolve(token) == 'a@example.com' for token in tokens[2:])
+
+
+def test_concurrent_issues_are_all_revoked():
+    store = make_store()
+    tokens = []
+    start = threading.Barrier(MAX_TOKENS_PER_USER)
+
+    def issue():
+        start.wait()
+        tokens.append(store.issue('a@example.com'))
+
+    workers = [threading.Thread(target=issue) for _ in range(MAX_TOKENS_PER_USER)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert store.revoke_all('a@example.com') == MAX_TOKENS_PER_USER
+    assert all(store.resolve(token) is None for token in tokens)
+
+
+def test_tokens_expire():
+    store = make_store(ttl=0.1)
+    token = store.issue('a@example.com')
+    time.sleep(0.2)
+    assert store.resolve(token) is None
+
+
+def test_tokens_spread_over_shards():
+    store = make_store(shards=4)
+    for i in range(400):
+        store.issue(f"user{i}@example.com")
+    # Each shard holds tokens plus per-user index entries
+    sizes = [len(shard) for shard in store.shards]
+    assert min(sizes) > 100
+
+
+def main():
+    print("🧪 Testing Reset Token Store")
+    print("=" * 50)
+    for test in (test_raw_token_is_never_stored, test_resolve_and_consume,
+                 test_several_tokens_per_user_and_revoke, test_oldest_tokens_dropped_past_limit,
+                 test_concurrent_issues_are_all_revoked, test_tokens_expire, test_tokens_spread_over_shards):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
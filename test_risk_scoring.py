@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized symptom risk scoring
+Runs without a Django server: python test_risk_scoring.py
+Checks the NumPy path (when installed) and the plain-Python fallback against the app's rules.
+"""
+
+import importlib.util
+import random
+import sys
+
+import risk_scoring
+
+HIGH_RISK_ROW = {
+    'Age': 45, 'Gender': 'Male', 'Tobacco_Use': 1, 'Alcohol_Consumption': 1, 'HPV_Infection': 0,
+    'Betel_Quid_Use': 1, 'Poor_Oral_Hygiene': 1, 'Oral_Lesions': 1, 'Unexplained_Bleeding': 1,
+    'Difficulty_Swallowing': 0, 'White_or_Red_Patches_in_Mouth': 1, 'Oral_Cancer_Diagnosis': 0,
+}
+
+LABEL_SPELLINGS = {
+    'Tobacco_Use': 'Tobacco Use', 'Alcohol_Consumption': 'Alcohol Consumption', 'HPV_Infection': 'HPV Infection',
+    'Betel_Quid_Use': 'Betel Quid Use', 'Poor_Oral_Hygiene': 'Poor Oral Hygiene', 'Oral_Lesions': 'Oral Lesions',
+    'Unexplained_Bleeding': 'Unexplained Bleeding', 'Difficulty_Swallowing': 'Difficulty Swallowing',
+    'White_or_Red_Patches_in_Mouth': 'White or Red Patches in Mouth', 'Oral_Cancer_Diagnosis': 'Oral Cancer (Diagnosis)',
+}
+
+
+def label_row(row):
+    """The same features as test_symptom_check_api.py sends them ("Tobacco Use": "Yes")"""
+    return {LABEL_SPELLINGS.get(key, key): ('Yes' if value else 'No') if key in LABEL_SPELLINGS else value
+            for key, value in row.items()}
+
+
+def expected_row(backend, row):
+    return list(map(int, backend.encode_rows([row])[0]))
+
+
+def expect_feature_error(backend, rows, *fragments):
+    try:
+        backend.encode_rows(rows)
+    except backend.FeatureError as e:
+        for fragment in fragments:
+            assert fragment in str(e), e
+        return
+    raise AssertionError(f"expected FeatureError for {rows}")
+
+
+def python_backend():
+    """A separate copy of risk_scoring loaded as if NumPy were not installed"""
+    spec = importlib.util.spec_from_file_location('risk_scoring_python', risk_scoring.__file__)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get('numpy')
+    sys.modules['numpy'] = None  # makes `import numpy` raise ImportError
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules['numpy']
+        else:
+            sys.modules['numpy'] = saved
+    return module
+
+
+def backends():
+    fallback = python_backend()
+    return [risk_scoring, fallback] if risk_scoring.np is not None else [fallback]
+
+
+def reference_score(row):
+    """calculateRiskScore from symptom_checker.kt, written out rule by rule"""
+    score = 15 if row['Age'] >= 40 else 0
+    score += {'Male': 10, 'Female': 5, 'Other': 7}.get(row['Gender'], 0)
+    for name, points in zip(risk_scoring.FLAG_COLUMNS, (25, 20, 30, 25, 10, 35, 40, 30, 35, 50)):
+        score += points if row[name] else 0
+    return score
+
+
+def reference_level(score):
+    if score >= 150:
+        return 'High Risk'
+    if score >= 80:
+        return 'Moderate Risk'
+    if score >= 40:
+        return 'Low Risk'
+    return 'Very Low Risk'
+
+
+def random_rows(n, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        row = {name: rng.randint(0, 1) for name in risk_scoring.FLAG_COLUMNS}
+        row['Age'] = rng.randint(18, 90)
+        row['Gender'] = rng.choice(['Male', 'Female', 'Other', 'Unknown'])
+        rows.append(row)
+    return rows
+
+
+def test_high_risk_example():
+    for backend in backends():
+        scores, levels = backend.RiskModel().predict(backend.encode_rows([HIGH_RISK_ROW]))
+        assert int(scores[0]) == 215 and backend.RISK_LEVELS[levels[0]] == 'High Risk'
+
+
+def test_matches_app_rules_on_random_rows():
+    rows = random_rows(2000)
+    for backend in backends():
+        scores, levels = backend.RiskModel().predict(backend.encode_rows(rows))
+        for row, score, level in zip(rows, scores, levels):
+            assert int(score) == reference_score(row), row
+            assert backend.RISK_LEVELS[level] == reference_level(reference_score(row))
+
+
+def test_level_thresholds():
+    for backend in backends():
+        levels = backend.RiskModel().levels([0, 39, 40, 79, 80, 149, 150, 330])
+        assert [backend.RISK_LEVELS[level] for level in levels] == [
+            'Very Low Risk', 'Very Low Risk', 'Low Risk', 'Low Risk',
+            'Moderate Risk', 'Moderate Risk', 'High Risk', 'High Risk',
+        ]
+
+
+def test_invalid_rows_name_the_row():
+    for backend in backends():
+        for rows in ([HIGH_RISK_ROW, {'Gender': 'Male'}], [HIGH_RISK_ROW, dict(HIGH_RISK_ROW, Age='old')]):
+            try:
+                backend.encode_rows(rows)
+            except backend.FeatureError as e:
+                assert str(e).startswith('row 1:'), e
+                continue
+            raise AssertionError("expected FeatureError")
+
+
+def test_both_spellings_decode_the_same():
+    rows = random_rows(300)
+    mixed = dict(label_row(HIGH_RISK_ROW), Tobacco_Use=1)
+    del mixed['Tobacco Use']
+    for backend in backends():
+        expected = [list(map(int, row)) for row in backend.encode_rows(rows)]
+        assert [list(map(int, row)) for row in backend.encode_rows([label_row(row) for row in rows])] == expected
+        assert expected_row(backend, mixed) == expected_row(backend, HIGH_RISK_ROW)
+        loose = {'age': '45', 'GENDER': ' male ', 'tobacco use': 'yes', 'oral-cancer diagnosis': 'NO',
+                 'Oral Lesions': True}
+        assert expected_row(backend, loose) == [45, 1, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0]
+
+
+def test_missing_flags_and_gender_count_as_no():
+    for backend in backends():
+        assert expected_row(backend, {'Age': 30}) == [30] + [0] * 11
+        assert expected_row(backend, {'Age': 30, 'Gender': 'Unknown', 'HPV Infection': None}) == [30] + [0] * 11
+
+
+def test_bad_features_are_rejected_with_the_field_named():
+    for backend in backends():
+        expect_feature_error(backend, [HIGH_RISK_ROW, dict(HIGH_RISK_ROW, Tobaco_Use=1)], "row 1:", "'Tobaco_Use'")
+        expect_feature_error(backend, [dict(HIGH_RISK_ROW, **{'Tobacco Use': 'Yes'})], "Tobacco_Use given more than once")
+        expect_feature_error(backend, [dict(HIGH_RISK_ROW, HPV_Infection='maybe')], "HPV_Infection 'maybe'", "Yes/No")
+        expect_feature_error(backend, [dict(HIGH_RISK_ROW, HPV_Infection=2)], "HPV_Infection 2")
+        expect_feature_error(backend, [dict(HIGH_RISK_ROW, Gender='Mle')], "Gender 'Mle'")
+        expect_feature_error(backend, [dict(HIGH_RISK_ROW, Gender=['Male'])], "Gender ['Male']")
+        for age in (-1, 151, 45.5, 'forty', True, False):
+            expect_feature_error(backend, [dict(HIGH_RISK_ROW, Age=age)], "invalid Age")
+        expect_feature_error(backend, [{'Gender': 'Male', 'Tobacco Use': 'Yes'}], "Age is required")
+
+
+def test_decode_plans_are_cached_and_bounded():
+    schema = risk_scoring.FeatureSchema(max_plans=2)
+    row = [0] * len(risk_scoring.FEATURE_COLUMNS)
+    for features in (HIGH_RISK_ROW, label_row(HIGH_RISK_ROW), dict(reversed(list(HIGH_RISK_ROW.items())))):
+        schema.decode(features, row)
+        assert row == expected_row(risk_scoring, HIGH_RISK_ROW)
+    assert len(schema._plans) == 2
+
+
+def test_result_body():
+    body = risk_scoring.result_body(215, 3)
+    assert body['risk_score'] == 215 and body['risk_level'] == 'High Risk'
+    assert body['recommendations'][0] == "Immediate medical consultation recommended"
+
+
+def main():
+    print(f"🧪 Testing Risk Scoring ({'numpy' if risk_scoring.np is not None else 'python'})")
+    print("=" * 50)
+    for test in (test_high_risk_example, test_matches_app_rules_on_random_rows, test_level_thresholds,
+                 test_invalid_rows_name_the_row, test_both_spellings_decode_the_same,
+                 test_missing_flags_and_gender_count_as_no, test_bad_features_are_rejected_with_the_field_named,
+                 test_decode_plans_are_cached_and_bounded, test_result_body):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the mmap-backed shared OTP table
+Runs without a Django server: python test_shared_otp_table.py
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+import shared_otp_table
+from shared_otp_table import SharedOtpTable
+
+
+def _put_from_worker(path, email, otp):
+    """Simulates request_otp handled by a different gunicorn worker"""
+    table = SharedOtpTable(path=path)
+    table.put(email, otp, ttl=60)
+    table.close()
+
+
+def _guess_from_worker(path, email, results):
+    table = SharedOtpTable(path=path)
+    results.put(table.verify(email, '000000', max_attempts=3)[0])
+    table.close()
+
+
+def test_put_and_verify():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        table.put('User@Example.com', '123456', ttl=60)
+        assert table.get('user@example.com')['attempts'] == 0
+        assert table.verify('user@example.com', '123456') == (shared_otp_table.VERIFIED, 2)
+        # One-time use
+        assert table.verify('user@example.com', '123456')[0] == shared_otp_table.MISSING
+
+
+def test_attempt_limit():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        table.put('a@example.com', '123456', ttl=60)
+        assert table.verify('a@example.com', '000000') == (shared_otp_table.INVALID, 2)
+        assert table.verify('a@example.com', '000000') == (shared_otp_table.INVALID, 1)
+        assert table.verify('a@example.com', '000000') == (shared_otp_table.INVALID, 0)
+        assert table.verify('a@example.com', '123456')[0] == shared_otp_table.TOO_MANY_ATTEMPTS
+        assert table.get('a@example.com') is None
+
+
+def test_expiry():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=64)
+        table.put('a@example.com', '123456', ttl=0.1)
+        time.sleep(0.2)
+        assert table.verify('a@example.com', '123456')[0] == shared_otp_table.MISSING
+
+
+def test_shared_between_processes_and_survives_restart():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'otp.bin')
+        worker = multiprocessing.Process(target=_put_from_worker, args=(path, 'b@example.com', '654321'))
+        worker.start()
+        worker.join()
+
+        # A fresh mapping (new worker after deploy) still sees the OTP
+        table = SharedOtpTable(path=path)
+        assert table.verify('b@example.com', '654321')[0] == shared_otp_table.VERIFIED
+
+
+def test_concurrent_guesses_respect_limit():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'otp.bin')
+        table = SharedOtpTable(path=path, capacity=64)
+        table.put('c@example.com', '123456', ttl=60)
+
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_guess_from_worker, args=(path, 'c@example.com', results))
+                   for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        statuses = [results.get() for _ in workers]
+        assert statuses.count(shared_otp_table.INVALID) == 3
+
+
+def test_full_bucket_evicts_soonest_expiry():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # A single bucket: the 9th email must evict the shortest-lived entry
+        table = SharedOtpTable(path=os.path.join(tmpdir, 'otp.bin'), capacity=shared_otp_table.SLOTS_PER_BUCKET)
+        for i in range(shared_otp_table.SLOTS_PER_BUCKET):
+            table.put(f"user{i}@example.com", '1', ttl=60 + i)
+        table.put('late@example.com', '1', ttl=600)
+        assert table.get('user0@example.com') is None
+        assert table.get('late@example.com') is not None
+        assert len(table) == shared_otp_table.SLOTS_PER_BUCKET
+
+
+def main():
+    print("🧪 Testing Shared OTP Table")
+    print("=" * 50)
+    for test in (test_put_and_verify, test_attempt_limit, test_expiry,
+                 test_shared_between_processes_and_survives_restart,
+                 test_concurrent_guesses_respect_limit, test_full_bucket_evicts_soonest_expiry):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for stateless signed reset tokens and the used-token filter
+Runs without a Django server: python test_signed_tokens.py
+"""
+
+import os
+import tempfile
+import time
+
+from signed_tokens import SignedTokenSigner, UsedTokenFilter
+
+
+def make_signer(ttl=600, used_filter=None):
+    return SignedTokenSigner('test-secret', ttl=ttl, used_filter=used_filter or UsedTokenFilter(bucket_seconds=ttl))
+
+
+def test_sign_and_verify():
+    signer = make_signer()
+    token = signer.sign('User@Example.com', bind='hash1')
+    assert signer.verify(token, 'user@example.com', bind='hash1') is not None
+
+
+def test_rejects_wrong_email_bind_secret_and_tampering():
+    signer = make_signer()
+    token = signer.sign('a@example.com', bind='hash1')
+    assert signer.verify(token, 'b@example.com', bind='hash1') is None
+    # Password changed since the token was issued
+    assert signer.verify(token, 'a@example.com', bind='hash2') is None
+    assert SignedTokenSigner('other-secret').verify(token, 'a@example.com', bind='hash1') is None
+
+    tampered = token[:-2] + ('A' if token[-2] != 'A' else 'B') + token[-1]
+    assert signer.verify(tampered, 'a@example.com', bind='hash1') is None
+    assert signer.verify('not-a-token', 'a@example.com') is None
+    assert signer.verify('', 'a@example.com') is None
+    assert signer.verify(None, 'a@example.com') is None
+
+
+def test_expired_token_rejected():
+    signer = make_signer(ttl=1)
+    token = signer.sign('a@example.com')
+    time.sleep(1.1)
+    assert signer.verify(token, 'a@example.com') is None
+
+
+def test_one_time_use():
+    signer = make_signer()
+    token = signer.sign('a@example.com')
+    other = signer.sign('a@example.com')
+    assert signer.mark_used(token)
+    assert signer.verify(token, 'a@example.com') is None
+    assert signer.verify(other, 'a@example.com') is not None
+    # Only the first of two requests that verified the token can mark it used
+    assert not signer.mark_used(token) and not signer.mark_used('garbage')
+
+
+def test_used_filter_shared_through_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'used.bin')
+        worker_a = make_signer(used_filter=UsedTokenFilter(bucket_seconds=600, path=path))
+        worker_b = make_signer(used_filter=UsedTokenFilter(bucket_seconds=600, path=path))
+        token = worker_a.sign('a@example.com')
+        worker_a.mark_used(token)
+        assert worker_b.verify(token, 'a@example.com') is None
+
+
+def test_filter_buckets_recycle():
+    used = UsedTokenFilter(bucket_seconds=10, buckets=3, bits=1024)
+    used.add(b'token-1', 105)
+    assert (b'token-1', 105) in used
+    # Window 13 reuses window 10's slot: the old entries are gone
+    used.add(b'token-2', 135)
+    assert (b'token-1', 105) not in used
+    assert (b'token-2', 135) in used
+
+
+def test_false_positive_rate_is_small():
+    used = UsedTokenFilter(bucket_seconds=600)
+    expires_at = int(time.time()) + 300
+    for i in range(10000):
+        used.add(f"used-{i}".encode(), expires_at)
+    false_positives = sum((f"fresh-{i}".encode(), expires_at) in used for i in range(10000))
+    assert false_positives <= 2
+
+
+def main():
+    print("🧪 Testing Signed Reset Tokens")
+    print("=" * 50)
+    for test in (test_sign_and_verify, test_rejects_wrong_email_bind_secret_and_tampering,
+                 test_expired_token_rejected, test_one_time_use, test_used_filter_shared_through_file,
+                 test_filter_buckets_recycle, test_false_positive_rate_is_small):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
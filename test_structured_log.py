@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the queued structured logger
+Runs without a Django server: python test_structured_log.py
+"""
+
+import io
+import json
+
+from structured_log import DEBUG, INFO, REDACTED, EndpointLogger, LogWriter, parse_sample_rates
+
+
+def make_logger(level=INFO, sample_rate=1.0, maxsize=1000):
+    stream = io.StringIO()
+    writer = LogWriter(stream=stream, maxsize=maxsize)
+    return EndpointLogger('login', writer, level=level, sample_rate=sample_rate), writer, stream
+
+
+def records(writer, stream):
+    writer.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_lines_with_redaction():
+    log, writer, stream = make_logger()
+    log.info('login_succeeded', email='user@example.com', password='hunter22', token='abc', otp='123456')
+    [record] = records(writer, stream)
+    assert record['event'] == 'login_succeeded' and record['endpoint'] == 'login'
+    assert record['level'] == 'INFO' and record['email'] == 'user@example.com'
+    assert record['password'] == record['token'] == record['otp'] == REDACTED
+    writer.close()
+
+
+def test_level_gating():
+    log, writer, stream = make_logger(level=INFO)
+    log.debug('hidden')
+    log.warning('shown')
+    assert [record['event'] for record in records(writer, stream)] == ['shown']
+    assert writer.enqueued == 1
+    writer.close()
+
+
+def test_sampling_keeps_warnings_and_errors():
+    log, writer, stream = make_logger(level=DEBUG, sample_rate=0.0)
+    for _ in range(100):
+        log.info('sampled')
+    log.warning('kept')
+    log.error('kept')
+    assert [record['event'] for record in records(writer, stream)] == ['kept', 'kept']
+    assert log.sampled_out == 100
+    writer.close()
+
+
+def test_exception_traceback_added_by_writer():
+    log, writer, stream = make_logger()
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        log.exception('unhandled_error', error=str(e))
+    [record] = records(writer, stream)
+    assert record['level'] == 'ERROR' and 'ValueError: boom' in record['traceback']
+    writer.close()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    log, writer, stream = make_logger(maxsize=1)
+    writer._stopped = True  # no writer thread: the queue cannot drain
+    for _ in range(5):
+        log.info('burst')
+    assert writer.enqueued == 1 and writer.dropped == 4
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("verify_otp=0.1, *=0.5,bad,login=2") == {'verify_otp': 0.1, '*': 0.5, 'login': 1.0}
+    assert parse_sample_rates("") == {}
+
+
+def main():
+    print("🧪 Testing Structured Logger")
+    print("=" * 50)
+    for test in (test_json_lines_with_redaction, test_level_gating, test_sampling_keeps_warnings_and_errors,
+                 test_exception_traceback_added_by_writer, test_full_queue_drops_instead_of_blocking,
+                 test_parse_sample_rates):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
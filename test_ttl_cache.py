@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process LRU+TTL cache used by session authentication
+Runs without a Django server: python test_ttl_cache.py
+"""
+
+import os
+import tempfile
+import time
+
+from ttl_cache import LRUTTLCache, SharedGeneration
+
+
+def test_get_set_delete():
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('missing', 'default') == 'default'
+    assert cache.delete('a')
+    assert not cache.delete('a')
+    assert cache.get('a') is None
+
+
+def test_entries_expire():
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+    cache.set('short', 1, ttl=0.05)
+    cache.set('long', 2)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    assert cache.get('long') == 2
+
+
+def test_ttl_capped_by_cache_ttl():
+    cache = LRUTTLCache(maxsize=10, ttl=0.05)
+    # A 30-day session is still only trusted for the cache's own ttl
+    cache.set('session', 1, ttl=30 * 24 * 3600)
+    time.sleep(0.1)
+    assert cache.get('session') is None
+    cache.set('already-expired', 1, ttl=-1)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_evicted():
+    cache = LRUTTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_delete_where_and_stats():
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+    cache.set('t1', (7, 0))
+    cache.set('t2', (7, 0))
+    cache.set('t3', (8, 0))
+    assert cache.delete_where(lambda entry: entry[0] == 7) == 2
+    assert cache.get('t1') is None
+    assert cache.get('t3') == (8, 0)
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['size'] == 1
+
+
+def test_replace_keeps_expiry():
+    cache = LRUTTLCache(maxsize=10, ttl=0.1)
+    cache.set('t1', (7, 0))
+    assert cache.replace('t1', (7, 1)) and cache.get('t1') == (7, 1)
+    assert not cache.replace('t2', (8, 1))
+    time.sleep(0.15)
+    assert cache.get('t1') is None
+
+
+def test_shared_generation_across_processes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'generation.bin')
+        generation = SharedGeneration(path)
+        assert generation.current() == 0
+        pid = os.fork()
+        if pid == 0:
+            SharedGeneration(path).bump()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        assert generation.current() == 1 and generation.bump() == 2
+
+
+def main():
+    print("🧪 Testing LRU+TTL Cache")
+    print("=" * 50)
+    for test in (test_get_set_delete, test_entries_expire, test_ttl_capped_by_cache_ttl,
+                 test_least_recently_used_evicted, test_delete_where_and_stats, test_replace_keeps_expiry,
+                 test_shared_generation_across_processes):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
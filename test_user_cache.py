@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the read-through cache with negative caching
+Runs without a Django server: python test_user_cache.py
+"""
+
+from otp_store import LocalMemoryStore
+from user_cache import ReadThroughCache
+
+
+class FakeDatabase:
+    """Loader stand-in that counts queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def load(self, email):
+        self.queries += 1
+        return self.rows.get(email)
+
+
+def make_cache(db):
+    return ReadThroughCache(db.load, LocalMemoryStore(), LocalMemoryStore(), normalize=lambda e: e.strip().lower())
+
+
+def test_hits_served_from_store():
+    db = FakeDatabase({'a@example.com': {'id': 1, 'email': 'a@example.com'}})
+    cache = make_cache(db)
+    for _ in range(5):
+        assert cache.get(' A@Example.com')['id'] == 1
+    assert db.queries == 1
+    assert cache.stats() == {'hits': 4, 'negative_hits': 0, 'misses': 1}
+
+
+def test_unknown_emails_negatively_cached():
+    db = FakeDatabase({})
+    cache = make_cache(db)
+    for _ in range(100):
+        assert cache.get('nobody@example.com') is None
+    assert db.queries == 1
+    # Enumeration: each distinct unknown email costs one query, repeats cost none
+    for i in range(50):
+        cache.get(f"probe{i}@example.com")
+        cache.get(f"probe{i}@example.com")
+    assert db.queries == 51
+
+
+def test_invalidate_reloads():
+    db = FakeDatabase({'a@example.com': {'id': 1, 'password': 'old'}})
+    cache = make_cache(db)
+    cache.get('a@example.com')
+    db.rows['a@example.com'] = {'id': 1, 'password': 'new'}
+    cache.invalidate('a@example.com')
+    assert cache.get('a@example.com')['password'] == 'new'
+
+
+def test_created_user_bypasses_negative_entry():
+    db = FakeDatabase({})
+    cache = make_cache(db)
+    assert cache.get('new@example.com') is None
+    db.rows['new@example.com'] = {'id': 2}
+    cache.mark_exists('new@example.com')
+    assert cache.get('new@example.com') == {'id': 2}
+
+
+def main():
+    print("🧪 Testing Read-Through User Cache")
+    print("=" * 50)
+    for test in (test_hits_served_from_store, test_unknown_emails_negatively_cached,
+                 test_invalidate_reloads, test_created_user_bypasses_negative_entry):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
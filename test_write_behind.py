@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the write-behind timestamp buffer
+Runs without a Django server: python test_write_behind.py
+"""
+
+import time
+
+from write_behind import WriteBehindBuffer
+
+
+class Recorder:
+    """flush_fn stand-in that remembers every batch"""
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    def __call__(self, batch):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(dict(batch))
+
+
+def test_updates_coalesce_per_key():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, interval_ms=60000, max_rows=100)
+    for value in range(10):
+        buffer.add('user-1', value)
+    buffer.add('user-2', 'x')
+    assert buffer.flush() == 2
+    assert recorder.batches == [{'user-1': 9, 'user-2': 'x'}]
+    assert buffer.stats()['updates'] == 11
+    buffer.close()
+
+
+def test_flushes_on_interval():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, interval_ms=20, max_rows=100)
+    buffer.add(1, 'a')
+    time.sleep(0.2)
+    assert recorder.batches == [{1: 'a'}]
+    buffer.close()
+
+
+def test_flushes_when_full():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, interval_ms=60000, max_rows=3)
+    for key in range(3):
+        buffer.add(key, key)
+    time.sleep(0.2)
+    assert recorder.batches == [{0: 0, 1: 1, 2: 2}]
+    buffer.close()
+
+
+def test_failed_flush_is_retried_without_losing_newer_values():
+    recorder = Recorder(fail_times=1)
+    buffer = WriteBehindBuffer(recorder, interval_ms=60000, max_rows=100)
+    buffer.add('a', 1)
+    buffer.add('b', 1)
+    assert buffer.flush() == 0
+    buffer.add('a', 2)
+    assert buffer.flush() == 2
+    assert recorder.batches == [{'a': 2, 'b': 1}]
+    buffer.close()
+
+
+def test_close_flushes_pending():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, interval_ms=60000, max_rows=100)
+    buffer.add('a', 1)
+    buffer.close()
+    assert recorder.batches == [{'a': 1}]
+    assert len(buffer) == 0
+
+
+def main():
+    print("🧪 Testing Write-Behind Buffer")
+    print("=" * 50)
+    for test in (test_updates_coalesce_per_key, test_flushes_on_interval, test_flushes_when_full,
+                 test_failed_flush_is_retried_without_losing_newer_values, test_close_flushes_pending):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    main()
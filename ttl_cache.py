@@ -0,0 +1,133 @@
+"""
+In-Process LRU Cache with Per-Entry TTL
+Bounded by entry count; least recently used entries are evicted first.
+Used for hot lookups that must not hit the database on every request.
+
+SharedGeneration is a host-wide counter next to such caches: a process that invalidates
+something bumps it, and every other process notices on its next (lock-free) read.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from private_files import open_private
+
+GENERATION = struct.Struct('<q')
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after their own TTL"""
+
+    def __init__(self, maxsize=10000, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Cache value for ttl seconds (default: the cache's ttl)"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def replace(self, key, value):
+        """Update a live entry's value, keeping its expiry; False if it is gone"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            self._data[key] = (value, entry[1])
+            return True
+
+    def delete(self, key):
+        """Drop key; True if it was cached"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_where(self, predicate):
+        """Drop every entry whose value matches predicate; returns the count"""
+        with self._lock:
+            doomed = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in doomed:
+                del self._data[key]
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Hit/miss counters for instrumentation"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class SharedGeneration:
+    """
+    Counter in an 8-byte mmap file shared by every process on the host (in-process if path
+    is None). current() is one lock-free read; bump() increments under an fcntl lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        if path is None:
+            self._buf = bytearray(GENERATION.size)
+        else:
+            self._fd = open_private(path)
+            if os.fstat(self._fd).st_size < GENERATION.size:
+                os.ftruncate(self._fd, GENERATION.size)
+            self._buf = mmap.mmap(self._fd, GENERATION.size)
+
+    def current(self):
+        return GENERATION.unpack_from(self._buf, 0)[0]
+
+    def bump(self):
+        """Advance the generation; returns the new value"""
+        with self._lock:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                generation = self.current() + 1
+                GENERATION.pack_into(self._buf, 0, generation)
+                return generation
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
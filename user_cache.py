@@ -0,0 +1,96 @@
+"""
+Read-Through Cache with Negative Caching
+Serves lookups from a shared expiring store (otp_store) and only calls the loader
+(the database query) on a miss.
+
+Misses are remembered in a rotating Bloom filter (signed_tokens.UsedTokenFilter keyed
+by time window), so repeated lookups of unknown keys, e.g. an enumeration run against
+/api/request-otp/, stop reaching the database for up to negative_ttl seconds.
+A Bloom filter cannot forget a single key, so keys that come into existence after a miss
+are recorded in a small "exists" store that overrides the filter until its window has
+rotated out.
+"""
+
+import time
+
+from signed_tokens import UsedTokenFilter
+
+
+class ReadThroughCache:
+    """
+    load(key) -> value or None; values must be JSON-serializable for shared stores
+    aget() needs aload, an async version of load (e.g. over Django's async ORM)
+    """
+
+    def __init__(self, load, store, exists_store, ttl=300, negative_ttl=300, unknown_filter=None,
+                 normalize=lambda key: key, aload=None):
+        self.load = load
+        self.aload = aload
+        self.store = store
+        self.exists = exists_store
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.unknown = unknown_filter if unknown_filter is not None else UsedTokenFilter(bucket_seconds=negative_ttl)
+        self.normalize = normalize
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Cached value for key, loading it on a miss; None if it does not exist"""
+        key = self.normalize(key)
+        value = self.store.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        now = time.time()
+        if (key.encode(), now) in self.unknown and self.exists.get(key) is None:
+            self.negative_hits += 1
+            return None
+
+        self.misses += 1
+        value = self.load(key)
+        if value is None:
+            self.unknown.add(key.encode(), now)
+            return None
+        self.store.set(key, value, ttl=self.ttl)
+        return value
+
+    async def aget(self, key):
+        """get() for ASGI views: awaits the stores and aload instead of blocking"""
+        key = self.normalize(key)
+        value = await self.store.aget(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        now = time.time()
+        if (key.encode(), now) in self.unknown and await self.exists.aget(key) is None:
+            self.negative_hits += 1
+            return None
+
+        self.misses += 1
+        value = await self.aload(key)
+        if value is None:
+            self.unknown.add(key.encode(), now)
+            return None
+        await self.store.aset(key, value, ttl=self.ttl)
+        return value
+
+    async def ainvalidate(self, key):
+        await self.store.adelete(self.normalize(key))
+
+    def invalidate(self, key):
+        """Drop key after its source changed or was deleted"""
+        self.store.delete(self.normalize(key))
+
+    def mark_exists(self, key):
+        """key was created or changed: drop it and bypass any negative entry until the filter rotates"""
+        key = self.normalize(key)
+        self.exists.set(key, True, ttl=self.negative_ttl)
+        self.store.delete(key)
+
+    def stats(self):
+        """Counters for instrumentation"""
+        return {'hits': self.hits, 'negative_hits': self.negative_hits, 'misses': self.misses}
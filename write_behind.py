@@ -0,0 +1,111 @@
+"""
+Write-Behind Buffer for Coalesced Timestamp Updates
+Replaces one synchronous UPDATE per request (user.last_login, user_sessions.last_activity)
+with one batched write every WRITE_BEHIND_INTERVAL_MS or WRITE_BEHIND_MAX_ROWS rows
+
+Updates are keyed by row id and the newest value wins, so a hot user hammering the API
+costs a single row write per flush instead of one per request. Values still in memory
+are flushed at interpreter exit; a hard kill loses at most one interval of timestamps.
+"""
+
+import atexit
+import os
+import threading
+
+from structured_log import get_logger
+
+WRITE_BEHIND_INTERVAL_MS = int(os.environ.get('ECHOHEALTH_WRITE_BEHIND_INTERVAL_MS', '1000'))
+WRITE_BEHIND_MAX_ROWS = int(os.environ.get('ECHOHEALTH_WRITE_BEHIND_MAX_ROWS', '500'))
+
+log = get_logger('write_behind')
+
+
+class WriteBehindBuffer:
+    """
+    Collects {key: value} updates and hands them to flush_fn(batch) from a background thread
+
+    flush_fn receives a dict of the pending updates. If it raises, the batch is merged
+    back (without overwriting newer values) and retried on the next flush.
+    """
+
+    def __init__(self, flush_fn, interval_ms=WRITE_BEHIND_INTERVAL_MS,
+                 max_rows=WRITE_BEHIND_MAX_ROWS, name='write-behind'):
+        self.flush_fn = flush_fn
+        self.interval = interval_ms / 1000.0
+        self.max_rows = max_rows
+        self.name = name
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._thread_pid = None
+        self.updates = 0
+        self.rows_written = 0
+        self.flushes = 0
+        atexit.register(self.close)
+
+    def add(self, key, value):
+        """Queue value for key; replaces any pending value for the same key"""
+        with self._lock:
+            self._pending[key] = value
+            self.updates += 1
+            full = len(self._pending) >= self.max_rows
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _ensure_thread(self):
+        """Start the flusher (threads do not survive fork, so once per worker)"""
+        if self._thread_pid != os.getpid() and not self._stopped:
+            with self._lock:
+                if self._thread_pid != os.getpid():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+                    self._thread_pid = os.getpid()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every pending update now; returns the number of rows handed to flush_fn"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                self.flush_fn(batch)
+            except Exception as e:
+                log.exception('flush_failed', writer=self.name, rows=len(batch), error=str(e))
+                with self._lock:
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                return 0
+            self.rows_written += len(batch)
+            self.flushes += 1
+            return len(batch)
+
+    def close(self):
+        """Stop the flusher and write whatever is still pending"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def stats(self):
+        """Counters for instrumentation: updates queued vs rows actually written"""
+        return {
+            'pending': len(self._pending),
+            'updates': self.updates,
+            'rows_written': self.rows_written,
+            'flushes': self.flushes,
+        }